@@ -0,0 +1,223 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.mock_server import MockServer
+from libs.exceptions.custom_exceptions import APIRequestError, InvalidInputError
+from libs.utils import async_api_utils
+from libs.utils.api_utils import ApiClient, RequestSpec, call_batch, call_get
+
+MODES = ("sequential", "pooled", "batched", "async")
+
+@dataclass
+class BenchmarkResult:
+    """
+    Outcome of one benchmark mode. Latencies are in milliseconds; peak_memory_kb is the tracemalloc
+    peak of a separate traced run, or None when memory was not measured.
+    """
+    mode: str
+    requests: int
+    errors: int
+    seconds: float
+    requests_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_memory_kb: Optional[float] = None
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+def _run_sequential(url: str, requests: int, concurrency: int) -> Tuple[List[float], int]:
+    # One request at a time on a fresh client: every request pays for a new connection.
+    latencies, errors = [], 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        with ApiClient() as client:
+            try:
+                call_get(url, client=client)
+            except APIRequestError:
+                errors += 1
+        latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+def _run_pooled(url: str, requests: int, concurrency: int) -> Tuple[List[float], int]:
+    # One request at a time over a single keep-alive connection.
+    latencies, errors = [], 0
+    with ApiClient() as client:
+        for _ in range(requests):
+            started = time.perf_counter()
+            try:
+                call_get(url, client=client)
+            except APIRequestError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+def _run_batched(url: str, requests: int, concurrency: int) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    with ApiClient(pool_maxsize=concurrency, hooks=[lambda event: latencies.append(event.total)]) as client:
+        results = call_batch([RequestSpec("GET", url) for _ in range(requests)], max_concurrency=concurrency, client=client)
+    return latencies, sum(isinstance(result, APIRequestError) for result in results)
+
+def _run_async(url: str, requests: int, concurrency: int) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+
+    async def main():
+        nonlocal errors
+        limit = asyncio.Semaphore(concurrency)
+        async with async_api_utils.AsyncApiClient(limit=concurrency) as client:
+            async def one():
+                nonlocal errors
+                async with limit:
+                    started = time.perf_counter()
+                    try:
+                        await async_api_utils.acall_get(url, client=client)
+                    except APIRequestError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(*(one() for _ in range(requests)))
+
+    asyncio.run(main())
+    return latencies, errors
+
+_RUNNERS: Dict[str, Callable[[str, int, int], Tuple[List[float], int]]] = {
+    "sequential": _run_sequential,
+    "pooled": _run_pooled,
+    "batched": _run_batched,
+    "async": _run_async,
+}
+
+def available_modes() -> List[str]:
+    """
+    Returns:
+        List[str]: The benchmark modes runnable here; async needs the optional aiohttp package.
+    """
+    return [mode for mode in MODES if mode != "async" or async_api_utils.aiohttp is not None]
+
+def run_benchmark(mode: str, url: str, requests: int = 200, concurrency: int = 10, measure_memory: bool = True) -> BenchmarkResult:
+    """
+    Run one benchmark mode against a server.
+
+    Args:
+        mode (str): One of "sequential", "pooled", "batched" or "async".
+        url (str): The URL every request is sent to.
+        requests (int): Number of requests to send.
+        concurrency (int): Requests in flight at once for the batched and async modes.
+        measure_memory (bool): Whether to repeat the run under tracemalloc to report peak memory. Tracing
+            slows the code down, so it never overlaps with the timed run.
+
+    Raises:
+        InvalidInputError: If any of the inputs are invalid.
+
+    Returns:
+        BenchmarkResult: Throughput, latency percentiles and memory of the run.
+    """
+    if mode not in available_modes():
+        raise InvalidInputError("mode", f"Unknown or unavailable mode: {mode}. Choose from {available_modes()}.")
+    if requests < 1 or concurrency < 1:
+        raise InvalidInputError("requests", "requests and concurrency must be positive.")
+    runner = _RUNNERS[mode]
+    started = time.perf_counter()
+    latencies, errors = runner(url, requests, concurrency)
+    seconds = time.perf_counter() - started
+    peak_memory_kb = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            runner(url, requests, concurrency)
+            peak_memory_kb = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return BenchmarkResult(mode=mode, requests=requests, errors=errors, seconds=seconds,
+                           requests_per_second=requests / seconds if seconds else 0.0,
+                           p50_ms=_percentile(latencies, 0.5) * 1000, p99_ms=_percentile(latencies, 0.99) * 1000,
+                           peak_memory_kb=peak_memory_kb)
+
+def find_regressions(results: List[BenchmarkResult], baseline: List[dict], max_regression: float = 0.2) -> List[str]:
+    """
+    Compare results with a baseline saved by an earlier `--json` run.
+
+    Args:
+        results (List[BenchmarkResult]): The current results.
+        baseline (List[dict]): The baseline results as saved to JSON.
+        max_regression (float): Allowed relative drop in requests/sec or rise in p99 latency.
+
+    Returns:
+        List[str]: One message per regression; empty if there are none.
+    """
+    previous = {entry["mode"]: entry for entry in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result.mode)
+        if before is None:
+            continue
+        if result.requests_per_second < before["requests_per_second"] * (1 - max_regression):
+            regressions.append(f"{result.mode}: {result.requests_per_second:.0f} req/s vs {before['requests_per_second']:.0f} in baseline")
+        if result.p99_ms > before["p99_ms"] * (1 + max_regression):
+            regressions.append(f"{result.mode}: p99 {result.p99_ms:.2f} ms vs {before['p99_ms']:.2f} ms in baseline")
+    return regressions
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    lines = [f"{'mode':<12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>10}"]
+    for result in results:
+        memory = f"{result.peak_memory_kb:.0f}" if result.peak_memory_kb is not None else "-"
+        lines.append(f"{result.mode:<12}{result.requests:>10}{result.errors:>8}{result.requests_per_second:>10.0f}"
+                     f"{result.p50_ms:>10.2f}{result.p99_ms:>10.2f}{memory:>10}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the api_utils request path against a loopback mock server.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=None, help="Modes to run (default: all available).")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per mode.")
+    parser.add_argument("--concurrency", type=int, default=10, help="In-flight requests for the batched and async modes.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Server latency per request in seconds.")
+    parser.add_argument("--payload-size", type=int, default=1024, help="Response body size in bytes.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 503 response.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the server's error sampling.")
+    parser.add_argument("--url", default=None, help="Benchmark this URL instead of starting the mock server.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced run that measures peak memory.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative regression against the baseline.")
+    args = parser.parse_args(argv)
+
+    # Failed requests are expected with --error-rate; don't flood the output with their log lines.
+    logging.getLogger("libs.utils.api_utils").setLevel(logging.CRITICAL)
+    logging.getLogger("libs.utils.async_api_utils").setLevel(logging.CRITICAL)
+    modes = args.modes or available_modes()
+
+    def run_all(url: str) -> List[BenchmarkResult]:
+        return [run_benchmark(mode, url, args.requests, args.concurrency, not args.no_memory) for mode in modes]
+
+    if args.url:
+        results = run_all(args.url)
+    else:
+        with MockServer(args.latency, args.payload_size, args.error_rate, args.seed) as server:
+            results = run_all(server.url)
+    print(format_results(results))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.max_regression)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from libs.exceptions.custom_exceptions import InvalidInputError
+from libs.utils.jwt_utils import JwtKey, JwtMinter, generate_jwt
+
+MODES = ("generate_jwt", "minter")
+ALGORITHMS = ("HS256", "RS256", "ES256", "EdDSA")
+
+@dataclass
+class BenchmarkResult:
+    """
+    Outcome of minting `tokens` JWTs in one mode with one algorithm.
+    """
+    mode: str
+    algorithm: str
+    tokens: int
+    seconds: float
+    tokens_per_second: float
+
+def available_algorithms() -> List[str]:
+    """
+    Returns:
+        List[str]: The algorithms runnable here; all but HS256 need the optional cryptography package.
+    """
+    try:
+        import cryptography  # noqa: F401
+    except ImportError:
+        return ["HS256"]
+    return list(ALGORITHMS)
+
+def _signing_key(algorithm: str):
+    if algorithm == "HS256":
+        return "benchmark-secret-key-of-32-bytes!"
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    return JwtKey(private_key, algorithm)
+
+def _generator(mode: str, key, claims: dict) -> Callable[[int], str]:
+    if mode == "generate_jwt":
+        # The same static and per-token claims the minter encodes, merged the way a generate_jwt caller would.
+        return lambda i: generate_jwt({**claims, "sub": str(i)}, key)
+    minter = JwtMinter(key, claims=claims)
+    return lambda i: minter.mint({"sub": str(i)})
+
+def run_benchmark(mode: str, algorithm: str = "HS256", tokens: int = 10000) -> BenchmarkResult:
+    """
+    Mint tokens carrying two static claims and one per-token claim.
+
+    Args:
+        mode (str): "generate_jwt" for one generate_jwt call per token, or "minter" for a reused JwtMinter.
+        algorithm (str): The signing algorithm.
+        tokens (int): Number of tokens to mint.
+
+    Raises:
+        InvalidInputError: If any of the inputs are invalid.
+
+    Returns:
+        BenchmarkResult: Throughput of the run.
+    """
+    if mode not in MODES:
+        raise InvalidInputError("mode", f"Unknown mode: {mode}. Choose from {list(MODES)}.")
+    if algorithm not in available_algorithms():
+        raise InvalidInputError("algorithm", f"Unknown or unavailable algorithm: {algorithm}. Choose from {available_algorithms()}.")
+    if tokens < 1:
+        raise InvalidInputError("tokens", "tokens must be positive.")
+    generate = _generator(mode, _signing_key(algorithm), {"iss": "bench-issuer", "aud": "bench-api"})
+    started = time.perf_counter()
+    for i in range(tokens):
+        generate(i)
+    seconds = time.perf_counter() - started
+    return BenchmarkResult(mode=mode, algorithm=algorithm, tokens=tokens, seconds=seconds,
+                           tokens_per_second=tokens / seconds if seconds else 0.0)
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    baseline: Dict[str, float] = {result.algorithm: result.tokens_per_second for result in results if result.mode == "generate_jwt"}
+    lines = [f"{'mode':<14}{'algorithm':<10}{'tokens':>10}{'tokens/s':>12}{'speedup':>10}"]
+    for result in results:
+        speedup = f"{result.tokens_per_second / baseline[result.algorithm]:.2f}x" if baseline.get(result.algorithm) else "-"
+        lines.append(f"{result.mode:<14}{result.algorithm:<10}{result.tokens:>10}{result.tokens_per_second:>12.0f}{speedup:>10}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark JWT minting: generate_jwt against a reused JwtMinter.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Modes to run (default: all).")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=None, help="Algorithms to run (default: all available).")
+    parser.add_argument("--tokens", type=int, default=10000, help="Tokens minted per mode and algorithm.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = [run_benchmark(mode, algorithm, args.tokens)
+               for algorithm in args.algorithms or available_algorithms() for mode in args.modes]
+    print(format_results(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with Nagle on, keep-alive requests would stall on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        server: MockServer = self.server.mock
+        if server.latency:
+            time.sleep(server.latency)
+        failed = server.error_rate and server.random() < server.error_rate
+        payload = server.error_payload if failed else server.payload
+        self.send_response(503 if failed else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Async and batched runs open many connections at once; the default backlog of 5 would refuse them.
+    request_queue_size = 1024
+
+class MockServer:
+    """
+    Loopback HTTP server standing in for an upstream API in benchmarks.
+
+    Every request gets a JSON body of `payload_size` bytes after `latency` seconds, or a 503 with
+    probability `error_rate`. Connections are kept alive, so client-side pooling shows up in the results.
+    """
+    def __init__(self, latency: float = 0.0, payload_size: int = 1024, error_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            latency (float): Seconds the server waits before answering each request.
+            payload_size (int): Size of each successful response body in bytes.
+            error_rate (float): Probability [0, 1] that a request is answered with a 503.
+            seed (Optional[int]): Seed for the error sampling, for reproducible runs.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if latency < 0:
+            raise InvalidInputError("latency", "latency must be non-negative.")
+        if payload_size < 2:
+            raise InvalidInputError("payload_size", "payload_size must be at least 2 bytes.")
+        if not 0 <= error_rate <= 1:
+            raise InvalidInputError("error_rate", "error_rate must be between 0 and 1.")
+        self.latency = latency
+        self.error_rate = error_rate
+        self.payload = b'"' + b"x" * (payload_size - 2) + b'"'
+        self.error_payload = b'{"error": "unavailable"}'
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def random(self) -> float:
+        with self._random_lock:
+            return self._random.random()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "MockServer":
+        self._server = _Server(("127.0.0.1", 0), _MockHandler)
+        self._server.mock = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+# Example usage
+if __name__ == "__main__":
+    with MockServer(latency=0.01, payload_size=64) as server:
+        print(f"Mock server listening on {server.url}; press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -26,6 +26,20 @@ class APIRequestError(RootException):
         error_message += f", Message: {message}"
         super().__init__(error_code=ErrorCode.API_REQUEST_FAILED, message= error_message)
 
+class CircuitOpenError(APIRequestError):
+    """
+    Custom exception raised when a request is rejected because the circuit breaker for its host is open.
+    """
+    def __init__(self, request_type: str, url: str, message: str = "Circuit breaker is open"):
+        super().__init__(request_type, url, message=message)
+
+class DeadlineExceededError(APIRequestError):
+    """
+    Custom exception raised when a request's deadline has passed before it could complete.
+    """
+    def __init__(self, request_type: str, url: str, message: str = "Deadline exceeded"):
+        super().__init__(request_type, url, message=message)
+
 class InvalidInputError(RootException):
     """
     Custom exception raised when input data is invalid.
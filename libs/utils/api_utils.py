@@ -1,13 +1,1345 @@
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+import asyncio
+import contextlib
+import contextvars
+import copy
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Union, Iterator, Iterable, BinaryIO, Tuple, Callable
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+import hashlib
+import itertools
 import logging
+import mimetypes
+import os
+import queue
+import random
+import secrets
+import socket
+import threading
+import time
 
-from libs.exceptions.custom_exceptions import APIRequestError, InvalidInputError, AuthenticationError
+from libs.exceptions.custom_exceptions import APIRequestError, CircuitOpenError, DeadlineExceededError, InvalidInputError, AuthenticationError
+from libs.utils.http_cache_utils import ResponseCache
+from libs.utils.json_utils import encode_json, decode_json
+from libs.utils.compression_utils import RequestCompression
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_IDLE_TIMEOUT = 60.0
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 30.0
+
+# Validation helper shared by the client classes below (double-underscore names are mangled inside classes).
+def _validate_positive_int(value, field_name: str):
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise InvalidInputError(field_name, f"{field_name} must be a positive integer. Received[{field_name}: {value}]")
+
+class PoolStats:
+    """
+    Thread-safe connection pool hit/miss counters, tracked per host.
+
+    A hit is a request served on an already-open keep-alive connection,
+    a miss is a request that had to open a new connection.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkouts: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    def _record_checkout(self, host: str):
+        with self._lock:
+            self._checkouts[host] = self._checkouts.get(host, 0) + 1
+
+    def _record_miss(self, host: str):
+        with self._lock:
+            self._misses[host] = self._misses.get(host, 0) + 1
+
+    @property
+    def hits(self) -> int:
+        return self.requests - self.misses
+
+    @property
+    def misses(self) -> int:
+        with self._lock:
+            return sum(self._misses.values())
+
+    @property
+    def requests(self) -> int:
+        with self._lock:
+            return sum(self._checkouts.values())
+
+    def per_host(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return the hit/miss counters broken down by host.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Mapping of host to {"hits", "misses"}.
+        """
+        with self._lock:
+            return {
+                host: {"hits": count - self._misses.get(host, 0), "misses": self._misses.get(host, 0)}
+                for host, count in self._checkouts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._checkouts.clear()
+            self._misses.clear()
+
+@dataclass
+class RequestEvent:
+    """
+    One attempt of a request as reported to request hooks. Times are in seconds; dns, connect and tls are
+    None when the attempt reused an open keep-alive connection.
+    """
+    method: str
+    url: str
+    host: str
+    attempt: int
+    status_code: Optional[int] = None
+    error: Optional[BaseException] = None
+    request_bytes: Optional[int] = None
+    response_bytes: Optional[int] = None
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    ttfb: Optional[float] = None
+    total: float = 0.0
+
+REQUEST_PHASES = ("dns", "connect", "tls", "ttfb", "total")
+
+class RequestMetrics:
+    """
+    Thread-safe request hook aggregating RequestEvents per host: status code histogram, error count,
+    byte totals and count/mean/max of each timing phase. Register it with ApiClient(hooks=[metrics]).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+
+    def __call__(self, event: RequestEvent):
+        with self._lock:
+            host = self._hosts.get(event.host)
+            if host is None:
+                host = self._hosts[event.host] = {"requests": 0, "errors": 0, "statuses": {}, "request_bytes": 0,
+                                                  "response_bytes": 0, "timings": {phase: [0, 0.0, 0.0] for phase in REQUEST_PHASES}}
+            host["requests"] += 1
+            if event.error is not None:
+                host["errors"] += 1
+            if event.status_code is not None:
+                host["statuses"][event.status_code] = host["statuses"].get(event.status_code, 0) + 1
+            host["request_bytes"] += event.request_bytes or 0
+            host["response_bytes"] += event.response_bytes or 0
+            for phase in REQUEST_PHASES:
+                value = getattr(event, phase)
+                if value is not None:
+                    timing = host["timings"][phase]
+                    timing[0] += 1
+                    timing[1] += value
+                    timing[2] = max(timing[2], value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return a copy of the aggregated metrics.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Mapping of host to {"requests", "errors", "statuses", "request_bytes",
+            "response_bytes", "timings"}, where timings maps each phase to {"count", "mean", "max"}.
+        """
+        with self._lock:
+            return {
+                name: {
+                    **{key: value for key, value in host.items() if key not in ("statuses", "timings")},
+                    "statuses": dict(host["statuses"]),
+                    "timings": {phase: {"count": count, "mean": total / count if count else 0.0, "max": maximum}
+                                for phase, (count, total, maximum) in host["timings"].items()},
+                }
+                for name, host in self._hosts.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+# The attempt being timed on this thread; the connection classes fill in its dns/connect/tls phases.
+_current_event: contextvars.ContextVar[Optional[RequestEvent]] = contextvars.ContextVar("api_utils_request_event", default=None)
+
+class _CountingPoolMixin:
+    """
+    Mixin for urllib3 connection pools that reports checkouts and new connections to a PoolStats.
+    """
+    pool_stats: PoolStats = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        self.pool_stats._record_checkout(self.host)
+        return conn
+
+    def _new_conn(self):
+        self.pool_stats._record_miss(self.host)
+        return super()._new_conn()
+
+class _TimedConnectionMixin:
+    """
+    Mixin for urllib3 connections that times DNS resolution and the TCP connect of new connections
+    while a request hook is listening. Without one it adds nothing but a context variable lookup.
+    """
+    def _new_conn(self):
+        event = _current_event.get()
+        if event is None:
+            return super()._new_conn()
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            address = None  # let urllib3 resolve again and raise its usual error
+        resolved = time.perf_counter()
+        event.dns = resolved - started
+        if address is None:
+            return super()._new_conn()
+        # Connect to the resolved address so the lookup isn't repeated; fall back to every address on failure.
+        self._dns_host = address
+        try:
+            sock = super()._new_conn()
+        except NewConnectionError:
+            self._dns_host = host
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+        event.connect = time.perf_counter() - resolved
+        return sock
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        event = _current_event.get()
+        if event is None:
+            return super().connect()
+        started = time.perf_counter()
+        super().connect()
+        event.tls = time.perf_counter() - started - (event.dns or 0.0) - (event.connect or 0.0)
+
+class _PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that counts pool hits/misses and drops connections idle for longer than idle_timeout.
+    """
+    def __init__(self, stats: PoolStats, idle_timeout: Optional[float], **kwargs):
+        self._stats = stats
+        self._idle_timeout = idle_timeout
+        self._last_used: Dict[tuple, float] = {}
+        self._last_used_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("CountingHTTPConnectionPool", (_CountingPoolMixin, HTTPConnectionPool),
+                         {"pool_stats": self._stats, "ConnectionCls": _TimedHTTPConnection}),
+            "https": type("CountingHTTPSConnectionPool", (_CountingPoolMixin, HTTPSConnectionPool),
+                          {"pool_stats": self._stats, "ConnectionCls": _TimedHTTPSConnection}),
+        }
+
+    def send(self, request, **kwargs):
+        if self._idle_timeout is not None:
+            self._evict_if_idle(request.url)
+        return super().send(request, **kwargs)
+
+    def _evict_if_idle(self, url: str):
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+        now = time.monotonic()
+        with self._last_used_lock:
+            last_used = self._last_used.get(key)
+            self._last_used[key] = now
+        if last_used is None or now - last_used <= self._idle_timeout:
+            return
+        pools = self.poolmanager.pools
+        for pool_key in pools.keys():
+            if pool_key.key_scheme != parsed.scheme or pool_key.key_host != parsed.hostname:
+                continue
+            if parsed.port is not None and pool_key.key_port != parsed.port:
+                continue
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            # Close idle keep-alive connections but keep the pool's slot count intact.
+            for _ in range(pool.pool.qsize()):
+                try:
+                    conn = pool.pool.get(block=False)
+                except queue.Empty:
+                    break
+                if conn is not None:
+                    conn.close()
+                pool.pool.put(None, block=False)
+
+DEFAULT_RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+class RetryBudget:
+    """
+    Thread-safe token bucket that caps retries as a fraction of overall traffic.
+
+    Every first attempt deposits `ratio` tokens and every retry withdraws one, with a small
+    time-based refill so low-traffic callers can still retry. During an outage the bucket drains
+    and retries stop instead of multiplying the load on the upstream.
+    """
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 1.0, max_tokens: float = 100.0):
+        """
+        Args:
+            ratio (float): Tokens deposited per request, i.e. the allowed retries per request.
+            min_retries_per_second (float): Tokens refilled per second regardless of traffic.
+            max_tokens (float): Maximum number of tokens the budget can hold.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        for name, value in (("ratio", ratio), ("min_retries_per_second", min_retries_per_second), ("max_tokens", max_tokens)):
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                raise InvalidInputError(name, f"{name} must be a non-negative number.")
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self._tokens = float(max_tokens)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated_at) * self.min_retries_per_second)
+        self._updated_at = now
+
+    def record_request(self):
+        """
+        Deposit tokens for a first attempt.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """
+        Withdraw one token for a retry.
+
+        Returns:
+            bool: True if the retry is allowed, False if the budget is exhausted.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+DEFAULT_RETRY_BUDGET = RetryBudget()
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RetryPolicy:
+    """
+    Retry configuration for the request path: exponential backoff with full jitter,
+    idempotent-method awareness, Retry-After support and a shared retry budget.
+    """
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30.0,
+                 status_codes: frozenset = DEFAULT_RETRY_STATUS_CODES, methods: frozenset = IDEMPOTENT_METHODS,
+                 respect_retry_after: bool = True, max_retry_after: float = 60.0, budget: Optional[RetryBudget] = None):
+        """
+        Args:
+            max_retries (int): Maximum number of retries after the first attempt.
+            backoff_factor (float): Base delay in seconds; attempt n waits up to backoff_factor * 2 ** n.
+            max_backoff (float): Upper bound for the computed backoff delay.
+            status_codes (frozenset): Response status codes that trigger a retry.
+            methods (frozenset): HTTP methods that may be retried after the request was sent.
+            respect_retry_after (bool): Whether to wait for the Retry-After header when present.
+            max_retry_after (float): Give up instead of retrying when Retry-After asks for longer than this.
+            budget (Optional[RetryBudget]): Budget shared by all retries. Defaults to the global DEFAULT_RETRY_BUDGET.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if not isinstance(max_retries, int) or isinstance(max_retries, bool) or max_retries < 0:
+            raise InvalidInputError("max_retries", "max_retries must be a non-negative integer.")
+        for name, value in (("backoff_factor", backoff_factor), ("max_backoff", max_backoff), ("max_retry_after", max_retry_after)):
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                raise InvalidInputError(name, f"{name} must be a non-negative number.")
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_codes = frozenset(status_codes)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.budget = budget if budget is not None else DEFAULT_RETRY_BUDGET
+
+    def is_retryable_response(self, method: str, response: requests.Response) -> bool:
+        return method in self.methods and response.status_code in self.status_codes
+
+    def is_retryable_exception(self, method: str, e: requests.exceptions.RequestException) -> bool:
+        # A connect timeout means the request never reached the server, so any method is safe to retry.
+        if isinstance(e, requests.exceptions.ConnectTimeout):
+            return True
+        return method in self.methods and isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def get_backoff(self, attempt: int, response: Optional[requests.Response] = None) -> Optional[float]:
+        """
+        Compute the delay before the next retry.
+
+        Args:
+            attempt (int): The number of retries already made.
+            response (Optional[requests.Response]): The response that triggered the retry, if any.
+
+        Returns:
+            Optional[float]: The delay in seconds, or None if Retry-After exceeds max_retry_after.
+        """
+        if self.respect_retry_after and response is not None:
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for a single upstream host.
+
+    CLOSED: requests flow and outcomes are recorded in a sliding window. When the failure rate over
+    the window reaches the threshold the breaker goes OPEN and rejects requests immediately. After
+    the cool-down it goes HALF_OPEN and lets a few trial requests through: a success closes it again,
+    a failure reopens it.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_rate_threshold: float = 0.5, window_size: int = 20, min_calls: int = 10,
+                 cooldown: float = 30.0, half_open_max_calls: int = 1):
+        """
+        Args:
+            failure_rate_threshold (float): Failure rate (0-1] over the window that opens the circuit.
+            window_size (int): Number of most recent outcomes considered.
+            min_calls (int): Minimum number of outcomes in the window before the circuit can open.
+            cooldown (float): Seconds the circuit stays open before allowing trial requests.
+            half_open_max_calls (int): Number of concurrent trial requests allowed while half-open.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if not isinstance(failure_rate_threshold, (int, float)) or not 0 < failure_rate_threshold <= 1:
+            raise InvalidInputError("failure_rate_threshold", "failure_rate_threshold must be in (0, 1].")
+        _validate_positive_int(window_size, "window_size")
+        _validate_positive_int(min_calls, "min_calls")
+        _validate_positive_int(half_open_max_calls, "half_open_max_calls")
+        if not isinstance(cooldown, (int, float)) or cooldown < 0:
+            raise InvalidInputError("cooldown", "cooldown must be a non-negative number.")
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = window_size
+        self.min_calls = min(min_calls, window_size)
+        self.cooldown = cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._outcomes = deque(maxlen=window_size)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent, reserving a trial slot when half-open.
+
+        Returns:
+            bool: True if the request may proceed, False if it must fail fast.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self._state = self.HALF_OPEN
+                self._half_open_calls = 0
+            if self._half_open_calls >= self.half_open_max_calls:
+                return False
+            self._half_open_calls += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._reset()
+            else:
+                self._record(False)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trip()
+                return
+            self._record(True)
+            if len(self._outcomes) >= self.min_calls and self._failures / len(self._outcomes) >= self.failure_rate_threshold:
+                self._trip()
+
+    def _record(self, failed: bool):
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(failed)
+        if failed:
+            self._failures += 1
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._failures = 0
+
+    def _reset(self):
+        self._state = self.CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+
+class CircuitBreakerRegistry:
+    """
+    Lazily creates and holds one CircuitBreaker per upstream host, all sharing the same settings.
+    """
+    def __init__(self, **breaker_kwargs):
+        """
+        Args:
+            **breaker_kwargs: Settings passed to every CircuitBreaker (see CircuitBreaker.__init__).
+        """
+        CircuitBreaker(**breaker_kwargs)  # validate the settings once up front
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> CircuitBreaker:
+        """
+        Return the breaker for the URL's host, creating it on first use.
+
+        Args:
+            url (str): Any URL on the host.
+
+        Returns:
+            CircuitBreaker: The host's breaker.
+        """
+        host = urlparse(url).netloc
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(host, CircuitBreaker(**self._breaker_kwargs))
+        return breaker
+
+    def states(self) -> Dict[str, str]:
+        """
+        Returns:
+            Dict[str, str]: Mapping of host to its breaker's current state.
+        """
+        return {host: breaker.state for host, breaker in list(self._breakers.items())}
+
+def _parse_rate_limit_number(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value.split(",")[0].strip())
+    except ValueError:
+        return None
+
+def _parse_rate_limit_reset(value: Optional[str]) -> Optional[float]:
+    reset = _parse_rate_limit_number(value)
+    if reset is None:
+        return None
+    # Some APIs send the reset as a Unix timestamp, others as seconds from now.
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket pacing requests to `rate` per second with bursts of up to `burst`.
+
+    Callers reserve a token and are told how long to wait for it instead of blocking inside the bucket,
+    so the same bucket paces threads (time.sleep) and coroutines (asyncio.sleep). Reservations may borrow
+    from the future, which queues concurrent callers at evenly spaced send times.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate (float): Tokens added per second, i.e. the sustained request rate.
+            burst (int): Maximum number of tokens the bucket can hold, i.e. the largest burst.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if not isinstance(rate, (int, float)) or isinstance(rate, bool) or rate <= 0:
+            raise InvalidInputError("rate", "rate must be a positive number.")
+        _validate_positive_int(burst, "burst")
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        # Refill starts from here; a paused bucket sets it in the future.
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated_at:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take one token, borrowing from the future if none is available yet.
+
+        Args:
+            max_wait (Optional[float]): Take nothing and return None if the token would not be available within
+                this many seconds. None waits as long as needed.
+
+        Returns:
+            Optional[float]: Seconds to wait before sending the request, or None if that exceeds max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._updated_at - now) + max(0.0, 1 - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def pause(self, seconds: float):
+        """
+        Hold back new requests for `seconds`, e.g. until the server's quota window resets. After the pause
+        requests resume one at a time at the bucket's rate.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now + seconds > self._updated_at:
+                self._tokens = min(self._tokens, 1.0)
+                self._updated_at = now + seconds
+
+    def limit(self, remaining: float):
+        """
+        Cap the tokens on hand at the server-reported remaining quota.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, remaining)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return self._tokens if now >= self._updated_at else min(self._tokens, 0.0)
+
+class RateLimiter:
+    """
+    Client-side rate limiter holding one TokenBucket per host, per bearer token, or per host and token.
+
+    Requests are paced before they are sent instead of running into 429 storms, and every response's
+    X-RateLimit-Remaining/X-RateLimit-Reset (or RateLimit-Remaining/RateLimit-Reset) and Retry-After
+    headers adjust the bucket, so the client follows the server's own view of the quota.
+    """
+    HOST = "host"
+    TOKEN = "token"
+    HOST_AND_TOKEN = "host_and_token"
+
+    def __init__(self, rate: float, burst: int = 1, key_by: str = HOST, max_buckets: int = 10000):
+        """
+        Args:
+            rate (float): Sustained requests per second allowed per bucket.
+            burst (int): Maximum burst size per bucket.
+            key_by (str): What a bucket is shared by: RateLimiter.HOST, RateLimiter.TOKEN (the Authorization
+                header) or RateLimiter.HOST_AND_TOKEN.
+            max_buckets (int): Maximum number of buckets kept; the least recently used ones are dropped.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        TokenBucket(rate, burst)  # validate the settings once up front
+        if key_by not in (self.HOST, self.TOKEN, self.HOST_AND_TOKEN):
+            raise InvalidInputError("key_by", f"key_by must be one of {[self.HOST, self.TOKEN, self.HOST_AND_TOKEN]}.")
+        _validate_positive_int(max_buckets, "max_buckets")
+        self.rate = rate
+        self.burst = burst
+        self.key_by = key_by
+        self.max_buckets = max_buckets
+        self.delayed = 0
+        self.waited = 0.0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, url: str, headers: Optional[Dict[str, str]]) -> str:
+        parts = []
+        if self.key_by != self.TOKEN:
+            parts.append(urlparse(url).netloc)
+        if self.key_by != self.HOST:
+            identity = CaseInsensitiveDict(headers or {}).get("Authorization", "")
+            # Key by a digest so the limiter never holds on to raw credentials.
+            parts.append(hashlib.sha256(identity.encode()).hexdigest()[:16] if identity else "")
+        return " ".join(parts)
+
+    def bucket(self, url: str, headers: Optional[Dict[str, str]] = None) -> TokenBucket:
+        """
+        Return the bucket for a request, creating it on first use.
+
+        Args:
+            url (str): The request URL.
+            headers (Optional[Dict[str, str]]): The request headers; only Authorization is looked at.
+
+        Returns:
+            TokenBucket: The request's bucket.
+        """
+        key = self._key(url, headers)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
+
+    def _reserve(self, url: str, headers: Optional[Dict[str, str]], max_wait: Optional[float]) -> Optional[float]:
+        wait = self.bucket(url, headers).reserve(max_wait)
+        if wait:
+            with self._lock:
+                self.delayed += 1
+                self.waited += wait
+        return wait
+
+    def acquire(self, url: str, headers: Optional[Dict[str, str]] = None, max_wait: Optional[float] = None) -> bool:
+        """
+        Block the calling thread until the request may be sent.
+
+        Args:
+            url (str): The request URL.
+            headers (Optional[Dict[str, str]]): The request headers.
+            max_wait (Optional[float]): Give up instead of waiting longer than this many seconds.
+
+        Returns:
+            bool: True once the request may be sent, False if it would have to wait longer than max_wait.
+        """
+        wait = self._reserve(url, headers, max_wait)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, url: str, headers: Optional[Dict[str, str]] = None, max_wait: Optional[float] = None) -> bool:
+        """
+        Asyncio variant of acquire that waits without blocking the event loop.
+        """
+        wait = self._reserve(url, headers, max_wait)
+        if wait is None:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+    def observe(self, url: str, headers: Optional[Dict[str, str]], status_code: int, response_headers):
+        """
+        Adapt the request's bucket to the server's rate limit headers.
+
+        Args:
+            url (str): The request URL.
+            headers (Optional[Dict[str, str]]): The request headers.
+            status_code (int): The response status code.
+            response_headers: The response headers (any case-insensitive mapping).
+        """
+        bucket = self.bucket(url, headers)
+        if status_code in (429, 503):
+            retry_after = _parse_retry_after(response_headers.get("Retry-After"))
+            if retry_after is not None:
+                bucket.pause(retry_after)
+                return
+        remaining = _parse_rate_limit_number(response_headers.get("X-RateLimit-Remaining", response_headers.get("RateLimit-Remaining")))
+        if remaining is None:
+            if status_code == 429:
+                bucket.pause(1 / bucket.rate)
+            return
+        if remaining >= 1:
+            bucket.limit(remaining)
+            return
+        reset = _parse_rate_limit_reset(response_headers.get("X-RateLimit-Reset", response_headers.get("RateLimit-Reset")))
+        bucket.pause(reset if reset is not None else 1 / bucket.rate)
+
+_current_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("api_utils_deadline", default=None)
+
+class Deadline:
+    """
+    Overall time budget for an operation, shared by every request, retry and backoff inside it.
+
+    Each attempt is given at most the remaining time as its connect/read timeout, so the budget shrinks
+    as work is done instead of every step starting a fresh full timeout. Used as a context manager it
+    becomes the implicit deadline of nested calls, and a Deadline created inside another one never
+    outlives its parent.
+    """
+    def __init__(self, timeout: float):
+        """
+        Args:
+            timeout (float): Seconds from now until the deadline.
+
+        Raises:
+            InvalidInputError: If the timeout is invalid.
+        """
+        if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or timeout < 0:
+            raise InvalidInputError("timeout", "timeout must be a non-negative number.")
+        self.expires_at = time.monotonic() + timeout
+        parent = _current_deadline.get()
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self._tokens: List[contextvars.Token] = []
+
+    def remaining(self) -> float:
+        """
+        Returns:
+            float: Seconds left before the deadline, never negative.
+        """
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def __enter__(self):
+        self._tokens.append(_current_deadline.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_deadline.reset(self._tokens.pop())
+
+def current_deadline() -> Optional[Deadline]:
+    """
+    Return the deadline set by the innermost enclosing `with Deadline(...)` block, if any.
+
+    Returns:
+        Optional[Deadline]: The current deadline.
+    """
+    return _current_deadline.get()
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: the first caller for a key (the leader) runs the call and
+    every caller arriving while it is in flight waits for and shares the leader's result or error.
+    """
+    def __init__(self):
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, fn, deadline: Optional[Deadline] = None, url: Optional[str] = None):
+        """
+        Run fn once for all concurrent callers using the same key.
+
+        Args:
+            key: Hashable identity of the call.
+            fn: Zero-argument callable performing the call.
+            deadline (Optional[Deadline]): This caller's time budget; a follower stops waiting for the leader when it runs out.
+            url (Optional[str]): The URL of the GET being coalesced, reported in DeadlineExceededError. Defaults to the key.
+
+        Returns:
+            The result of fn; followers receive a shallow copy so they can't disturb each other.
+
+        Raises:
+            DeadlineExceededError: If a follower's deadline passes before the leader finishes.
+            Exception: Whatever fn raised, re-raised in every waiting caller.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+            else:
+                self.followers += 1
+        if not is_leader:
+            if not flight.done.wait(deadline.remaining() if deadline is not None else None):
+                raise DeadlineExceededError("GET", url or str(key), message="Deadline exceeded waiting for an identical in-flight request")
+            if flight.error is not None:
+                raise flight.error
+            return copy.copy(flight.result)
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+class ApiClient:
+    """
+    Reusable HTTP client backed by a keep-alive requests.Session with per-host connection pools.
+
+    Reusing one client avoids paying a fresh TCP + TLS handshake on every request
+    to the same host. The call_* functions use a shared default client unless one is passed.
+    """
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 pool_block: bool = False, idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+                 retry_policy: Optional[RetryPolicy] = None, circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+                 cache: Optional[ResponseCache] = None, single_flight: Optional[SingleFlight] = None,
+                 compression: Optional[RequestCompression] = None, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT, rate_limiter: Optional[RateLimiter] = None,
+                 hooks: Optional[List[Callable[[RequestEvent], None]]] = None):
+        """
+        Args:
+            pool_connections (int): Number of per-host connection pools to keep.
+            pool_maxsize (int): Maximum number of connections kept open per host.
+            pool_block (bool): Whether to block when a host's pool is exhausted instead of opening extra connections.
+            idle_timeout (Optional[float]): Seconds after which idle connections to a host are closed. None disables it.
+            retry_policy (Optional[RetryPolicy]): Retry configuration used by the call_* functions. None disables retries.
+            circuit_breakers (Optional[CircuitBreakerRegistry]): Per-host circuit breakers. None disables them.
+            cache (Optional[ResponseCache]): HTTP cache for GET responses. None disables caching.
+            single_flight (Optional[SingleFlight]): Coalesces identical in-flight GETs (same URL, params and
+                Authorization) into one upstream request. None disables coalescing.
+            compression (Optional[RequestCompression]): Request body compression. None sends bodies uncompressed.
+                Responses are always negotiated via Accept-Encoding and decoded incrementally by urllib3.
+            connect_timeout (float): Seconds to wait for a connection to be established.
+            read_timeout (float): Seconds to wait between bytes received from the server.
+            rate_limiter (Optional[RateLimiter]): Client-side pacing per host and/or token. None disables it.
+            hooks (Optional[List[Callable[[RequestEvent], None]]]): Callbacks receiving a RequestEvent after every
+                attempt, e.g. a RequestMetrics. Requests are only timed while at least one hook is registered.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        _validate_positive_int(pool_connections, "pool_connections")
+        _validate_positive_int(pool_maxsize, "pool_maxsize")
+        if idle_timeout is not None and (not isinstance(idle_timeout, (int, float)) or idle_timeout < 0):
+            raise InvalidInputError("idle_timeout", "idle_timeout must be a non-negative number or None.")
+        if retry_policy is not None and not isinstance(retry_policy, RetryPolicy):
+            raise InvalidInputError("retry_policy", "retry_policy must be a RetryPolicy instance.")
+        if circuit_breakers is not None and not isinstance(circuit_breakers, CircuitBreakerRegistry):
+            raise InvalidInputError("circuit_breakers", "circuit_breakers must be a CircuitBreakerRegistry instance.")
+        if cache is not None and not isinstance(cache, ResponseCache):
+            raise InvalidInputError("cache", "cache must be a ResponseCache instance.")
+        if single_flight is not None and not isinstance(single_flight, SingleFlight):
+            raise InvalidInputError("single_flight", "single_flight must be a SingleFlight instance.")
+        self.retry_policy = retry_policy
+        self.circuit_breakers = circuit_breakers
+        self.cache = cache
+        if compression is not None and not isinstance(compression, RequestCompression):
+            raise InvalidInputError("compression", "compression must be a RequestCompression instance.")
+        for name, value in (("connect_timeout", connect_timeout), ("read_timeout", read_timeout)):
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+                raise InvalidInputError(name, f"{name} must be a positive number.")
+        if rate_limiter is not None and not isinstance(rate_limiter, RateLimiter):
+            raise InvalidInputError("rate_limiter", "rate_limiter must be a RateLimiter instance.")
+        self.single_flight = single_flight
+        self.compression = compression
+        self.rate_limiter = rate_limiter
+        self.hooks: List[Callable[[RequestEvent], None]] = []
+        for hook in hooks or []:
+            self.add_hook(hook)
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = PoolStats()
+        self.session = requests.Session()
+        adapter = _PooledAdapter(self.stats, idle_timeout, pool_connections=pool_connections,
+                                 pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session, applying the client's timeouts unless one is given.
+
+        Args:
+            method (str): The HTTP method (GET, POST, etc.).
+            url (str): The URL for the request.
+            **kwargs: Extra arguments forwarded to requests.Session.request.
+
+        Returns:
+            requests.Response: The response from the request.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def add_hook(self, hook: Callable[[RequestEvent], None]):
+        """
+        Register a callback that receives a RequestEvent after every attempt.
+
+        Args:
+            hook (Callable[[RequestEvent], None]): The callback. Exceptions it raises are logged and ignored.
+
+        Raises:
+            InvalidInputError: If the hook is not callable.
+        """
+        if not callable(hook):
+            raise InvalidInputError("hook", "hook must be callable.")
+        # Copy-on-write so in-flight requests can iterate the list without a lock.
+        self.hooks = self.hooks + [hook]
+
+    def remove_hook(self, hook: Callable[[RequestEvent], None]):
+        """
+        Unregister a callback added with add_hook.
+        """
+        self.hooks = [registered for registered in self.hooks if registered != hook]
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+__default_client: Optional[ApiClient] = None
+__default_client_lock = threading.Lock()
+
+def get_default_client() -> ApiClient:
+    """
+    Return the shared ApiClient used by the call_* functions, creating it on first use.
+
+    Returns:
+        ApiClient: The shared client.
+    """
+    global __default_client
+    if __default_client is None:
+        with __default_client_lock:
+            if __default_client is None:
+                __default_client = ApiClient()
+    return __default_client
+
+def set_default_client(client: Optional[ApiClient]):
+    """
+    Replace the shared ApiClient used by the call_* functions.
+
+    Args:
+        client (Optional[ApiClient]): The new default client. None resets to a lazily created one.
+    """
+    global __default_client
+    if client is not None and not isinstance(client, ApiClient):
+        raise InvalidInputError("client", "client must be an ApiClient instance.")
+    with __default_client_lock:
+        __default_client = client
+
+RequestBody = Union[Dict[str, Any], str, bytes, BinaryIO, Iterable[bytes], "MultipartUpload"]
+
+class MultipartUpload:
+    """
+    Streaming multipart/form-data body.
+
+    Files are read from disk (or from file objects) chunk by chunk while the request is sent, and the
+    total size is computed up front so the upload goes out with a Content-Length instead of chunked
+    encoding. The body can be iterated again, so retries replay it from the start.
+    """
+    def __init__(self, fields: Optional[Dict[str, str]] = None, files: Optional[Dict[str, Any]] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            fields (Optional[Dict[str, str]]): Plain form fields.
+            files (Optional[Dict[str, Any]]): Files by field name. Each value is a file path, or a tuple of
+                (filename, path or binary file object[, content type]).
+            chunk_size (int): Size of the chunks read from each file.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        _validate_positive_int(chunk_size, "chunk_size")
+        if fields is not None and not isinstance(fields, dict):
+            raise InvalidInputError("fields", "fields must be a dictionary.")
+        if files is not None and not isinstance(files, dict):
+            raise InvalidInputError("files", "files must be a dictionary.")
+        self.chunk_size = chunk_size
+        self.boundary = secrets.token_hex(16)
+        self._parts: List[Tuple[bytes, Any, int, int]] = []
+        for name, value in (fields or {}).items():
+            content = str(value).encode()
+            header = self._part_header(f'form-data; name="{name}"', None)
+            self._parts.append((header, content, 0, len(content)))
+        for name, value in (files or {}).items():
+            filename, source, content_type = self._normalize_file(name, value)
+            if isinstance(source, str):
+                start, size = 0, os.path.getsize(source)
+            else:
+                start = source.tell()
+                size = source.seek(0, os.SEEK_END) - start
+                source.seek(start)
+            header = self._part_header(f'form-data; name="{name}"; filename="{filename}"', content_type)
+            self._parts.append((header, source, start, size))
+        self._closing = f"--{self.boundary}--\r\n".encode()
+        self._length = sum(len(header) + size + 2 for header, _, _, size in self._parts) + len(self._closing)
+
+    @staticmethod
+    def _normalize_file(name: str, value: Any) -> Tuple[str, Any, str]:
+        if isinstance(value, str):
+            value = (os.path.basename(value), value)
+        if not isinstance(value, tuple) or len(value) not in (2, 3):
+            raise InvalidInputError("files", f"Invalid file specification for field '{name}'.")
+        filename, source = value[0], value[1]
+        if not isinstance(source, str) and not (hasattr(source, "read") and hasattr(source, "seek")):
+            raise InvalidInputError("files", f"File for field '{name}' must be a path or a seekable binary file object.")
+        content_type = value[2] if len(value) == 3 else (mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        return filename, source, content_type
+
+    def _part_header(self, disposition: str, content_type: Optional[str]) -> bytes:
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        return (header + "\r\n").encode()
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        for header, source, start, size in self._parts:
+            yield header
+            if isinstance(source, bytes):
+                yield source
+            elif isinstance(source, str):
+                with open(source, "rb") as f:
+                    yield from self._read_chunks(f, size)
+            else:
+                source.seek(start)
+                yield from self._read_chunks(source, size)
+            yield b"\r\n"
+        yield self._closing
+
+    def _read_chunks(self, f: BinaryIO, size: int) -> Iterator[bytes]:
+        remaining = size
+        while remaining > 0:
+            chunk = f.read(min(self.chunk_size, remaining))
+            if not chunk:
+                raise InvalidInputError("files", "File changed size while uploading.")
+            remaining -= len(chunk)
+            yield chunk
+
+@dataclass
+class RequestSpec:
+    """
+    Description of a single request for call_batch.
+    """
+    method: str
+    url: str
+    headers: Optional[Dict[str, str]] = None
+    params: Optional[Dict[str, str]] = None
+    data: Optional[Dict[str, Any]] = None
+    json: Optional[Dict[str, Any]] = None
+    token: Optional[str] = None
+
+def _to_request_spec(spec) -> RequestSpec:
+    """
+    Accept a RequestSpec or the keyword dict for one, as call_batch and acall_batch do.
+    """
+    if isinstance(spec, RequestSpec):
+        return spec
+    if not isinstance(spec, dict):
+        raise InvalidInputError("specs", f"Each spec must be a RequestSpec or a dict. Received[spec: {spec!r}]")
+    try:
+        return RequestSpec(**spec)
+    except TypeError as e:
+        raise InvalidInputError("specs", f"Invalid request spec. Received[spec: {spec!r}] Error[{e}]") from e
+
+# A page request: the URL and the query parameters to send with it.
+PageRequest = Tuple[str, Optional[Dict[str, Any]]]
+
+def _lookup(body: Any, path: Optional[str]) -> Any:
+    """
+    Follow a dotted key path ("data.items") into a decoded JSON body. None returns the body itself.
+    """
+    if path is None:
+        return body
+    for key in path.split("."):
+        if not isinstance(body, dict):
+            return None
+        body = body.get(key)
+    return body
+
+class _Pagination:
+    """
+    Base for pagination styles: builds the first page request, extracts a page's items and works out the next page.
+    """
+    def __init__(self, items_key: Optional[str] = None):
+        self.items_key = items_key
+
+    def first_request(self, url: str, params: Optional[Dict[str, Any]]) -> PageRequest:
+        return url, dict(params or {})
+
+    def items(self, body: Any) -> List[Any]:
+        items = _lookup(body, self.items_key)
+        if items is None:
+            return []
+        if not isinstance(items, list):
+            raise InvalidInputError("response", f"Expected a list of items at '{self.items_key or '<body>'}'.")
+        return items
+
+    def predict(self, request: PageRequest) -> Optional[PageRequest]:
+        """
+        Return the page after `request` without seeing its response, or None if it depends on the response.
+        Predictable styles are prefetched several pages ahead.
+        """
+        return None
+
+    def next_request(self, request: PageRequest, response: requests.Response, items: List[Any], body: Any) -> Optional[PageRequest]:
+        raise NotImplementedError
+
+class CursorPagination(_Pagination):
+    """
+    Pages linked by an opaque cursor returned in the body (e.g. {"items": [...], "next_cursor": "abc"}).
+    """
+    def __init__(self, items_key: Optional[str] = "items", next_cursor_key: str = "next_cursor", cursor_param: str = "cursor",
+                 page_size: Optional[int] = None, limit_param: str = "limit"):
+        """
+        Args:
+            items_key (Optional[str]): Dotted path to the item list in the body. None if the body is the list.
+            next_cursor_key (str): Dotted path to the next cursor in the body; an empty or missing cursor ends the iteration.
+            cursor_param (str): Query parameter the cursor is sent in.
+            page_size (Optional[int]): Page size to request. None leaves it to the server.
+            limit_param (str): Query parameter the page size is sent in.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if page_size is not None:
+            _validate_positive_int(page_size, "page_size")
+        super().__init__(items_key)
+        self.next_cursor_key = next_cursor_key
+        self.cursor_param = cursor_param
+        self.page_size = page_size
+        self.limit_param = limit_param
+
+    def first_request(self, url: str, params: Optional[Dict[str, Any]]) -> PageRequest:
+        url, params = super().first_request(url, params)
+        if self.page_size is not None:
+            params[self.limit_param] = self.page_size
+        return url, params
+
+    def next_request(self, request: PageRequest, response: requests.Response, items: List[Any], body: Any) -> Optional[PageRequest]:
+        cursor = _lookup(body, self.next_cursor_key)
+        if cursor in (None, ""):
+            return None
+        url, params = request
+        return url, {**params, self.cursor_param: cursor}
+
+class OffsetPagination(_Pagination):
+    """
+    Pages addressed by offset and limit query parameters. The iteration ends at the first short page, or
+    once `total_key` says every item was seen. Because the next offset is known up front, pages are prefetched
+    ahead; requests speculatively sent past the last page are discarded.
+    """
+    def __init__(self, items_key: Optional[str] = "items", limit: int = 100, offset_param: str = "offset",
+                 limit_param: str = "limit", start: int = 0, total_key: Optional[str] = None):
+        """
+        Args:
+            items_key (Optional[str]): Dotted path to the item list in the body. None if the body is the list.
+            limit (int): Page size to request.
+            offset_param (str): Query parameter the offset is sent in.
+            limit_param (str): Query parameter the page size is sent in.
+            start (int): Offset of the first page.
+            total_key (Optional[str]): Dotted path to the total item count in the body, if the API reports one.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        _validate_positive_int(limit, "limit")
+        if not isinstance(start, int) or isinstance(start, bool) or start < 0:
+            raise InvalidInputError("start", "start must be a non-negative integer.")
+        super().__init__(items_key)
+        self.limit = limit
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+        self.start = start
+        self.total_key = total_key
+
+    def first_request(self, url: str, params: Optional[Dict[str, Any]]) -> PageRequest:
+        url, params = super().first_request(url, params)
+        params.update({self.offset_param: self.start, self.limit_param: self.limit})
+        return url, params
+
+    def predict(self, request: PageRequest) -> Optional[PageRequest]:
+        url, params = request
+        return url, {**params, self.offset_param: params[self.offset_param] + self.limit}
+
+    def next_request(self, request: PageRequest, response: requests.Response, items: List[Any], body: Any) -> Optional[PageRequest]:
+        if len(items) < self.limit:
+            return None
+        if self.total_key is not None:
+            total = _lookup(body, self.total_key)
+            if isinstance(total, int) and request[1][self.offset_param] + self.limit >= total:
+                return None
+        return self.predict(request)
+
+class LinkHeaderPagination(_Pagination):
+    """
+    Pages linked by the RFC 8288 Link response header (`<https://...?page=2>; rel="next"`), as used by GitHub-style APIs.
+    """
+    def __init__(self, items_key: Optional[str] = None, rel: str = "next"):
+        """
+        Args:
+            items_key (Optional[str]): Dotted path to the item list in the body. None if the body is the list.
+            rel (str): Link relation pointing at the next page.
+        """
+        super().__init__(items_key)
+        self.rel = rel
+
+    def next_request(self, request: PageRequest, response: requests.Response, items: List[Any], body: Any) -> Optional[PageRequest]:
+        link = response.links.get(self.rel, {}).get("url")
+        if not link:
+            return None
+        # The link carries its own query string, so the original params are not resent.
+        return urljoin(response.url or request[0], link), None
+
 # Private functions
 def __add_token_to_headers(headers: Optional[Dict[str, str]], token: Optional[str]) -> Dict[str, str]:
     """
@@ -36,57 +1368,321 @@ def __handle_request_exception(e: requests.exceptions.RequestException, request_
     Raises:
         APIRequestError: Custom exception for API request errors.
     """
-    logger.error(f"Failed to make {request_type} request. URL: {url}, Error: {e}")
-    raise APIRequestError(request_type, url, message=str(e))
+    logger.error("Failed to make %s request. URL: %s, Error: %s", request_type, url, e)
+    status_code = getattr(getattr(e, "response", None), "status_code", None)
+    if status_code is None:
+        # aiohttp's ClientResponseError carries the status itself rather than a response.
+        status_code = getattr(e, "status", None)
+    raise APIRequestError(request_type, url, status_code=status_code if isinstance(status_code, int) else None, message=str(e))
 
-def __set_default_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+def __set_default_headers(headers: Optional[Dict[str, str]], content_type: str = 'application/json') -> Dict[str, str]:
     """
     Set default headers if none are provided.
     
     Args:
         headers (Optional[Dict[str, str]]): The headers dictionary.
+        content_type (str): The Content-Type to send. Defaults to JSON.
     
     Returns:
         Dict[str, str]: The updated headers dictionary with default headers.
     """
-    if headers is None:
-        headers = {}
-    headers['Content-Type'] = 'application/json'
+    # Copy so shared header templates are never mutated, e.g. across batch workers.
+    headers = {name: value for name, value in headers.items() if name.lower() != 'content-type'} if headers else {}
+    headers['Content-Type'] = content_type
     return headers
 
-def __call(fn, url: str, headers: Optional[Dict[str, str]] = None, token: Optional[str] = None) -> requests.Response:
+def __validate_body(data: Any, json: Any):
+    """
+    Reject requests that give both a raw/form body and a JSON body.
+
+    Args:
+        data (Any): The data argument of the request.
+        json (Any): The json argument of the request.
+
+    Raises:
+        InvalidInputError: If both are given.
+    """
+    if data is not None and json is not None:
+        raise InvalidInputError("json", "data and json can't both be given; send one body per request.")
+
+def __body_content_type(data: Any, headers: Optional[Dict[str, str]]) -> str:
+    """
+    Pick the Content-Type for a request body.
+    
+    Args:
+        data (Any): The request body passed as data.
+        headers (Optional[Dict[str, str]]): The caller's headers.
+    
+    Returns:
+        str: JSON when there is no data (a `json=` body or none), the multipart boundary type for MultipartUpload,
+        otherwise the caller's Content-Type, or the form type for dict/list form data and application/octet-stream
+        for raw and streamed bodies.
+    """
+    if isinstance(data, MultipartUpload):
+        return data.content_type
+    if data is None:
+        return 'application/json'
+    for name, value in (headers or {}).items():
+        if name.lower() == 'content-type':
+            return value
+    if isinstance(data, (dict, list, tuple)):
+        # requests and aiohttp form-encode these.
+        return 'application/x-www-form-urlencoded'
+    return 'application/octet-stream'
+
+def __body_rewinder(data: Any):
+    """
+    Return a callable that resets a request body before a retry, or None if the body cannot be replayed.
+    
+    Args:
+        data (Any): The request body passed as data.
+    
+    Returns:
+        Optional[Callable[[], None]]: The rewind function, or None for one-shot iterators and generators.
+    """
+    if data is None or isinstance(data, (str, bytes, bytearray, dict, list, tuple, MultipartUpload)):
+        return lambda: None
+    if hasattr(data, 'seek') and hasattr(data, 'tell'):
+        try:
+            position = data.tell()
+        except (OSError, ValueError):
+            return None
+        return lambda: data.seek(position)
+    return None
+
+def __fits_deadline(delay: float, deadline: Optional[Deadline]) -> bool:
+    """
+    Check whether waiting `delay` seconds still leaves time for another attempt before the deadline.
+    """
+    return deadline is None or delay < deadline.remaining()
+
+def __timed_request(client: ApiClient, event: RequestEvent, **kwargs) -> requests.Response:
+    """
+    Send one attempt while timing it, then report the filled-in event to the client's hooks.
+    
+    Args:
+        client (ApiClient): The client to send the request with.
+        event (RequestEvent): The event describing the attempt.
+        **kwargs: Arguments forwarded to the client (headers, timeout, params, data, ...).
+    
+    Returns:
+        requests.Response: The response from the request.
+    """
+    context_token = _current_event.set(event)
+    started = time.perf_counter()
+    try:
+        response = client.request(event.method, event.url, **kwargs)
+        event.status_code = response.status_code
+        event.ttfb = response.elapsed.total_seconds()
+        length = response.request.headers.get("Content-Length")
+        event.request_bytes = int(length) if length is not None else None
+        if kwargs.get("stream"):
+            length = response.headers.get("Content-Length")
+            event.response_bytes = int(length) if length is not None and length.isdigit() else None
+        else:
+            event.response_bytes = len(response.content)
+        return response
+    except requests.exceptions.RequestException as e:
+        event.error = e
+        raise
+    finally:
+        event.total = time.perf_counter() - started
+        _current_event.reset(context_token)
+        for hook in client.hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.warning("Request hook %r failed", hook, exc_info=True)
+
+def __send(client: ApiClient, method: str, url: str, headers: Dict[str, str], deadline: Optional[Deadline] = None,
+           **kwargs) -> requests.Response:
+    """
+    Send a request, applying the client's circuit breaker, rate limiter, retry policy and timeouts.
+    
+    Args:
+        client (ApiClient): The client to send the request with.
+        method (str): The HTTP method (GET, POST, etc.).
+        url (str): The URL for the request.
+        headers (Dict[str, str]): The prepared request headers.
+        deadline (Optional[Deadline]): Overall time budget; caps each attempt's timeouts, the retry backoff and rate limiter waits.
+        **kwargs: Extra arguments forwarded to the client (params, data, json, ...).
+    
+    Returns:
+        requests.Response: The response from the request.
+    
+    Raises:
+        APIRequestError: Custom exception for API request errors.
+        CircuitOpenError: If the circuit breaker for the host is open.
+        DeadlineExceededError: If the deadline passes before a response is received, or the rate limiter would delay the request past it.
+    """
+    policy = client.retry_policy
+    rewind_body = __body_rewinder(kwargs.get("data"))
+    if rewind_body is None:
+        # A streamed body from an iterator or generator is consumed by the first attempt.
+        policy = None
+    if policy is not None:
+        policy.budget.record_request()
+    breaker = client.circuit_breakers.get(url) if client.circuit_breakers is not None else None
+    limiter = client.rate_limiter
+    attempt = 0
+    while True:
+        if limiter is not None and not limiter.acquire(url, headers, deadline.remaining() if deadline is not None else None):
+            raise DeadlineExceededError(method, url, message="Deadline exceeded waiting for the rate limiter")
+        timeout = client.timeout
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                raise DeadlineExceededError(method, url)
+            timeout = (min(timeout[0], remaining), min(timeout[1], remaining))
+        # Checked last: a half-open breaker reserves a trial slot that only the request's outcome releases.
+        if breaker is not None and not breaker.allow_request():
+            raise CircuitOpenError(method, url, message=f"Circuit breaker is open for host {urlparse(url).netloc}")
+        try:
+            if client.hooks:
+                response = __timed_request(client, RequestEvent(method, url, urlparse(url).netloc, attempt),
+                                           headers=headers, timeout=timeout, **kwargs)
+            else:
+                response = client.request(method, url, headers=headers, timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if breaker is not None:
+                breaker.record_failure()
+            if policy is not None and attempt < policy.max_retries and policy.is_retryable_exception(method, e):
+                delay = policy.get_backoff(attempt)
+                if __fits_deadline(delay, deadline) and policy.budget.try_acquire():
+                    logger.warning("Retrying %s request to URL: %s after error %s in %.2fs", method, url, e, delay)
+                    time.sleep(delay)
+                    rewind_body()
+                    attempt += 1
+                    continue
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceededError(method, url, message=f"Deadline exceeded: {e}")
+            __handle_request_exception(e, method, url)
+        if limiter is not None:
+            limiter.observe(url, headers, response.status_code, response.headers)
+        if breaker is not None:
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        if policy is not None and attempt < policy.max_retries and policy.is_retryable_response(method, response):
+            delay = policy.get_backoff(attempt, response)
+            if delay is not None and __fits_deadline(delay, deadline) and policy.budget.try_acquire():
+                logger.warning("Retrying %s request to URL: %s after status code %s in %.2fs", method, url, response.status_code, delay)
+                response.close()
+                time.sleep(delay)
+                rewind_body()
+                attempt += 1
+                continue
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            # A streamed error response still holds its pooled connection until closed.
+            response.close()
+            __handle_request_exception(e, method, url)
+        logger.debug("Request to URL: %s succeeded with status code: %s", url, response.status_code)
+        return response
+
+def __cached_get(client: ApiClient, url: str, headers: Dict[str, str], params: Optional[Dict[str, str]] = None,
+                 **kwargs) -> requests.Response:
     """
-    Make an HTTP request using the provided function and parameters.
+    Serve a GET request from the client's cache, revalidating stale entries with conditional requests.
     
     Args:
-        fn: The requests function to call (e.g., requests.get).
+        client (ApiClient): The client whose cache and session are used.
+        url (str): The URL for the request.
+        headers (Dict[str, str]): The prepared request headers.
+        params (Optional[Dict[str, str]]): The query parameters for the request.
+        **kwargs: Extra arguments forwarded to the client.
+    
+    Returns:
+        requests.Response: The cached, revalidated or freshly fetched response.
+    """
+    cache = client.cache
+    key, full_url = cache.build_key(url, params, headers)
+    entry = cache.lookup(key, headers)
+    if entry is not None and entry.is_fresh():
+        cache.record_hit()
+        logger.debug("Serving GET request to URL: %s from cache", full_url)
+        return entry.to_response()
+    cache.record_miss()
+    request_headers = cache.add_validators(entry, headers) if entry is not None else headers
+    response = __send(client, "GET", url, request_headers, params=params, **kwargs)
+    if entry is not None and response.status_code == 304:
+        return cache.refresh(key, entry, response).to_response()
+    cache.store(key, headers, response)
+    return response
+
+def __call(method: str, url: str, headers: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+           client: Optional[ApiClient] = None, deadline: Optional[Deadline] = None, **kwargs) -> requests.Response:
+    """
+    Make an HTTP request through the pooled client.
+    
+    Args:
+        method (str): The HTTP method (GET, POST, etc.).
         url (str): The URL for the request.
         headers (Optional[Dict[str, str]]): The headers for the request.
         token (Optional[str]): The authorization token.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget. Defaults to the enclosing `with Deadline(...)` block, if any.
+        **kwargs: Extra arguments forwarded to the client (params, data, json, ...).
     
     Returns:
         requests.Response: The response from the request.
     
     Raises:
         APIRequestError: Custom exception for API request errors.
+        InvalidInputError: If the deadline is not a Deadline, or both data and json are given.
     """
-    headers = __set_default_headers(headers)    
+    if deadline is None:
+        deadline = current_deadline()
+    elif not isinstance(deadline, Deadline):
+        raise InvalidInputError("deadline", "deadline must be a Deadline instance.")
+    __validate_body(kwargs.get("data"), kwargs.get("json"))
+    headers = __set_default_headers(headers, __body_content_type(kwargs.get("data"), headers))
+    # Encode JSON bodies with the pluggable codec instead of requests' stdlib encoder.
+    json_body = kwargs.pop("json", None)
+    if json_body is not None:
+        kwargs["data"] = encode_json(json_body)
+    if client is None:
+        client = get_default_client()
+    if client.compression is not None and kwargs.get("data") is not None:
+        compressed = client.compression.apply(kwargs["data"])
+        if compressed is not None:
+            kwargs["data"], headers["Content-Encoding"] = compressed
     if token:
         headers = __add_token_to_headers(headers, token)
     
-    logger.info(f"Making request to URL: {url} with headers: {headers}")
+    # Headers are never logged: they carry the bearer token.
+    logger.debug("Making %s request to URL: %s", method, url)
     
-    try:
-        response = fn(url, headers=headers)
-        response.raise_for_status()
-        logger.info(f"Request to URL: {url} succeeded with status code: {response.status_code}")
-        return response
-    except requests.exceptions.RequestException as e:
-        __handle_request_exception(e, "DELETE", url)
+    if method != "GET" or kwargs.get("stream"):
+        return __send(client, method, url, headers, deadline=deadline, **kwargs)
+    if client.cache is not None:
+        fetch = lambda: __cached_get(client, url, headers, deadline=deadline, **kwargs)
+    else:
+        fetch = lambda: __send(client, method, url, headers, deadline=deadline, **kwargs)
+    if client.single_flight is None:
+        return fetch()
+    key, full_url = ResponseCache.build_key(url, kwargs.get("params"), headers)
+    return client.single_flight.do(key, fetch, deadline, full_url)
+
+def __split_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Reassemble a stream of byte chunks into lines without line terminators.
+    """
+    pending = b""
+    for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if pending:
+        yield pending.rstrip(b"\r")
 
 # Public functions      
 
-def call_get(url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict[str, str]] = None, token: Optional[str] = None) -> requests.Response:
+def call_get(url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+             client: Optional[ApiClient] = None, deadline: Optional[Deadline] = None) -> requests.Response:
     """
     Make a GET request to the specified URL.
     
@@ -95,45 +1691,68 @@ def call_get(url: str, headers: Optional[Dict[str, str]] = None, params: Optiona
         headers (Optional[Dict[str, str]]): The headers for the request.
         params (Optional[Dict[str, str]]): The query parameters for the request.
         token (Optional[str]): The authorization token.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
     
     Returns:
         requests.Response: The response from the GET request.
     """
-    return __call(requests.get, url, headers, token)
+    return __call("GET", url, headers, token, client, deadline, params=params)
 
-def call_post(url: str, data: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None, json: Optional[Dict[str, Any]] = None, token: Optional[str] = None) -> requests.Response:
+def call_post(url: str, data: Optional[RequestBody] = None, headers: Optional[Dict[str, str]] = None, json: Optional[Dict[str, Any]] = None, token: Optional[str] = None,
+              client: Optional[ApiClient] = None, files: Optional[Dict[str, Any]] = None, deadline: Optional[Deadline] = None) -> requests.Response:
     """
     Make a POST request to the specified URL.
     
     Args:
         url (str): The URL for the POST request.
-        data (Optional[Dict[str, Any]]): The form data for the request.
+        data (Optional[RequestBody]): The request body: form data as a dict, raw str/bytes, or a file object,
+            iterator or generator of bytes that is streamed without being read into memory.
         headers (Optional[Dict[str, str]]): The headers for the request.
         json (Optional[Dict[str, Any]]): The JSON payload for the request.
         token (Optional[str]): The authorization token.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        files (Optional[Dict[str, Any]]): Files to send as a streaming multipart upload (see MultipartUpload);
+            data must then be a dict of form fields or None.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
     
     Returns:
         requests.Response: The response from the POST request.
     """
-    return __call(requests.post, url, headers, token)
+    if files is not None:
+        if data is not None and not isinstance(data, dict):
+            raise InvalidInputError("data", "data must be a dict of form fields when files are given.")
+        data = MultipartUpload(fields=data, files=files)
+    return __call("POST", url, headers, token, client, deadline, data=data, json=json)
 
-def call_put(url: str, data: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None, json: Optional[Dict[str, Any]] = None, token: Optional[str] = None) -> requests.Response:
+def call_put(url: str, data: Optional[RequestBody] = None, headers: Optional[Dict[str, str]] = None, json: Optional[Dict[str, Any]] = None, token: Optional[str] = None,
+             client: Optional[ApiClient] = None, files: Optional[Dict[str, Any]] = None, deadline: Optional[Deadline] = None) -> requests.Response:
     """
     Make a PUT request to the specified URL.
     
     Args:
         url (str): The URL for the PUT request.
-        data (Optional[Dict[str, Any]]): The form data for the request.
+        data (Optional[RequestBody]): The request body: form data as a dict, raw str/bytes, or a file object,
+            iterator or generator of bytes that is streamed without being read into memory.
         headers (Optional[Dict[str, str]]): The headers for the request.
         json (Optional[Dict[str, Any]]): The JSON payload for the request.
         token (Optional[str]): The authorization token.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        files (Optional[Dict[str, Any]]): Files to send as a streaming multipart upload (see MultipartUpload);
+            data must then be a dict of form fields or None.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
     
     Returns:
         requests.Response: The response from the PUT request.
     """
-    return __call(requests.put, url, headers, token)
+    if files is not None:
+        if data is not None and not isinstance(data, dict):
+            raise InvalidInputError("data", "data must be a dict of form fields when files are given.")
+        data = MultipartUpload(fields=data, files=files)
+    return __call("PUT", url, headers, token, client, deadline, data=data, json=json)
 
-def call_delete(url: str, headers: Optional[Dict[str, str]] = None, token: Optional[str] = None) -> requests.Response:
+def call_delete(url: str, headers: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+                client: Optional[ApiClient] = None, deadline: Optional[Deadline] = None) -> requests.Response:
     """
     Make a DELETE request to the specified URL.
     
@@ -141,11 +1760,286 @@ def call_delete(url: str, headers: Optional[Dict[str, str]] = None, token: Optio
         url (str): The URL for the DELETE request.
         headers (Optional[Dict[str, str]]): The headers for the request.
         token (Optional[str]): The authorization token.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
     
     Returns:
         requests.Response: The response from the DELETE request.
     """
-    return __call(fn=requests.delete, url=url, headers=headers, token=token)
+    return __call(method="DELETE", url=url, headers=headers, token=token, client=client, deadline=deadline)
+
+def call_batch(specs: List[Union[RequestSpec, Dict[str, Any]]], max_concurrency: int = 10, max_per_host: Optional[int] = None,
+               client: Optional[ApiClient] = None, deadline: Optional[Deadline] = None) -> List[Union[requests.Response, APIRequestError, InvalidInputError]]:
+    """
+    Run many requests concurrently with bounded parallelism.
+
+    A failing request does not abort the batch: its slot in the result list holds the
+    APIRequestError, or the InvalidInputError for a body that can't be sent, instead of a response.
+
+    Args:
+        specs (List[Union[RequestSpec, Dict[str, Any]]]): The requests to run, as RequestSpec objects or dicts of its fields.
+        max_concurrency (int): Maximum number of requests in flight at once. Defaults to 10.
+        max_per_host (Optional[int]): Maximum number of requests in flight per host. None means no per-host cap.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
+
+    Raises:
+        InvalidInputError: If specs or the limits are invalid.
+
+    Returns:
+        List[Union[requests.Response, APIRequestError, InvalidInputError]]: One result per spec, in input order.
+    """
+    if not isinstance(specs, list):
+        raise InvalidInputError("specs", "specs must be a list.")
+    specs = [_to_request_spec(spec) for spec in specs]
+    _validate_positive_int(max_concurrency, "max_concurrency")
+    if max_per_host is not None:
+        _validate_positive_int(max_per_host, "max_per_host")
+    if client is None:
+        client = get_default_client()
+    if deadline is None:
+        # Worker threads don't inherit the caller's context, so capture its deadline here.
+        deadline = current_deadline()
+
+    host_limits: Dict[str, threading.BoundedSemaphore] = {}
+    if max_per_host is not None:
+        for spec in specs:
+            host = urlparse(spec.url).netloc
+            if host not in host_limits:
+                host_limits[host] = threading.BoundedSemaphore(max_per_host)
+
+    def run(spec: RequestSpec) -> Union[requests.Response, APIRequestError, InvalidInputError]:
+        with host_limits.get(urlparse(spec.url).netloc, contextlib.nullcontext()):
+            try:
+                return __call(spec.method.upper(), spec.url, spec.headers, spec.token, client, deadline,
+                              params=spec.params, data=spec.data, json=spec.json)
+            except (APIRequestError, InvalidInputError) as e:
+                return e
+
+    if not specs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(specs))) as executor:
+        return list(executor.map(run, specs))
+
+def stream_get(url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, client: Optional[ApiClient] = None, deadline: Optional[Deadline] = None) -> Iterator[bytes]:
+    """
+    Make a streaming GET request and yield the body in chunks without buffering it.
+
+    Streaming requests bypass the response cache and single-flight coalescing.
+
+    Args:
+        url (str): The URL for the GET request.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        params (Optional[Dict[str, str]]): The query parameters for the request.
+        token (Optional[str]): The authorization token.
+        chunk_size (int): Maximum size of each yielded chunk in bytes.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
+
+    Raises:
+        APIRequestError: If the request fails or the connection breaks while streaming.
+
+    Returns:
+        Iterator[bytes]: The body chunks.
+    """
+    _validate_positive_int(chunk_size, "chunk_size")
+    response = __call("GET", url, headers, token, client, deadline, params=params, stream=True)
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    except requests.exceptions.RequestException as e:
+        __handle_request_exception(e, "GET", url)
+    finally:
+        response.close()
+
+def download_to_file(url: str, destination: Union[str, BinaryIO], headers: Optional[Dict[str, str]] = None, params: Optional[Dict[str, str]] = None,
+                     token: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE, client: Optional[ApiClient] = None,
+                     deadline: Optional[Deadline] = None) -> int:
+    """
+    Stream a GET response straight into a file, keeping memory use flat regardless of size.
+
+    Args:
+        url (str): The URL for the GET request.
+        destination (Union[str, BinaryIO]): A file path, or a binary file-like object with a write method.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        params (Optional[Dict[str, str]]): The query parameters for the request.
+        token (Optional[str]): The authorization token.
+        chunk_size (int): Size of each chunk read from the network and written out.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
+
+    Raises:
+        InvalidInputError: If the destination is invalid.
+        APIRequestError: If the request fails.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    if not isinstance(destination, str) and not hasattr(destination, "write"):
+        raise InvalidInputError("destination", "destination must be a file path or a writable binary file object.")
+    chunks = stream_get(url, headers=headers, params=params, token=token, chunk_size=chunk_size, client=client, deadline=deadline)
+    # Send the request before opening the file, so a failed request leaves an existing file untouched.
+    first = next(chunks, b"")
+    with open(destination, "wb") if isinstance(destination, str) else contextlib.nullcontext(destination) as f:
+        written = 0
+        for chunk in itertools.chain((first,), chunks):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+def stream_lines(url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = "utf-8", client: Optional[ApiClient] = None,
+                 deadline: Optional[Deadline] = None) -> Iterator[str]:
+    """
+    Make a streaming GET request and yield the body line by line as it arrives.
+
+    Args:
+        url (str): The URL for the GET request.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        params (Optional[Dict[str, str]]): The query parameters for the request.
+        token (Optional[str]): The authorization token.
+        chunk_size (int): Size of each chunk read from the network.
+        encoding (str): Text encoding of the body.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
+
+    Returns:
+        Iterator[str]: The lines, without line terminators.
+    """
+    for line in __split_lines(stream_get(url, headers=headers, params=params, token=token, chunk_size=chunk_size, client=client, deadline=deadline)):
+        yield line.decode(encoding)
+
+def stream_ndjson(url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, client: Optional[ApiClient] = None, deadline: Optional[Deadline] = None) -> Iterator[Any]:
+    """
+    Make a streaming GET request and yield one decoded object per NDJSON line.
+
+    Args:
+        url (str): The URL for the GET request.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        params (Optional[Dict[str, str]]): The query parameters for the request.
+        token (Optional[str]): The authorization token.
+        chunk_size (int): Size of each chunk read from the network.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget shared with retries. Defaults to the enclosing `with Deadline(...)` block.
+
+    Raises:
+        InvalidInputError: If a line is not valid JSON.
+
+    Returns:
+        Iterator[Any]: The decoded records.
+    """
+    chunks = stream_get(url, headers=headers, params=params, token=token, chunk_size=chunk_size, client=client, deadline=deadline)
+    for line_number, line in enumerate(__split_lines(chunks), 1):
+        if not line.strip():
+            continue
+        try:
+            yield decode_json(line)
+        except InvalidInputError as e:
+            raise InvalidInputError("response", f"Invalid NDJSON at line {line_number}: {e.message}")
+
+def response_json(response: requests.Response, into: Optional[Any] = None) -> Any:
+    """
+    Decode a response body with the pluggable JSON codec, straight from the raw bytes.
+
+    Args:
+        response (requests.Response): The response to decode.
+        into (Optional[Any]): A type or factory (e.g. a dataclass) to build from the decoded object,
+            or from each element of a decoded array. None returns the raw value.
+
+    Raises:
+        InvalidInputError: If the body is not valid JSON or does not fit the target type.
+
+    Returns:
+        Any: The decoded value.
+    """
+    return decode_json(response.content, into=into)
+
+def paginate(url: str, pagination: Optional[_Pagination] = None, headers: Optional[Dict[str, str]] = None,
+             params: Optional[Dict[str, Any]] = None, token: Optional[str] = None, prefetch: int = 1,
+             max_pages: Optional[int] = None, into: Optional[Any] = None, client: Optional[ApiClient] = None,
+             deadline: Optional[Deadline] = None) -> Iterator[Any]:
+    """
+    Iterate over the items of a paginated list endpoint, fetching pages lazily as items are consumed.
+
+    While the caller processes one page, the next page(s) are already being fetched in the background:
+    one page ahead for cursor and Link-header pagination, whose next page depends on the current response,
+    and up to `prefetch` pages ahead for offset pagination.
+
+    Args:
+        url (str): The URL of the first page.
+        pagination (Optional[_Pagination]): The pagination style: CursorPagination, OffsetPagination or
+            LinkHeaderPagination. Defaults to LinkHeaderPagination.
+        headers (Optional[Dict[str, str]]): The headers for every page request.
+        params (Optional[Dict[str, Any]]): The query parameters for the first page request.
+        token (Optional[str]): The authorization token.
+        prefetch (int): Number of pages fetched ahead of the caller. 0 fetches each page only when it is needed.
+        max_pages (Optional[int]): Stop after this many pages. None means no limit.
+        into (Optional[Any]): A type or factory (e.g. a dataclass) to build each item with. None yields the raw items.
+        client (Optional[ApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget for the whole iteration. Defaults to the enclosing `with Deadline(...)` block.
+
+    Raises:
+        InvalidInputError: If any of the inputs are invalid or a page has no item list.
+        APIRequestError: If a page request fails.
+
+    Returns:
+        Iterator[Any]: The items of every page, in order.
+    """
+    if pagination is None:
+        pagination = LinkHeaderPagination()
+    elif not isinstance(pagination, _Pagination):
+        raise InvalidInputError("pagination", "pagination must be a CursorPagination, OffsetPagination or LinkHeaderPagination.")
+    if not isinstance(prefetch, int) or isinstance(prefetch, bool) or prefetch < 0:
+        raise InvalidInputError("prefetch", "prefetch must be a non-negative integer.")
+    if max_pages is not None:
+        _validate_positive_int(max_pages, "max_pages")
+    if deadline is None:
+        # Prefetch threads don't inherit the caller's context, so capture its deadline here.
+        deadline = current_deadline()
+
+    def fetch(request: PageRequest) -> requests.Response:
+        return call_get(request[0], headers=headers, params=request[1], token=token, client=client, deadline=deadline)
+
+    executor = ThreadPoolExecutor(max_workers=prefetch) if prefetch else None
+    pending: deque = deque()
+    request: Optional[PageRequest] = pagination.first_request(url, params)
+    requested = 0
+
+    def fill():
+        nonlocal request, requested
+        while request is not None and len(pending) < max(1, prefetch) and (max_pages is None or requested < max_pages):
+            pending.append((request, executor.submit(fetch, request) if executor is not None else None))
+            requested += 1
+            request = pagination.predict(request)
+
+    try:
+        fill()
+        while pending:
+            page_request, future = pending.popleft()
+            response = future.result() if future is not None else fetch(page_request)
+            body = response_json(response)
+            items = pagination.items(body)
+            next_request = pagination.next_request(page_request, response, items, body)
+            if next_request is None:
+                # Last page: drop anything prefetched beyond it.
+                for _, extra in pending:
+                    if extra is not None:
+                        extra.cancel()
+                pending.clear()
+                request = None
+            elif pagination.predict(page_request) is None:
+                request = next_request
+            fill()
+            if into is not None:
+                try:
+                    items = [into(**item) if isinstance(item, dict) else into(item) for item in items]
+                except (TypeError, ValueError) as e:
+                    raise InvalidInputError("into", f"Cannot convert page item into {getattr(into, '__name__', into)}: {e}")
+            yield from items
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     url = "https://jsonplaceholder.typicode.com/posts"
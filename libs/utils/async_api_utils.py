@@ -0,0 +1,333 @@
+import asyncio
+import contextlib
+import logging
+import weakref
+from typing import Optional, Dict, Any, List, Union
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is an optional dependency
+    aiohttp = None
+
+from libs.exceptions.custom_exceptions import APIRequestError, DeadlineExceededError, InvalidInputError, AuthenticationError
+from libs.utils.json_utils import encode_json
+from libs.utils.api_utils import __set_default_headers, __body_content_type, __validate_body, __add_token_to_headers, __handle_request_exception, DEFAULT_IDLE_TIMEOUT, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, \
+    Deadline, RateLimiter, RequestSpec, _to_request_spec, _validate_positive_int, current_deadline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ASYNC_LIMIT = 1000
+DEFAULT_ASYNC_LIMIT_PER_HOST = 0
+
+def _validate_non_negative_int(value, field_name: str):
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise InvalidInputError(field_name, f"{field_name} must be a non-negative integer. Received[{field_name}: {value}]")
+
+class AsyncApiClient:
+    """
+    Asyncio HTTP client backed by a shared aiohttp connection pool.
+
+    One client can carry thousands of concurrent in-flight requests on a single event loop.
+    Requires the optional aiohttp dependency.
+    """
+    def __init__(self, limit: int = DEFAULT_ASYNC_LIMIT, limit_per_host: int = DEFAULT_ASYNC_LIMIT_PER_HOST,
+                 idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT, rate_limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            limit (int): Maximum number of simultaneous connections. 0 means unlimited.
+            limit_per_host (int): Maximum number of simultaneous connections per host. 0 means unlimited.
+            idle_timeout (Optional[float]): Seconds to keep idle keep-alive connections open. None uses aiohttp's default.
+            connect_timeout (float): Seconds to wait for a connection to be established.
+            read_timeout (float): Seconds to wait between bytes received from the server.
+            rate_limiter (Optional[RateLimiter]): Client-side pacing per host and/or token, which may be shared
+                with sync ApiClients. None disables it.
+
+        Raises:
+            ImportError: If aiohttp is not installed.
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncApiClient requires aiohttp. Install it with `pip install aiohttp`.")
+        _validate_non_negative_int(limit, "limit")
+        _validate_non_negative_int(limit_per_host, "limit_per_host")
+        if idle_timeout is not None and (not isinstance(idle_timeout, (int, float)) or idle_timeout < 0):
+            raise InvalidInputError("idle_timeout", "idle_timeout must be a non-negative number or None.")
+        for name, value in (("connect_timeout", connect_timeout), ("read_timeout", read_timeout)):
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+                raise InvalidInputError(name, f"{name} must be a positive number.")
+        if rate_limiter is not None and not isinstance(rate_limiter, RateLimiter):
+            raise InvalidInputError("rate_limiter", "rate_limiter must be a RateLimiter instance.")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.rate_limiter = rate_limiter
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """
+        The underlying aiohttp session, created on first use inside the running event loop.
+        """
+        if self._session is None or self._session.closed:
+            connector_kwargs = {"limit": self.limit, "limit_per_host": self.limit_per_host}
+            if self.idle_timeout is not None:
+                connector_kwargs["keepalive_timeout"] = self.idle_timeout
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(**connector_kwargs),
+                                                  timeout=self.get_timeout(),
+                                                  json_serialize=lambda obj: encode_json(obj).decode())
+        return self._session
+
+    def get_timeout(self, deadline: Optional[Deadline] = None) -> "aiohttp.ClientTimeout":
+        """
+        Build the aiohttp timeout for one request, capped by the deadline's remaining time if given.
+
+        Args:
+            deadline (Optional[Deadline]): Overall time budget of the request.
+
+        Returns:
+            aiohttp.ClientTimeout: The timeout settings.
+        """
+        if deadline is None:
+            return aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+        remaining = deadline.remaining()
+        return aiohttp.ClientTimeout(total=remaining, sock_connect=min(self.connect_timeout, remaining),
+                                     sock_read=min(self.read_timeout, remaining))
+
+    async def request(self, method: str, url: str, **kwargs) -> "aiohttp.ClientResponse":
+        """
+        Send a request through the pooled session and read the full body.
+
+        Args:
+            method (str): The HTTP method (GET, POST, etc.).
+            url (str): The URL for the request.
+            **kwargs: Extra arguments forwarded to aiohttp.ClientSession.request.
+
+        Returns:
+            aiohttp.ClientResponse: The response, with its body already read.
+        """
+        async with self.session.request(method, url, **kwargs) as response:
+            await response.read()
+            return response
+
+    async def close(self):
+        """
+        Close the session and all pooled connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+__default_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncApiClient]" = weakref.WeakKeyDictionary()
+
+def get_default_async_client() -> AsyncApiClient:
+    """
+    Return the shared AsyncApiClient for the running event loop, creating it on first use.
+
+    Returns:
+        AsyncApiClient: The shared client.
+    """
+    loop = asyncio.get_running_loop()
+    client = __default_clients.get(loop)
+    if client is None:
+        client = AsyncApiClient()
+        __default_clients[loop] = client
+    return client
+
+# Private functions
+async def __acall(method: str, url: str, headers: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+                  client: Optional[AsyncApiClient] = None, deadline: Optional[Deadline] = None, **kwargs) -> "aiohttp.ClientResponse":
+    """
+    Make an asynchronous HTTP request through the pooled client.
+
+    Args:
+        method (str): The HTTP method (GET, POST, etc.).
+        url (str): The URL for the request.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        token (Optional[str]): The authorization token.
+        client (Optional[AsyncApiClient]): The client to use. Defaults to the shared client of the running loop.
+        deadline (Optional[Deadline]): Overall time budget. Defaults to the enclosing `with Deadline(...)` block, if any.
+        **kwargs: Extra arguments forwarded to the client (params, data, json, ...).
+
+    Returns:
+        aiohttp.ClientResponse: The response from the request.
+
+    Raises:
+        APIRequestError: Custom exception for API request errors.
+        DeadlineExceededError: If the deadline passes before a response is received, or the rate limiter would delay the request past it.
+        InvalidInputError: If both data and json are given.
+    """
+    if deadline is None:
+        deadline = current_deadline()
+    __validate_body(kwargs.get("data"), kwargs.get("json"))
+    headers = __set_default_headers(headers, __body_content_type(kwargs.get("data"), headers))
+    if token:
+        headers = __add_token_to_headers(headers, token)
+    if client is None:
+        client = get_default_async_client()
+
+    # Headers are never logged: they carry the bearer token.
+    logger.debug("Making %s request to URL: %s", method, url)
+
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceededError(method, url)
+    limiter = client.rate_limiter
+    if limiter is not None and not await limiter.acquire_async(url, headers, deadline.remaining() if deadline is not None else None):
+        raise DeadlineExceededError(method, url, message="Deadline exceeded waiting for the rate limiter")
+    if deadline is not None:
+        kwargs["timeout"] = client.get_timeout(deadline)
+
+    try:
+        response = await client.request(method, url, headers=headers, **kwargs)
+        if limiter is not None:
+            limiter.observe(url, headers, response.status, response.headers)
+        response.raise_for_status()
+        logger.debug("Request to URL: %s succeeded with status code: %s", url, response.status)
+        return response
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceededError(method, url, message=f"Deadline exceeded: {e!r}")
+        __handle_request_exception(e, method, url)
+
+# Public functions
+
+async def acall_get(url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+                    client: Optional[AsyncApiClient] = None, deadline: Optional[Deadline] = None) -> "aiohttp.ClientResponse":
+    """
+    Make an asynchronous GET request to the specified URL.
+
+    Args:
+        url (str): The URL for the GET request.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        params (Optional[Dict[str, str]]): The query parameters for the request.
+        token (Optional[str]): The authorization token.
+        client (Optional[AsyncApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget. Defaults to the enclosing `with Deadline(...)` block.
+
+    Returns:
+        aiohttp.ClientResponse: The response from the GET request.
+    """
+    return await __acall("GET", url, headers, token, client, deadline, params=params)
+
+async def acall_post(url: str, data: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None, json: Optional[Dict[str, Any]] = None, token: Optional[str] = None,
+                     client: Optional[AsyncApiClient] = None, deadline: Optional[Deadline] = None) -> "aiohttp.ClientResponse":
+    """
+    Make an asynchronous POST request to the specified URL.
+
+    Args:
+        url (str): The URL for the POST request.
+        data (Optional[Dict[str, Any]]): The form data for the request.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        json (Optional[Dict[str, Any]]): The JSON payload for the request.
+        token (Optional[str]): The authorization token.
+        client (Optional[AsyncApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget. Defaults to the enclosing `with Deadline(...)` block.
+
+    Returns:
+        aiohttp.ClientResponse: The response from the POST request.
+    """
+    return await __acall("POST", url, headers, token, client, deadline, data=data, json=json)
+
+async def acall_put(url: str, data: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None, json: Optional[Dict[str, Any]] = None, token: Optional[str] = None,
+                    client: Optional[AsyncApiClient] = None, deadline: Optional[Deadline] = None) -> "aiohttp.ClientResponse":
+    """
+    Make an asynchronous PUT request to the specified URL.
+
+    Args:
+        url (str): The URL for the PUT request.
+        data (Optional[Dict[str, Any]]): The form data for the request.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        json (Optional[Dict[str, Any]]): The JSON payload for the request.
+        token (Optional[str]): The authorization token.
+        client (Optional[AsyncApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget. Defaults to the enclosing `with Deadline(...)` block.
+
+    Returns:
+        aiohttp.ClientResponse: The response from the PUT request.
+    """
+    return await __acall("PUT", url, headers, token, client, deadline, data=data, json=json)
+
+async def acall_delete(url: str, headers: Optional[Dict[str, str]] = None, token: Optional[str] = None,
+                       client: Optional[AsyncApiClient] = None, deadline: Optional[Deadline] = None) -> "aiohttp.ClientResponse":
+    """
+    Make an asynchronous DELETE request to the specified URL.
+
+    Args:
+        url (str): The URL for the DELETE request.
+        headers (Optional[Dict[str, str]]): The headers for the request.
+        token (Optional[str]): The authorization token.
+        client (Optional[AsyncApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget. Defaults to the enclosing `with Deadline(...)` block.
+
+    Returns:
+        aiohttp.ClientResponse: The response from the DELETE request.
+    """
+    return await __acall(method="DELETE", url=url, headers=headers, token=token, client=client, deadline=deadline)
+
+async def acall_batch(specs: List[Union[RequestSpec, Dict[str, Any]]], max_concurrency: int = 100, max_per_host: Optional[int] = None,
+                      client: Optional[AsyncApiClient] = None, deadline: Optional[Deadline] = None) -> List[Union["aiohttp.ClientResponse", APIRequestError, InvalidInputError]]:
+    """
+    Run many requests concurrently on the event loop with bounded parallelism.
+
+    A failing request does not abort the batch: its slot in the result list holds the
+    APIRequestError, or the InvalidInputError for a body that can't be sent, instead of a response.
+
+    Args:
+        specs (List[Union[RequestSpec, Dict[str, Any]]]): The requests to run, as RequestSpec objects or dicts of its fields.
+        max_concurrency (int): Maximum number of requests in flight at once. Defaults to 100.
+        max_per_host (Optional[int]): Maximum number of requests in flight per host. None means no per-host cap.
+        client (Optional[AsyncApiClient]): The client to use. Defaults to the shared client.
+        deadline (Optional[Deadline]): Overall time budget. Defaults to the enclosing `with Deadline(...)` block.
+
+    Raises:
+        InvalidInputError: If specs or the limits are invalid.
+
+    Returns:
+        List[Union[aiohttp.ClientResponse, APIRequestError, InvalidInputError]]: One result per spec, in input order.
+    """
+    if not isinstance(specs, list):
+        raise InvalidInputError("specs", "specs must be a list.")
+    specs = [_to_request_spec(spec) for spec in specs]
+    _validate_positive_int(max_concurrency, "max_concurrency")
+    if max_per_host is not None:
+        _validate_positive_int(max_per_host, "max_per_host")
+    if client is None:
+        client = get_default_async_client()
+
+    limit = asyncio.Semaphore(max_concurrency)
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+    if max_per_host is not None:
+        for spec in specs:
+            host_limits.setdefault(urlparse(spec.url).netloc, asyncio.Semaphore(max_per_host))
+
+    async def run(spec: RequestSpec) -> Union["aiohttp.ClientResponse", APIRequestError, InvalidInputError]:
+        async with host_limits.get(urlparse(spec.url).netloc, contextlib.nullcontext()), limit:
+            try:
+                return await __acall(spec.method.upper(), spec.url, spec.headers, spec.token, client, deadline,
+                                     params=spec.params, data=spec.data, json=spec.json)
+            except (APIRequestError, InvalidInputError) as e:
+                return e
+
+    return list(await asyncio.gather(*(run(spec) for spec in specs)))
+
+if __name__ == "__main__":
+    url = "https://jsonplaceholder.typicode.com/posts"
+    token = "your_token_here"
+
+    async def main():
+        async with AsyncApiClient() as client:
+            responses = await asyncio.gather(*(acall_get(f"{url}/{i}", token=token, client=client) for i in range(1, 11)))
+            print(f"GET requests successful: Status codes {[response.status for response in responses]}")
+
+    try:
+        asyncio.run(main())
+    except (APIRequestError, InvalidInputError, AuthenticationError) as e:
+        logger.error(e)
@@ -0,0 +1,156 @@
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+DEFAULT_MIN_SIZE = 1024
+
+def _gzip_compressor(level: int):
+    # wbits=31 selects the gzip container; mtime is left at 0 so output is deterministic.
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+def _brotli_compressor(level: int):
+    import brotli
+    compressor = brotli.Compressor(quality=level)
+
+    class _Adapter:
+        def compress(self, data: bytes) -> bytes:
+            return compressor.process(data)
+
+        def flush(self) -> bytes:
+            return compressor.finish()
+
+    return _Adapter()
+
+def _zstd_compressor(level: int):
+    import zstandard
+    return zstandard.ZstdCompressor(level=level).compressobj()
+
+# Content-Encoding name -> (compressor factory, default level, valid level range)
+_CODECS: Dict[str, Tuple[Callable[[int], object], int, range]] = {
+    "gzip": (_gzip_compressor, 6, range(0, 10)),
+    "br": (_brotli_compressor, 5, range(0, 12)),
+    "zstd": (_zstd_compressor, 3, range(1, 23)),
+}
+
+def available_encodings() -> List[str]:
+    """
+    List the request body encodings usable in this environment.
+
+    Returns:
+        List[str]: Content-Encoding names; gzip is always available, br and zstd need the brotli and zstandard packages.
+    """
+    names = []
+    for name, (factory, level, _) in _CODECS.items():
+        try:
+            factory(level)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def compress(data: bytes, encoding: str = "gzip", level: Optional[int] = None) -> bytes:
+    """
+    Compress a payload in one shot.
+
+    Args:
+        data (bytes): The payload.
+        encoding (str): The Content-Encoding to produce ("gzip", "br" or "zstd").
+        level (Optional[int]): Compression level. Defaults to the codec's balanced level.
+
+    Returns:
+        bytes: The compressed payload.
+    """
+    compressor = _new_compressor(encoding, level)
+    return compressor.compress(data) + compressor.flush()
+
+def compress_stream(chunks: Iterable[bytes], encoding: str = "gzip", level: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Compress a stream of chunks incrementally, keeping memory use bounded.
+
+    Args:
+        chunks (Iterable[bytes]): The payload chunks.
+        encoding (str): The Content-Encoding to produce ("gzip", "br" or "zstd").
+        level (Optional[int]): Compression level. Defaults to the codec's balanced level.
+
+    Returns:
+        Iterator[bytes]: The compressed chunks.
+    """
+    compressor = _new_compressor(encoding, level)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+def _new_compressor(encoding: str, level: Optional[int]):
+    _validate_codec(encoding, level)
+    factory, default_level, _ = _CODECS[encoding]
+    try:
+        return factory(default_level if level is None else level)
+    except ImportError:
+        raise InvalidInputError("encoding", f"Compression '{encoding}' needs an optional package that is not installed.")
+
+def _validate_codec(encoding: str, level: Optional[int]):
+    if encoding not in _CODECS:
+        raise InvalidInputError("encoding", f"Unsupported encoding: {encoding}. Choose from {list(_CODECS)}.")
+    if level is not None and (not isinstance(level, int) or level not in _CODECS[encoding][2]):
+        raise InvalidInputError("level", f"Invalid level for {encoding}: {level}.")
+
+class RequestCompression:
+    """
+    Opt-in compression of request bodies.
+
+    Bodies smaller than min_size are sent as-is, since compressing them costs more CPU than it saves
+    bandwidth. bytes/str bodies are compressed in one shot; iterator and generator bodies only when
+    compress_streams is set, in which case they are compressed chunk by chunk.
+    """
+    def __init__(self, encoding: str = "gzip", level: Optional[int] = None, min_size: int = DEFAULT_MIN_SIZE,
+                 compress_streams: bool = False):
+        """
+        Args:
+            encoding (str): The Content-Encoding to produce ("gzip", "br" or "zstd").
+            level (Optional[int]): Compression level. Defaults to the codec's balanced level.
+            min_size (int): Smallest body size in bytes worth compressing.
+            compress_streams (bool): Whether to also compress iterator/generator bodies (size unknown up front).
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid or the codec is not installed.
+        """
+        _validate_codec(encoding, level)
+        if not isinstance(min_size, int) or min_size < 0:
+            raise InvalidInputError("min_size", "min_size must be a non-negative integer.")
+        _new_compressor(encoding, level)  # fail early if the optional package is missing
+        self.encoding = encoding
+        self.level = level
+        self.min_size = min_size
+        self.compress_streams = compress_streams
+
+    def apply(self, body) -> Optional[Tuple[Union[bytes, Iterator[bytes]], str]]:
+        """
+        Compress a request body if the policy applies to it.
+
+        Args:
+            body: The request body.
+
+        Returns:
+            Optional[Tuple[Union[bytes, Iterator[bytes]], str]]: The compressed body and its Content-Encoding,
+            or None if the body should be sent unchanged.
+        """
+        if isinstance(body, str):
+            body = body.encode()
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            if len(body) < self.min_size:
+                return None
+            return compress(bytes(body), self.encoding, self.level), self.encoding
+        if self.compress_streams and hasattr(body, "__iter__") and not hasattr(body, "read") and not isinstance(body, (dict, list, tuple)):
+            return compress_stream(body, self.encoding, self.level), self.encoding
+        return None
+
+# Example usage
+if __name__ == "__main__":
+    payload = b'{"id": 1, "name": "test"}' * 1000
+    for name in available_encodings():
+        print(f"{name}: {len(payload)} -> {len(compress(payload, name))} bytes")
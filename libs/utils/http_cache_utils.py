@@ -0,0 +1,331 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+CACHEABLE_STATUS_CODES = frozenset({200})
+
+class CachedResponse:
+    """
+    A stored GET response together with its freshness and validator metadata.
+    """
+    def __init__(self, url: str, status_code: int, reason: str, headers: Dict[str, str], content: bytes,
+                 encoding: Optional[str], stored_at: float, expires_at: float, vary: Dict[str, Optional[str]]):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = dict(headers)
+        self.content = content
+        self.encoding = encoding
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.vary = vary
+
+    @property
+    def etag(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("Last-Modified")
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.expires_at
+
+    def to_response(self) -> requests.Response:
+        """
+        Rebuild a requests.Response from the stored data.
+
+        Returns:
+            requests.Response: A response equivalent to the one originally stored.
+        """
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.reason = self.reason
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.encoding = self.encoding
+        return response
+
+    def to_dict(self) -> dict:
+        data = dict(self.__dict__)
+        data["content"] = base64.b64encode(self.content).decode("ascii")
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CachedResponse":
+        data = dict(data)
+        data["content"] = base64.b64decode(data["content"])
+        return cls(**data)
+
+class MemoryCacheBackend:
+    """
+    Thread-safe in-memory LRU store bounded by entry count and total body size.
+    """
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = 64 * 1024 * 1024):
+        """
+        Args:
+            max_entries (int): Maximum number of responses kept.
+            max_bytes (Optional[int]): Maximum total size of stored bodies. None means unbounded.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise InvalidInputError("max_entries", "max_entries must be a positive integer.")
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes < 1):
+            raise InvalidInputError("max_bytes", "max_bytes must be a positive integer or None.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse):
+        if self.max_bytes is not None and entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def delete(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskCacheBackend:
+    """
+    Store that keeps each response as a JSON file in a directory, so the cache survives restarts.
+    """
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): Directory for the cache files. Created if missing.
+
+        Raises:
+            InvalidInputError: If the directory is invalid.
+        """
+        if not isinstance(directory, str) or directory == "":
+            raise InvalidInputError("directory", "directory must be a non-empty string.")
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return CachedResponse.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def set(self, key: str, entry: CachedResponse):
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry.to_dict(), f)
+        os.replace(temp_path, path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                self.delete(name[:-len(".json")])
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class ResponseCache:
+    """
+    Opt-in HTTP cache for GET responses.
+
+    Honors Cache-Control (no-store, no-cache, max-age), Expires and Vary, and keeps ETag/Last-Modified
+    so stale entries are revalidated with conditional requests: a 304 refreshes the stored entry
+    instead of downloading the body again.
+    """
+    def __init__(self, backend=None, default_ttl: float = 0.0):
+        """
+        Args:
+            backend: Storage backend. Defaults to a MemoryCacheBackend.
+            default_ttl (float): Freshness lifetime in seconds for responses without explicit caching headers.
+                With the default of 0 such responses are only reused after a successful revalidation.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if not isinstance(default_ttl, (int, float)) or default_ttl < 0:
+            raise InvalidInputError("default_ttl", "default_ttl must be a non-negative number.")
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build_key(url: str, params: Optional[Dict[str, str]], headers: Dict[str, str]) -> Tuple[str, str]:
+        """
+        Build the cache key for a GET request.
+
+        Args:
+            url (str): The request URL.
+            params (Optional[Dict[str, str]]): The query parameters.
+            headers (Dict[str, str]): The request headers; the Authorization value scopes the entry to one identity.
+
+        Returns:
+            Tuple[str, str]: The cache key and the fully encoded URL.
+        """
+        prepared = requests.models.PreparedRequest()
+        prepared.prepare_url(url, params)
+        identity = CaseInsensitiveDict(headers).get("Authorization", "")
+        key = hashlib.sha256(f"GET {prepared.url}\n{identity}".encode()).hexdigest()
+        return key, prepared.url
+
+    def lookup(self, key: str, headers: Dict[str, str]) -> Optional[CachedResponse]:
+        """
+        Return the stored entry for the key if its Vary headers match the request.
+        """
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        request_headers = CaseInsensitiveDict(headers)
+        if any(request_headers.get(name) != value for name, value in entry.vary.items()):
+            return None
+        return entry
+
+    def add_validators(self, entry: CachedResponse, headers: Dict[str, str]) -> Dict[str, str]:
+        """
+        Return a copy of the request headers with conditional headers for revalidating the entry.
+        """
+        headers = dict(headers)
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key: str, headers: Dict[str, str], response: requests.Response) -> bool:
+        """
+        Store a response if its status and caching headers allow it.
+
+        Returns:
+            bool: True if the response was stored.
+        """
+        if response.status_code not in CACHEABLE_STATUS_CODES:
+            return False
+        vary_names = [name.strip() for name in response.headers.get("Vary", "").split(",") if name.strip()]
+        if "*" in vary_names:
+            return False
+        expires_at = self._expires_at(response.headers)
+        if expires_at is None:
+            return False
+        request_headers = CaseInsensitiveDict(headers)
+        entry = CachedResponse(
+            url=response.url, status_code=response.status_code, reason=response.reason,
+            headers=dict(response.headers), content=response.content, encoding=response.encoding,
+            stored_at=time.time(), expires_at=expires_at,
+            vary={name: request_headers.get(name) for name in vary_names},
+        )
+        if expires_at <= entry.stored_at and not (entry.etag or entry.last_modified):
+            return False
+        self.backend.set(key, entry)
+        return True
+
+    def refresh(self, key: str, entry: CachedResponse, not_modified: requests.Response) -> CachedResponse:
+        """
+        Apply a 304 Not Modified response to a stored entry and extend its freshness.
+        """
+        entry.headers.update({name: value for name, value in not_modified.headers.items()
+                              if name.lower() not in ("content-length", "content-encoding", "transfer-encoding")})
+        expires_at = self._expires_at(CaseInsensitiveDict(entry.headers))
+        entry.stored_at = time.time()
+        entry.expires_at = expires_at if expires_at is not None else entry.stored_at
+        self.backend.set(key, entry)
+        with self._lock:
+            self.revalidations += 1
+        return entry
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def clear(self):
+        self.backend.clear()
+
+    def _expires_at(self, headers) -> Optional[float]:
+        directives = _parse_cache_control(headers.get("Cache-Control"))
+        if "no-store" in directives:
+            return None
+        now = time.time()
+        if "no-cache" in directives:
+            return now
+        max_age = directives.get("max-age")
+        if max_age is not None:
+            try:
+                return now + max(0, int(max_age))
+            except ValueError:
+                return now
+        expires = _parse_http_date(headers.get("Expires"))
+        if expires is not None:
+            return expires
+        return now + self.default_ttl
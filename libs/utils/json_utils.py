@@ -0,0 +1,194 @@
+import dataclasses
+import json
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+
+class JsonCodec:
+    """
+    A named JSON backend. dumps always returns UTF-8 bytes and loads accepts bytes or str,
+    so bodies go to and from the wire without an intermediate text copy.
+    """
+    def __init__(self, name: str, dumps: Callable[[Any], bytes], loads: Callable[[Union[bytes, str]], Any]):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"JsonCodec({self.name!r})"
+
+def _stdlib_codec() -> JsonCodec:
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+    return JsonCodec("json", lambda obj: encoder.encode(obj).encode(), lambda data: json.loads(bytes(data) if isinstance(data, memoryview) else data))
+
+def _with_stdlib_fallback(name: str, dumps: Callable[[Any], bytes], loads: Callable[[Union[bytes, str]], Any],
+                          encode_errors: tuple) -> JsonCodec:
+    # Fast backends reject some documents the stdlib handles (e.g. integers beyond 64 bits, NaN literals).
+    # Retry those with the stdlib, so the backend that happens to be installed never changes what is accepted.
+    stdlib = _stdlib_codec()
+
+    def dumps_or_fallback(obj: Any) -> bytes:
+        try:
+            return dumps(obj)
+        except encode_errors:
+            return stdlib.dumps(obj)
+
+    def loads_or_fallback(data: Union[bytes, str]) -> Any:
+        try:
+            return loads(data)
+        except ValueError:
+            return stdlib.loads(data)
+
+    return JsonCodec(name, dumps_or_fallback, loads_or_fallback)
+
+def _contains_non_finite_float(obj: Any) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_contains_non_finite_float(key) or _contains_non_finite_float(value) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return any(_contains_non_finite_float(item) for item in obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return any(_contains_non_finite_float(getattr(obj, field.name)) for field in dataclasses.fields(obj))
+    return False
+
+def _orjson_codec() -> JsonCodec:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        encoded = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        # orjson writes NaN and Infinity as null where the stdlib refuses them. They can only hide behind a null,
+        # so documents without one skip the walk.
+        if b"null" in encoded and _contains_non_finite_float(obj):
+            raise ValueError("Out of range float values are not JSON compliant")
+        return encoded
+
+    return _with_stdlib_fallback("orjson", dumps, orjson.loads, (TypeError,))
+
+def _ujson_codec() -> JsonCodec:
+    import ujson
+    return _with_stdlib_fallback("ujson", lambda obj: ujson.dumps(obj, ensure_ascii=False).encode(), ujson.loads, (TypeError, OverflowError))
+
+# Fastest first; auto-detection picks the first backend that imports.
+_CODEC_FACTORIES: Dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _orjson_codec,
+    "ujson": _ujson_codec,
+    "json": _stdlib_codec,
+}
+
+__codec: Optional[JsonCodec] = None
+__codec_lock = threading.Lock()
+
+def available_json_codecs() -> List[str]:
+    """
+    List the JSON backends that can be imported in this environment.
+
+    Returns:
+        List[str]: Backend names, fastest first.
+    """
+    names = []
+    for name, factory in _CODEC_FACTORIES.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def get_json_codec() -> JsonCodec:
+    """
+    Return the active JSON codec, auto-detecting the fastest installed backend on first use.
+
+    Returns:
+        JsonCodec: The active codec.
+    """
+    global __codec
+    if __codec is None:
+        with __codec_lock:
+            if __codec is None:
+                __codec = _CODEC_FACTORIES[available_json_codecs()[0]]()
+    return __codec
+
+def set_json_codec(codec: Union[str, JsonCodec, None]):
+    """
+    Select the JSON codec used for request bodies and responses.
+
+    Args:
+        codec (Union[str, JsonCodec, None]): A backend name ("orjson", "ujson", "json"), a custom JsonCodec,
+            or None to go back to auto-detection.
+
+    Raises:
+        InvalidInputError: If the backend is unknown or not installed.
+    """
+    global __codec
+    if isinstance(codec, str):
+        factory = _CODEC_FACTORIES.get(codec)
+        if factory is None:
+            raise InvalidInputError("codec", f"Unknown JSON codec: {codec}. Choose from {list(_CODEC_FACTORIES)}.")
+        try:
+            codec = factory()
+        except ImportError:
+            raise InvalidInputError("codec", f"JSON codec '{codec}' is not installed.")
+    elif codec is not None and not isinstance(codec, JsonCodec):
+        raise InvalidInputError("codec", "codec must be a backend name, a JsonCodec or None.")
+    with __codec_lock:
+        __codec = codec
+
+def encode_json(obj: Any) -> bytes:
+    """
+    Serialize an object to JSON bytes with the active codec.
+
+    Args:
+        obj (Any): The object to serialize.
+
+    Raises:
+        InvalidInputError: If the object is not JSON serializable.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+    try:
+        return get_json_codec().dumps(obj)
+    except (TypeError, ValueError) as e:
+        raise InvalidInputError("json", f"Object is not JSON serializable: {e}")
+
+def decode_json(data: Union[bytes, str], into: Optional[Callable[..., Any]] = None) -> Any:
+    """
+    Parse JSON bytes or text with the active codec, optionally building typed objects.
+
+    Args:
+        data (Union[bytes, str]): The JSON document.
+        into (Optional[Callable[..., Any]]): A type or factory (e.g. a dataclass). A JSON object is passed as
+            keyword arguments; for a JSON array each element is converted. None returns the raw value.
+
+    Raises:
+        InvalidInputError: If the document is not valid JSON or does not fit the target type.
+
+    Returns:
+        Any: The decoded value.
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview, str)):
+        raise InvalidInputError("data", "data must be bytes or str.")
+    try:
+        value = get_json_codec().loads(data)
+    except ValueError as e:
+        raise InvalidInputError("data", f"Invalid JSON: {e}")
+    if into is None:
+        return value
+    try:
+        if isinstance(value, list):
+            return [into(**item) if isinstance(item, dict) else into(item) for item in value]
+        return into(**value) if isinstance(value, dict) else into(value)
+    except (TypeError, ValueError) as e:
+        raise InvalidInputError("into", f"Cannot convert JSON into {getattr(into, '__name__', into)}: {e}")
+
+# Example usage
+if __name__ == "__main__":
+    print(f"Available JSON codecs: {available_json_codecs()}")
+    print(f"Active JSON codec: {get_json_codec()}")
+    encoded = encode_json({"id": 1, "name": "test"})
+    print(f"Encoded: {encoded}")
+    print(f"Decoded: {decode_json(encoded)}")
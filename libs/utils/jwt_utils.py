@@ -1,21 +1,134 @@
+import hashlib
+import heapq
+import hmac
+import json
+import logging
+import math
+import os
 import secrets
+import threading
+import time
+from calendar import timegm
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
 import jwt
+from jwt import PyJWK
+from jwt.algorithms import get_default_algorithms
+from jwt.exceptions import InvalidKeyError, PyJWKError
+from jwt.utils import base64url_encode
 from datetime import datetime, timedelta, timezone
 
 from libs.exceptions.custom_exceptions import InvalidInputError, AuthenticationError
 from libs.utils.__validate import __validate_string_input, __validate_integer_input
 
+try:
+    from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+except ImportError:  # cryptography is only needed for the asymmetric algorithms
+    Encoding = NoEncryption = PrivateFormat = PublicFormat = None
+
+logger = logging.getLogger(__name__)
+
+# Every algorithm PyJWT can use in this environment; the asymmetric ones need the cryptography package.
+_ALGORITHMS = {name: algorithm for name, algorithm in get_default_algorithms().items() if name != "none"}
+DEFAULT_ALGORITHM = "HS256"
+
+def _algorithm_impl(algorithm: str):
+    if algorithm not in _ALGORITHMS:
+        hint = " (install the cryptography package for RSA/EC/EdDSA)" if algorithm in jwt.algorithms.requires_cryptography else ""
+        raise InvalidInputError("algorithm", f"Unsupported JWT algorithm: {algorithm}{hint}.")
+    return _ALGORITHMS[algorithm]
+
+class JwtKey:
+    """
+    A JWT signing/verification key parsed once for one algorithm.
+
+    Parsing a PEM key is far more expensive than using it, so build a JwtKey once at start-up and pass it
+    to generate_jwt/verify_jwt instead of the PEM string. A private key signs tokens and verifies them with
+    its public half; a public key only verifies. HMAC (HS*) keys do both.
+    """
+    def __init__(self, key: Union[str, bytes, Any], algorithm: str = DEFAULT_ALGORITHM):
+        """
+        Args:
+            key (Union[str, bytes, Any]): The HMAC secret, a PEM/SSH encoded key, or a loaded cryptography key object.
+            algorithm (str): The JWT algorithm the key is used with, e.g. "HS256", "RS256", "ES256" or "EdDSA".
+
+        Raises:
+            InvalidInputError: If the algorithm is unsupported or the key does not fit it.
+        """
+        implementation = _algorithm_impl(algorithm)
+        try:
+            prepared = implementation.prepare_key(key)
+        except (InvalidKeyError, ValueError, TypeError) as e:
+            raise InvalidInputError("key", f"Invalid key for {algorithm}: {e}")
+        public_key = getattr(prepared, "public_key", None)
+        if callable(public_key):
+            # An asymmetric private key: sign with it, verify with its public half.
+            self.signing_key, self.verification_key = prepared, public_key()
+        elif algorithm.startswith("HS"):
+            self.signing_key = self.verification_key = prepared
+        else:
+            self.signing_key, self.verification_key = None, prepared
+        self.algorithm = algorithm
+
+    @property
+    def can_sign(self) -> bool:
+        return self.signing_key is not None
 
-def generate_jwt(payload: dict, secret: str, expiration_minutes: int = 60, issued_at: datetime = None, expiration: datetime = None) -> str:
+    @cached_property
+    def fingerprint(self) -> str:
+        """
+        SHA-256 of the verification key material, identifying the key without exposing it.
+        """
+        if self.algorithm.startswith("HS"):
+            material = self.verification_key
+        else:
+            material = self.verification_key.public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+        return hashlib.sha256(material).hexdigest()
+
+    def __reduce__(self):
+        # cryptography key objects can't be pickled; ship the key as PEM so JwtKeys reach process pool workers.
+        if self.algorithm.startswith("HS"):
+            return JwtKey, (self.signing_key, self.algorithm)
+        if self.can_sign:
+            material = self.signing_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+        else:
+            material = self.verification_key.public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+        return JwtKey, (material, self.algorithm)
+
+    def __repr__(self) -> str:
+        return f"JwtKey({self.algorithm!r}, fingerprint={self.fingerprint[:16]!r})"
+
+def _resolve_key(secret: Union[str, JwtKey], algorithm: Optional[str], signing: bool) -> Tuple[Any, str]:
+    """
+    Turn the secret argument of generate_jwt/verify_jwt into a key PyJWT can use directly and its algorithm.
+    """
+    if isinstance(secret, JwtKey):
+        if algorithm is not None and algorithm != secret.algorithm:
+            raise InvalidInputError("algorithm", f"The key is for {secret.algorithm}, not {algorithm}.")
+        if signing and not secret.can_sign:
+            raise InvalidInputError("secret key", "A public key cannot sign tokens.")
+        return (secret.signing_key if signing else secret.verification_key), secret.algorithm
+    __validate_string_input(secret, "secret key")
+    algorithm = algorithm or DEFAULT_ALGORITHM
+    _algorithm_impl(algorithm)
+    return secret, algorithm
+
+def generate_jwt(payload: dict, secret: Union[str, JwtKey, "JwtKeyring"], expiration_minutes: int = 60, issued_at: datetime = None, expiration: datetime = None,
+                 algorithm: Optional[str] = None) -> str:
     """
     Generate a JSON Web Token (JWT).
 
     Args:
         payload (dict): The payload to encode in the JWT.
-        secret (str): The secret key to sign the JWT.
+        secret (Union[str, JwtKey, JwtKeyring]): The secret key, a pre-parsed JwtKey, or a keyring whose active key
+            signs the JWT and whose `kid` is stamped into its header.
         expiration_minutes (int, optional): The expiration time in minutes. Defaults to 60.
         issued_at (datetime, optional): The time the JWT is issued at. Defaults to None.
         expiration (datetime, optional): The expiration time of the JWT. Defaults to None.
+        algorithm (Optional[str]): The signing algorithm. Defaults to the JwtKey's algorithm, or HS256 for a string secret.
 
     Raises:
         InvalidInputError: If any of the inputs are invalid.
@@ -25,7 +138,11 @@ def generate_jwt(payload: dict, secret: str, expiration_minutes: int = 60, issue
     """
     if not isinstance(payload, dict):
         raise InvalidInputError("payload", "payload must be a dictionary.")
-    __validate_string_input(secret, "secret key")
+    headers = None
+    if isinstance(secret, JwtKeyring):
+        kid, secret = secret.signing_key()
+        headers = {"kid": kid}
+    key, algorithm = _resolve_key(secret, algorithm, signing=True)
     __validate_integer_input(expiration_minutes, "expiration time")
 
     if issued_at is None:
@@ -42,34 +159,785 @@ def generate_jwt(payload: dict, secret: str, expiration_minutes: int = 60, issue
     if expiration.tzinfo is None:
         raise InvalidInputError("expiration", "expiration must be a timezone-aware datetime object.")
 
-    payload.update({"exp": expiration, "iat": issued_at})
-    token = jwt.encode(payload, secret, algorithm="HS256")
+    token = jwt.encode({**payload, "exp": expiration, "iat": issued_at}, key, algorithm=algorithm, headers=headers)
     return token
 
-def verify_jwt(token: str, secret: str) -> dict:
+def _timestamp(value: datetime, field_name: str) -> int:
+    if not isinstance(value, datetime) or value.tzinfo is None:
+        raise InvalidInputError(field_name, f"{field_name} must be a timezone-aware datetime object.")
+    return timegm(value.utctimetuple())
+
+class JwtMinter:
+    """
+    Reusable JWT generator for issuing many tokens with the same key, header and static claims.
+
+    The key, header and static claims are validated and serialized once on construction; each mint() only
+    encodes the per-token claims and signs. Claim dicts passed in are never modified. Tokens are interchangeable
+    with those of generate_jwt and verify with verify_jwt. Thread-safe.
+    """
+    def __init__(self, secret: Union[str, JwtKey, "JwtKeyring"], claims: Optional[dict] = None, expiration_minutes: int = 60,
+                 algorithm: Optional[str] = None, headers: Optional[dict] = None):
+        """
+        Args:
+            secret (Union[str, JwtKey, JwtKeyring]): The secret key, a pre-parsed JwtKey, or a keyring. A keyring's key
+                active at construction signs the JWTs and its `kid` is stamped into them; create a new minter after rotating.
+            claims (Optional[dict]): Claims shared by every token, e.g. `iss` and `aud`. Per-token claims override them.
+                `exp` and `iat` differ per token and are rejected here; use expiration_minutes or mint()'s arguments.
+            expiration_minutes (int): Lifetime of each token in minutes. Defaults to 60.
+            algorithm (Optional[str]): The signing algorithm. Defaults to the JwtKey's algorithm, or HS256 for a string secret.
+            headers (Optional[dict]): Extra JOSE header fields, e.g. `kid`.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if headers is not None and not isinstance(headers, dict):
+            raise InvalidInputError("headers", "headers must be a dictionary.")
+        if isinstance(secret, JwtKeyring):
+            kid, secret = secret.signing_key()
+            headers = {**(headers or {}), "kid": kid}
+        key, self.algorithm = _resolve_key(secret, algorithm, signing=True)
+        if not isinstance(expiration_minutes, int) or isinstance(expiration_minutes, bool) or expiration_minutes < 1:
+            raise InvalidInputError("expiration_minutes", "expiration_minutes must be a positive integer.")
+        if claims is not None and not isinstance(claims, dict):
+            raise InvalidInputError("claims", "claims must be a dictionary.")
+        if claims and ("exp" in claims or "iat" in claims):
+            raise InvalidInputError("claims", "Static claims can't set exp or iat; use expiration_minutes or mint()'s issued_at and expiration.")
+        self._implementation = _algorithm_impl(self.algorithm)
+        try:
+            self._key = self._implementation.prepare_key(key)
+            header = json.dumps({**(headers or {}), "alg": self.algorithm, "typ": "JWT"}, separators=(",", ":"), sort_keys=True)
+            static = json.dumps(self.__normalize(claims or {}), separators=(",", ":"))
+        except InvalidKeyError as e:
+            raise InvalidInputError("secret key", str(e))
+        except TypeError as e:
+            raise InvalidInputError("claims", f"claims must be JSON serializable: {e}")
+        self._lifetime = expiration_minutes * 60
+        self._static_claims = json.loads(static)
+        # The static claims as a JSON object body without braces, spliced into every payload.
+        self._static_fragment = static[1:-1]
+        self._header_segment = base64url_encode(header.encode())
+
+    @staticmethod
+    def __normalize(claims: dict) -> dict:
+        # Like PyJWT, encode the registered time claims as NumericDate when given as datetimes.
+        if any(isinstance(claims.get(name), datetime) for name in ("exp", "iat", "nbf")):
+            claims = {name: _timestamp(value, name) if name in ("exp", "iat", "nbf") and isinstance(value, datetime) else value
+                      for name, value in claims.items()}
+        return claims
+
+    def mint(self, claims: Optional[dict] = None, issued_at: Optional[datetime] = None, expiration: Optional[datetime] = None) -> str:
+        """
+        Generate a JWT carrying the static claims plus `claims`.
+
+        Args:
+            claims (Optional[dict]): The per-token claims, e.g. `sub`. Not modified.
+            issued_at (Optional[datetime]): The time the JWT is issued at. Defaults to now.
+            expiration (Optional[datetime]): The expiration time of the JWT. Defaults to issued_at plus the lifetime.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+
+        Returns:
+            str: The encoded JWT.
+        """
+        iat = int(time.time()) if issued_at is None else _timestamp(issued_at, "issued_at")
+        exp = iat + self._lifetime if expiration is None else _timestamp(expiration, "expiration")
+        dynamic = {"exp": exp, "iat": iat}
+        if claims:
+            if not isinstance(claims, dict):
+                raise InvalidInputError("claims", "claims must be a dictionary.")
+            dynamic.update(self.__normalize(claims))
+        try:
+            if not self._static_fragment:
+                body = json.dumps(dynamic, separators=(",", ":"))
+            elif self._static_claims.keys().isdisjoint(dynamic):
+                body = f'{json.dumps(dynamic, separators=(",", ":"))[:-1]},{self._static_fragment}}}'
+            else:
+                body = json.dumps({**self._static_claims, **dynamic}, separators=(",", ":"))
+        except TypeError as e:
+            raise InvalidInputError("claims", f"claims must be JSON serializable: {e}")
+        signing_input = self._header_segment + b"." + base64url_encode(body.encode())
+        return (signing_input + b"." + base64url_encode(self._implementation.sign(signing_input, self._key))).decode()
+
+class JwtVerificationCache:
+    """
+    Thread-safe bounded LRU of verified JWT claims, keyed by a digest of the token and the secret.
+
+    A cached token is served without re-checking its signature until its `exp` (or max_ttl, whichever
+    comes first), so hot bearer tokens are only verified once. Failed verifications are never cached.
+    Returned claims are shallow copies; treat nested values as read-only.
+    """
+    def __init__(self, max_entries: int = 10000, max_ttl: Optional[float] = 300.0):
+        """
+        Args:
+            max_entries (int): Maximum number of tokens kept.
+            max_ttl (Optional[float]): Longest time in seconds a token is served from the cache, also for tokens
+                without `exp`. None caches until `exp`, and tokens without `exp` until evicted.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if not isinstance(max_entries, int) or isinstance(max_entries, bool) or max_entries < 1:
+            raise InvalidInputError("max_entries", "max_entries must be a positive integer.")
+        if max_ttl is not None and (not isinstance(max_ttl, (int, float)) or isinstance(max_ttl, bool) or max_ttl <= 0):
+            raise InvalidInputError("max_ttl", "max_ttl must be a positive number or None.")
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str, secret: Union[str, JwtKey], algorithm: Optional[str]) -> bytes:
+        # Only a digest is kept, so neither the token nor the secret is held in memory by the cache.
+        identity = f"{secret.algorithm}:{secret.fingerprint}" if isinstance(secret, JwtKey) else secret
+        return hashlib.sha256(f"{algorithm or ''}|{len(identity)}:{identity}:{token}".encode()).digest()
+
+    def get(self, token: str, secret: Union[str, JwtKey], algorithm: Optional[str] = None) -> Optional[dict]:
+        """
+        Return the cached claims of a token previously verified with the same key and algorithm, if still valid.
+
+        Returns:
+            Optional[dict]: A copy of the claims, or None on a miss.
+        """
+        key = self._key(token, secret, algorithm)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() < entry[0]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, secret: Union[str, JwtKey], claims: dict, algorithm: Optional[str] = None):
+        """
+        Cache the claims of a token that has just been verified.
+        """
+        now = time.time()
+        expires_at = float("inf") if self.max_ttl is None else now + self.max_ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+        key = self._key(token, secret, algorithm)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+JwksSource = Union[str, dict, Callable[[], dict]]
+
+class _KeyIndex:
+    """
+    Verification keys indexed by `kid`, shared by JwksKeySet and JwtKeyring. `_keys` is only ever replaced,
+    never mutated, so lookups need no lock.
+    """
+    _keys: Dict[Optional[str], JwtKey]
+
+    def get(self, kid: Optional[str]) -> Optional[JwtKey]:
+        return self._keys.get(kid)
+
+    def _untagged_key(self) -> Optional[JwtKey]:
+        keys = self._keys
+        return next(iter(keys.values())) if len(keys) == 1 else None
+
+    def key_for_token(self, token: str) -> JwtKey:
+        """
+        Select the key a token was signed with by the `kid` in its header. A token without `kid` is accepted
+        only when the index holds a single key.
+
+        Raises:
+            AuthenticationError: If the token header is malformed or names no known key.
+        """
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError:
+            raise AuthenticationError("Invalid JWT.")
+        key = self._untagged_key() if kid is None else self.get(kid)
+        if key is None:
+            raise AuthenticationError("Unknown JWT key id.")
+        return key
+
+    @property
+    def kids(self) -> List[Optional[str]]:
+        return list(self._keys)
+
+    def __contains__(self, kid: Optional[str]) -> bool:
+        return kid in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+class JwksKeySet(_KeyIndex):
+    """
+    Keys of a JSON Web Key Set (JWKS) indexed by `kid`, for verifying tokens from an identity provider.
+
+    The set is loaded once on construction and then refreshed by a background thread, so verification only
+    ever does a dict lookup and never waits on the network. A token with an unknown `kid` (e.g. right after the
+    provider rotated its keys) is rejected immediately and schedules a refetch, at most once per
+    `min_refetch_interval`. Keys whose JWK is unchanged between fetches are reused instead of re-parsed.
+
+    Pass the set as the `secret` of verify_jwt or verify_jwt_batch, and close() it when done.
+    """
+    def __init__(self, source: JwksSource, refresh_interval: Optional[float] = 300.0, min_refetch_interval: float = 30.0, client=None):
+        """
+        Args:
+            source (JwksSource): An http(s) URL, a path to a JSON file, a JWKS dict, or a callable returning one.
+            refresh_interval (Optional[float]): Seconds between background refreshes. None only refetches on unknown `kid`s.
+            min_refetch_interval (float): Minimum seconds between refetches triggered by unknown `kid`s.
+            client (Optional[ApiClient]): The api_utils client used to fetch a URL source. Defaults to the shared client.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid, or the initial key set holds no usable key.
+            APIRequestError: If the initial fetch of a URL source fails.
+        """
+        if not isinstance(source, (str, dict)) and not callable(source):
+            raise InvalidInputError("source", "source must be a URL, a file path, a JWKS dict or a callable.")
+        if refresh_interval is not None and (not isinstance(refresh_interval, (int, float)) or refresh_interval <= 0):
+            raise InvalidInputError("refresh_interval", "refresh_interval must be a positive number or None.")
+        if not isinstance(min_refetch_interval, (int, float)) or min_refetch_interval < 0:
+            raise InvalidInputError("min_refetch_interval", "min_refetch_interval must be a non-negative number.")
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self.client = client
+        self.fetches = 0
+        self.last_refreshed: Optional[float] = None
+        # Replaced wholesale on refresh, so lookups read it without taking a lock.
+        self._keys: Dict[Optional[str], JwtKey] = {}
+        self._parsed: Dict[str, JwtKey] = {}
+        self._refresh_lock = threading.Lock()
+        self._last_fetch_started = 0.0
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self.refresh()
+        if not self._keys:
+            raise InvalidInputError("source", "The key set holds no usable keys.")
+        self._thread = threading.Thread(target=self._run, name="jwks-refresh", daemon=True)
+        self._thread.start()
+
+    def _fetch(self) -> dict:
+        source = self.source
+        if isinstance(source, dict):
+            return source
+        if callable(source):
+            return source()
+        if source.startswith(("http://", "https://")):
+            # Imported here so jwt_utils doesn't pull in requests unless a URL source is used.
+            from libs.utils.api_utils import call_get
+            return call_get(source, client=self.client).json()
+        with open(source, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def refresh(self):
+        """
+        Fetch the key set now and swap it in. Verification keeps using the previous keys until this returns.
+
+        Raises:
+            InvalidInputError: If the document is not a JWKS.
+            APIRequestError: If fetching a URL source fails.
+        """
+        with self._refresh_lock:
+            self._last_fetch_started = time.monotonic()
+            self.fetches += 1
+            try:
+                document = self._fetch()
+            except (OSError, ValueError) as e:
+                raise InvalidInputError("source", f"Failed to load the JWKS: {e}")
+            if not isinstance(document, dict) or not isinstance(document.get("keys"), list):
+                raise InvalidInputError("source", "A JWKS document must be an object with a 'keys' list.")
+            keys, parsed = {}, {}
+            for jwk in document["keys"]:
+                if not isinstance(jwk, dict) or jwk.get("use", "sig") != "sig":
+                    continue
+                fingerprint = json.dumps(jwk, sort_keys=True)
+                key = self._parsed.get(fingerprint)
+                if key is None:
+                    try:
+                        parsed_jwk = PyJWK(jwk)
+                        key = JwtKey(parsed_jwk.key, parsed_jwk.algorithm_name)
+                    except (PyJWKError, InvalidKeyError, InvalidInputError) as e:
+                        logger.warning("Skipping unusable JWK %s: %s", jwk.get("kid"), e)
+                        continue
+                parsed[fingerprint] = key
+                keys[jwk.get("kid")] = key
+            self._keys, self._parsed = keys, parsed
+            self.last_refreshed = time.time()
+
+    def _run(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if self._closed.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the keys we have; the provider may only be briefly unavailable.
+                logger.warning("Failed to refresh the JWKS from %s: %s", self._describe_source(), e)
+
+    def _describe_source(self) -> str:
+        return self.source if isinstance(self.source, str) else type(self.source).__name__
+
+    def _request_refetch(self):
+        if time.monotonic() - self._last_fetch_started >= self.min_refetch_interval:
+            self._wake.set()
+
+    def get(self, kid: Optional[str]) -> Optional[JwtKey]:
+        """
+        Return the key with this `kid`, or None. An unknown `kid` schedules a rate-limited background refetch.
+        """
+        key = self._keys.get(kid)
+        if key is None:
+            self._request_refetch()
+        return key
+
+    def close(self):
+        """
+        Stop the background refresh thread.
+        """
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class JwtKeyring(_KeyIndex):
+    """
+    Signing keys identified by `kid`, for rotating keys without downtime or extra verification cost.
+
+    generate_jwt and JwtMinter sign with the active key and stamp its `kid` into the token header; verify_jwt
+    picks the key by that `kid` with one dict lookup, however many keys are held. To rotate: add() the new key
+    everywhere, activate() it on the issuers (the old key becomes retiring and keeps verifying outstanding
+    tokens), then remove() the old key once its tokens have expired. Thread-safe.
+    """
+    def __init__(self, keys: Optional[Dict[str, Union[str, JwtKey]]] = None, active_kid: Optional[str] = None,
+                 algorithm: str = DEFAULT_ALGORITHM, untagged_kid: Optional[str] = None):
+        """
+        Args:
+            keys (Optional[Dict[str, Union[str, JwtKey]]]): Keys by `kid`; string secrets become `algorithm` keys.
+            active_kid (Optional[str]): The key new tokens are signed with. Required if keys are given.
+            algorithm (str): The algorithm of keys given as string secrets.
+            untagged_kid (Optional[str]): The key that verifies tokens without a `kid` header, e.g. ones issued
+                before the keyring was introduced.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if keys is not None and not isinstance(keys, dict):
+            raise InvalidInputError("keys", "keys must be a dictionary.")
+        _algorithm_impl(algorithm)
+        self.algorithm = algorithm
+        self.untagged_kid = untagged_kid
+        self._keys: Dict[Optional[str], JwtKey] = {}
+        self._active: Optional[Tuple[str, JwtKey]] = None
+        self._lock = threading.Lock()
+        for kid, key in (keys or {}).items():
+            self.add(kid, key)
+        if self._keys or active_kid is not None:
+            self.activate(active_kid)
+
+    def add(self, kid: str, key: Union[str, JwtKey], activate: bool = False):
+        """
+        Add a key, which verifies tokens right away and signs them once activated.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if not isinstance(kid, str) or not kid:
+            raise InvalidInputError("kid", "kid must be a non-empty string.")
+        if not isinstance(key, JwtKey):
+            if not isinstance(key, str):
+                raise InvalidInputError("secret key", "key must be a string secret or a JwtKey.")
+            key = JwtKey(key, self.algorithm)
+        with self._lock:
+            if self._active is not None and self._active[0] == kid:
+                raise InvalidInputError("kid", f"Activate another key before replacing the active key {kid}.")
+            self._keys = {**self._keys, kid: key}
+        if activate:
+            self.activate(kid)
+
+    def activate(self, kid: str):
+        """
+        Sign new tokens with this key. The previously active key keeps verifying until removed.
+
+        Raises:
+            InvalidInputError: If the key is unknown or can't sign.
+        """
+        with self._lock:
+            key = self._keys.get(kid)
+            if key is None:
+                raise InvalidInputError("active_kid", f"Unknown key id: {kid}.")
+            if not key.can_sign:
+                raise InvalidInputError("active_kid", f"The key {kid} cannot sign tokens.")
+            self._active = (kid, key)
+
+    def remove(self, kid: str):
+        """
+        Stop accepting tokens signed with a retiring key.
+
+        Raises:
+            InvalidInputError: If the key is the active one.
+        """
+        with self._lock:
+            if self._active is not None and self._active[0] == kid:
+                raise InvalidInputError("kid", f"Cannot remove the active key {kid}.")
+            self._keys = {name: key for name, key in self._keys.items() if name != kid}
+
+    def signing_key(self) -> Tuple[str, JwtKey]:
+        """
+        Returns:
+            Tuple[str, JwtKey]: The active `kid` and key, read together.
+
+        Raises:
+            InvalidInputError: If no key is active.
+        """
+        active = self._active
+        if active is None:
+            raise InvalidInputError("secret key", "The keyring has no active key.")
+        return active
+
+    @property
+    def active_kid(self) -> Optional[str]:
+        return self._active[0] if self._active is not None else None
+
+    @property
+    def retiring_kids(self) -> List[str]:
+        return [kid for kid in self._keys if kid != self.active_kid]
+
+    def _untagged_key(self) -> Optional[JwtKey]:
+        if self.untagged_kid is not None:
+            return self._keys.get(self.untagged_kid)
+        return super()._untagged_key()
+
+class RevocationList:
+    """
+    Thread-safe in-memory set of revoked token ids (`jti`), for verify_jwt's `revocation` argument.
+
+    Each id is kept until the revoked token's own `exp`: after that the token is rejected as expired anyway,
+    so prune() can drop it. Lookups are a single dict probe.
+    """
+    def __init__(self, entries: Optional[Iterable[Tuple[str, Optional[float]]]] = None):
+        """
+        Args:
+            entries (Optional[Iterable[Tuple[str, Optional[float]]]]): (jti, exp) pairs to load, as for revoke_many().
+        """
+        self._expiries: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        if entries is not None:
+            self.revoke_many(entries)
+
+    def revoke(self, jti: str, expires_at: Optional[float] = None):
+        """
+        Revoke a token id.
+
+        Args:
+            jti (str): The `jti` claim of the token.
+            expires_at (Optional[float]): The token's `exp` as a Unix timestamp. None keeps the id until removed.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        self.revoke_many([(jti, expires_at)])
+
+    def revoke_many(self, entries: Iterable[Tuple[str, Optional[float]]]):
+        """
+        Revoke many token ids at once, e.g. to load a denylist at start-up.
+
+        Args:
+            entries (Iterable[Tuple[str, Optional[float]]]): (jti, exp) pairs as for revoke().
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        loaded = []
+        for jti, expires_at in entries:
+            if not isinstance(jti, str) or not jti:
+                raise InvalidInputError("jti", "jti must be a non-empty string.")
+            if expires_at is not None and (not isinstance(expires_at, (int, float)) or isinstance(expires_at, bool)):
+                raise InvalidInputError("expires_at", "expires_at must be a Unix timestamp or None.")
+            loaded.append((jti, float("inf") if expires_at is None else float(expires_at)))
+        with self._lock:
+            for jti, expires_at in loaded:
+                if expires_at > self._expiries.get(jti, float("-inf")):
+                    self._expiries[jti] = expires_at
+                    if expires_at != float("inf"):
+                        heapq.heappush(self._heap, (expires_at, jti))
+
+    def remove(self, jti: str):
+        with self._lock:
+            self._expiries.pop(jti, None)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Drop the ids of tokens that have expired.
+
+        Args:
+            now (Optional[float]): The current Unix time. Defaults to time.time().
+
+        Returns:
+            int: The number of ids dropped.
+        """
+        now = time.time() if now is None else now
+        dropped = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, jti = heapq.heappop(self._heap)
+                # Skip heap entries superseded by a later revoke() with a longer expiry, or removed.
+                if self._expiries.get(jti) == expires_at:
+                    del self._expiries[jti]
+                    dropped += 1
+        return dropped
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._expiries
+
+    def jtis(self) -> List[str]:
+        with self._lock:
+            return list(self._expiries)
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._expiries
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+class BloomRevocationFilter:
+    """
+    Compact Bloom filter in front of an exact revocation store, e.g. a database table or a RevocationList.
+
+    A token id the filter has never seen, which is almost every id, is answered "not revoked" from memory
+    without touching the store. Only filter hits are confirmed with `confirm`, which also weeds out the filter's
+    false positives, so answers are exact. Bloom filters can't forget: rebuild() the filter after pruning the store.
+    """
+    def __init__(self, confirm: Callable[[str], bool], capacity: int = 100000, false_positive_rate: float = 0.001):
+        """
+        Args:
+            confirm (Callable[[str], bool]): The exact check, returning whether a jti is revoked.
+            capacity (int): Number of ids the filter is sized for; beyond it the false positive rate rises.
+            false_positive_rate (float): Target fraction (0, 1) of unrevoked ids that need confirming at capacity.
+
+        Raises:
+            InvalidInputError: If any of the inputs are invalid.
+        """
+        if not callable(confirm):
+            raise InvalidInputError("confirm", "confirm must be callable.")
+        if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity < 1:
+            raise InvalidInputError("capacity", "capacity must be a positive integer.")
+        if not isinstance(false_positive_rate, float) or not 0 < false_positive_rate < 1:
+            raise InvalidInputError("false_positive_rate", "false_positive_rate must be a float between 0 and 1.")
+        self.confirm = confirm
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.size_bits = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size_bits / capacity * math.log(2)))
+        self.confirmations = 0
+        self.false_positives = 0
+        self._bits = bytearray((self.size_bits + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, jti: str) -> List[int]:
+        # Double hashing: k positions from the two halves of one digest.
+        digest = hashlib.blake2b(jti.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size_bits for i in range(self.hash_count)]
+
+    def add(self, jti: str):
+        """
+        Add a revoked id. Revoke it in the exact store too, or confirm() will not confirm it.
+        """
+        self.add_many([jti])
+
+    def add_many(self, jtis: Iterable[str]):
+        """
+        Add many revoked ids at once, e.g. the store's contents at start-up.
+        """
+        positions = [position for jti in jtis for position in self._positions(jti)]
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+
+    def rebuild(self, jtis: Iterable[str]):
+        """
+        Replace the filter's contents, dropping ids pruned from the store since the last build.
+        """
+        bits = bytearray(len(self._bits))
+        for jti in jtis:
+            for position in self._positions(jti):
+                bits[position >> 3] |= 1 << (position & 7)
+        with self._lock:
+            self._bits = bits
+
+    def might_contain(self, jti: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(jti))
+
+    def is_revoked(self, jti: str) -> bool:
+        if not self.might_contain(jti):
+            return False
+        self.confirmations += 1
+        revoked = bool(self.confirm(jti))
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+def _check_revocation(claims: dict, revocation) -> dict:
+    jti = claims.get("jti")
+    if revocation is not None and isinstance(jti, str) and revocation.is_revoked(jti):
+        raise AuthenticationError("The JWT has been revoked.")
+    return claims
+
+RevocationStore = Union[RevocationList, BloomRevocationFilter]
+
+def verify_jwt(token: str, secret: Union[str, JwtKey, JwksKeySet, JwtKeyring], cache: Optional[JwtVerificationCache] = None, algorithm: Optional[str] = None,
+               revocation: Optional[RevocationStore] = None) -> dict:
     """
     Verify a JSON Web Token (JWT).
 
     Args:
         token (str): The JWT to verify.
-        secret (str): The secret key to verify the JWT.
+        secret (Union[str, JwtKey, JwksKeySet, JwtKeyring]): The secret key, a pre-parsed JwtKey, or a key set or keyring
+            to pick the key from by `kid`.
+        cache (Optional[JwtVerificationCache]): Cache of already verified tokens. None verifies every call.
+        algorithm (Optional[str]): The only algorithm accepted. Defaults to the JwtKey's algorithm, or HS256 for a string secret.
+        revocation (Optional[RevocationStore]): Store of revoked `jti`s, checked after the signature, also for cached tokens.
+            Any object with an `is_revoked(jti)` method works. Tokens without a `jti` can't be revoked.
 
     Raises:
-        AuthenticationError: If the JWT is invalid or expired.
+        AuthenticationError: If the JWT is invalid, expired or revoked.
+        InvalidInputError: If any of the inputs are invalid.
 
     Returns:
         dict: The decoded payload.
     """
     __validate_string_input(token, "JWT")
-    __validate_string_input(secret, "secret key")
+    if isinstance(secret, _KeyIndex):
+        secret = secret.key_for_token(token)
+    key, resolved_algorithm = _resolve_key(secret, algorithm, signing=False)
+    if cache is not None:
+        payload = cache.get(token, secret, algorithm)
+        if payload is not None:
+            return _check_revocation(payload, revocation)
+    payload = __decode_jwt(token, key, resolved_algorithm)
+    if cache is not None:
+        cache.put(token, secret, payload, algorithm)
+    return _check_revocation(payload, revocation)
+
+def __decode_jwt(token: str, key: Any, algorithm: str) -> dict:
     try:
-        payload = jwt.decode(token, secret, algorithms=["HS256"])
-        return payload
+        return jwt.decode(token, key, algorithms=[algorithm])
     except jwt.ExpiredSignatureError:
         raise AuthenticationError("The JWT signature has expired.")
     except jwt.InvalidTokenError:
         raise AuthenticationError("Invalid JWT.")
 
+def __try_decode_jwts(tokens: List[str], secret: Union[str, JwtKey], algorithm: Optional[str]) -> List[Tuple[bool, Union[dict, str]]]:
+    # Runs in pool workers: return outcomes instead of raising so they cross process boundaries as plain data.
+    key, algorithm = _resolve_key(secret, algorithm, signing=False)
+    outcomes = []
+    for token in tokens:
+        try:
+            outcomes.append((True, __decode_jwt(token, key, algorithm)))
+        except AuthenticationError as e:
+            outcomes.append((False, e.message))
+    return outcomes
+
+def verify_jwt_batch(tokens: List[str], secret: Union[str, JwtKey, JwksKeySet, JwtKeyring], max_workers: Optional[int] = None, use_processes: bool = False,
+                     cache: Optional[JwtVerificationCache] = None, algorithm: Optional[str] = None,
+                     revocation: Optional[RevocationStore] = None) -> List[Union[dict, AuthenticationError]]:
+    """
+    Verify many JSON Web Tokens at once.
+
+    Duplicate tokens are verified only once and the unique ones are spread over a worker pool. A bad
+    token does not fail the batch: its slot holds the AuthenticationError instead of the claims.
+
+    Args:
+        tokens (List[str]): The JWTs to verify.
+        secret (Union[str, JwtKey, JwksKeySet, JwtKeyring]): The secret key, a pre-parsed JwtKey, or a key set or keyring
+            to pick each token's key from by `kid`.
+        max_workers (Optional[int]): Pool size. None uses the executor's default; 1 verifies inline.
+        use_processes (bool): Verify in a process pool instead of a thread pool. Signature checks and claim
+            decoding hold the GIL, so processes scale better for large batches, at the cost of pool start-up.
+        cache (Optional[JwtVerificationCache]): Cache consulted before, and filled after, verification.
+        algorithm (Optional[str]): The only algorithm accepted. Defaults to the JwtKey's algorithm, or HS256 for a string secret.
+        revocation (Optional[RevocationStore]): Store of revoked `jti`s, checked once per unique valid token.
+
+    Raises:
+        InvalidInputError: If any of the inputs are invalid.
+
+    Returns:
+        List[Union[dict, AuthenticationError]]: One result per token, in input order.
+    """
+    if not isinstance(tokens, list):
+        raise InvalidInputError("tokens", "tokens must be a list.")
+    for token in tokens:
+        __validate_string_input(token, "JWT")
+    if not isinstance(secret, _KeyIndex):
+        _resolve_key(secret, algorithm, signing=False)
+    if max_workers is not None and (not isinstance(max_workers, int) or isinstance(max_workers, bool) or max_workers < 1):
+        raise InvalidInputError("max_workers", "max_workers must be a positive integer or None.")
+
+    outcomes: Dict[str, Tuple[bool, Union[dict, str]]] = {}
+    # Tokens still to verify, grouped by key; key sets and keyrings are resolved here so workers only ever see plain keys.
+    pending: Dict[Union[str, JwtKey], List[str]] = {}
+    for token in dict.fromkeys(tokens):
+        key = secret
+        if isinstance(secret, _KeyIndex):
+            try:
+                key = secret.key_for_token(token)
+            except AuthenticationError as e:
+                outcomes[token] = (False, e.message)
+                continue
+        claims = cache.get(token, key, algorithm) if cache is not None else None
+        if claims is not None:
+            outcomes[token] = (True, claims)
+        else:
+            pending.setdefault(key, []).append(token)
+
+    jobs = [(key, group) for key, group in pending.items()]
+    if sum(len(group) for _, group in jobs) <= 1 or max_workers == 1:
+        results = [__try_decode_jwts(group, key, algorithm) for key, group in jobs]
+    else:
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=max_workers) as executor:
+            # Hand tokens to workers in chunks so the key is resolved (and, for processes, unpickled) once per chunk.
+            size = -(-sum(len(group) for _, group in jobs) // ((max_workers or os.cpu_count() or 1) * 4))
+            jobs = [(key, group[i:i + size]) for key, group in jobs for i in range(0, len(group), size)]
+            results = list(executor.map(__try_decode_jwts, [group for _, group in jobs], [key for key, _ in jobs], [algorithm] * len(jobs)))
+    for (key, group), chunk in zip(jobs, results):
+        for token, outcome in zip(group, chunk):
+            outcomes[token] = outcome
+            if cache is not None and outcome[0]:
+                cache.put(token, key, outcome[1], algorithm)
+    if revocation is not None:
+        for token, (ok, claims) in outcomes.items():
+            if ok:
+                try:
+                    _check_revocation(claims, revocation)
+                except AuthenticationError as e:
+                    outcomes[token] = (False, e.message)
+
+    return [dict(outcome) if ok else AuthenticationError(outcome)
+            for ok, outcome in (outcomes[token] for token in tokens)]
+
 
 def generate_csrf_token() -> str:
     """
@@ -95,6 +963,74 @@ def verify_csrf_token(token: str, expected_token: str) -> bool:
     __validate_string_input(expected_token, "expected CSRF token")
     return secrets.compare_digest(token, expected_token)
 
+# Tolerated clock difference between servers issuing and verifying signed CSRF tokens.
+CSRF_CLOCK_SKEW_SECONDS = 60
+__HEX_DIGITS = frozenset("0123456789abcdef")
+# Unix timestamps stay within 12 digits for the next 30,000 years; longer ones are hostile and too big for int()/float.
+__MAX_TIMESTAMP_DIGITS = 12
+
+def generate_signed_csrf_token(session_id: str, secret: str) -> str:
+    """
+    Generate a stateless CSRF token bound to a session.
+
+    The token carries its issue time and a random nonce, signed with HMAC-SHA256 over the session id, so
+    verify_signed_csrf_token can check it without storing issued tokens server-side.
+
+    Args:
+        session_id (str): The id of the session the token is issued to.
+        secret (str): The server-side key to sign the token. Use a key dedicated to CSRF tokens.
+
+    Raises:
+        InvalidInputError: If any of the inputs are invalid.
+
+    Returns:
+        str: The CSRF token, as "<timestamp>.<nonce>.<signature>".
+    """
+    __validate_string_input(session_id, "session id", is_allow_empty=False)
+    __validate_string_input(secret, "secret key", is_allow_empty=False)
+    timestamp, nonce = str(int(time.time())), secrets.token_hex(16)
+    return f"{timestamp}.{nonce}.{__sign_csrf(secret, session_id, timestamp, nonce)}"
+
+def verify_signed_csrf_token(token: str, session_id: str, secret: str, max_age_seconds: int = 3600) -> bool:
+    """
+    Verify a CSRF token from generate_signed_csrf_token without any storage lookup.
+
+    Args:
+        token (str): The CSRF token to verify.
+        session_id (str): The id of the session the request belongs to.
+        secret (str): The key the token was signed with.
+        max_age_seconds (int): How long a token stays valid after it was issued. Defaults to one hour.
+
+    Raises:
+        InvalidInputError: If any of the inputs are invalid.
+
+    Returns:
+        bool: True if the token was issued to this session with this key and has not expired, False otherwise.
+    """
+    __validate_string_input(token, "CSRF token")
+    __validate_string_input(session_id, "session id", is_allow_empty=False)
+    __validate_string_input(secret, "secret key", is_allow_empty=False)
+    if not isinstance(max_age_seconds, int) or isinstance(max_age_seconds, bool) or max_age_seconds < 0:
+        raise InvalidInputError("max age", "max_age_seconds must be a non-negative integer.")
+    # The token comes from the client: reject anything malformed without raising.
+    parts = token.split(".")
+    if len(parts) != 3:
+        return False
+    timestamp, nonce, signature = parts
+    if len(timestamp) > __MAX_TIMESTAMP_DIGITS or not timestamp.isascii() or not timestamp.isdigit() or len(signature) != 64 or not all(c in __HEX_DIGITS for c in signature):
+        return False
+    # Cheap checks first: an expired token is rejected without computing the HMAC.
+    age = time.time() - int(timestamp)
+    if not -CSRF_CLOCK_SKEW_SECONDS <= age <= max_age_seconds:
+        return False
+    return secrets.compare_digest(signature, __sign_csrf(secret, session_id, timestamp, nonce))
+
+def __sign_csrf(secret: str, session_id: str, timestamp: str, nonce: str) -> str:
+    # The "csrf" prefix keeps these signatures from ever being valid for another use of the same key.
+    # The session id goes last: the timestamp and nonce can't contain dots, so the message is unambiguous.
+    message = f"csrf.{timestamp}.{nonce}.{session_id}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
 if __name__ == "__main__":
     secret_key = "supersecretkey"
     payload = {"user_id": 123, "username": "test_user"}
@@ -119,3 +1055,7 @@ if __name__ == "__main__":
     # Verify the CSRF token
     is_valid_csrf = verify_csrf_token(csrf_token, csrf_token)
     print(f"CSRF Token Verification: {is_valid_csrf}")
+
+    # Generate and verify a stateless CSRF token bound to a session
+    signed_csrf_token = generate_signed_csrf_token("session-123", "csrfsecretkey")
+    print(f"Signed CSRF Token Verification: {verify_signed_csrf_token(signed_csrf_token, 'session-123', 'csrfsecretkey')}")
@@ -1,42 +1,148 @@
 import hashlib
 import hmac
 import secrets
+import time
+from typing import Optional, Tuple
 
 from libs.exceptions.custom_exceptions import InvalidInputError
 from libs.utils.__validate import __validate_string_input, __validate_positive_number
 
+PASSWORD_HASH_ALGORITHMS = ("pbkdf2_sha256", "pbkdf2_sha512", "scrypt")
+DEFAULT_PASSWORD_HASH_ALGORITHM = "pbkdf2_sha256"
+# The cost is the iteration count for PBKDF2 and the CPU/memory cost n (a power of 2) for scrypt.
+DEFAULT_PASSWORD_HASH_COSTS = {"pbkdf2_sha256": 100000, "pbkdf2_sha512": 100000, "scrypt": 2 ** 14}
+# Hashes from before the parameters were stored in the hash are "salt$hexdigest" with these parameters.
+__LEGACY_PARAMETERS = ("pbkdf2_sha256", 100000)
+__SCRYPT_BLOCK_SIZE = 8
+__SCRYPT_PARALLELISM = 1
+# scrypt needs 128 * r * n bytes and hashlib caps maxmem below 2 GiB, so n = 2**20 (1 GiB) is the largest usable cost.
+MAX_SCRYPT_COST = 2 ** 20
+# Stored hashes carry their own cost, so a bound keeps a forged or corrupted one from tying up a worker for minutes.
+MAX_PBKDF2_COST = 2000000
+# Calibration never suggests less than these, however slow the machine.
+__MIN_CALIBRATED_COSTS = {"pbkdf2_sha256": 1000, "pbkdf2_sha512": 1000, "scrypt": 2 ** 14}
 
-def hash_password(password: str, salt: str = None) -> str:
+
+def __validate_hash_parameters(algorithm: str, cost: int):
+    if algorithm not in PASSWORD_HASH_ALGORITHMS:
+        raise InvalidInputError("algorithm", f"Unsupported password hash algorithm: {algorithm}. Choose from {PASSWORD_HASH_ALGORITHMS}.")
+    if not isinstance(cost, int) or isinstance(cost, bool) or cost < 1:
+        raise InvalidInputError("cost", "cost must be a positive integer.")
+    if algorithm == "scrypt" and (cost < 2 or cost & (cost - 1) or cost > MAX_SCRYPT_COST):
+        raise InvalidInputError("cost", f"The scrypt cost must be a power of 2 between 2 and {MAX_SCRYPT_COST}.")
+    if algorithm != "scrypt" and cost > MAX_PBKDF2_COST:
+        raise InvalidInputError("cost", f"The PBKDF2 cost must be at most {MAX_PBKDF2_COST} iterations.")
+
+def __derive(password: str, salt: str, algorithm: str, cost: int) -> str:
+    if algorithm == "scrypt":
+        r, p = __SCRYPT_BLOCK_SIZE, __SCRYPT_PARALLELISM
+        # hashlib caps scrypt at 32 MiB by default; allow what this cost needs (128 * r * n bytes, plus slack).
+        try:
+            return hashlib.scrypt(password.encode(), salt=salt.encode(), n=cost, r=r, p=p, maxmem=128 * r * (cost + p + 2) + 1024 * 1024).hex()
+        except (ValueError, MemoryError) as e:
+            # OpenSSL refuses costs whose memory it can't allocate on this machine.
+            raise InvalidInputError("cost", f"scrypt cost {cost} is not usable here: {e}")
+    return hashlib.pbkdf2_hmac(algorithm[len("pbkdf2_"):], password.encode(), salt.encode(), cost).hex()
+
+def __parse_hashed_password(hashed_password: str) -> Tuple[str, str, int, str]:
+    try:
+        salt, hashed = hashed_password.split('$')
+        if ':' not in hashed:
+            return (salt, *__LEGACY_PARAMETERS, hashed)
+        algorithm, cost, digest = hashed.split(':')
+        cost = int(cost)
+    except ValueError:
+        raise InvalidInputError("hashed password", "Invalid hashed password format.")
+    __validate_hash_parameters(algorithm, cost)
+    return salt, algorithm, cost, digest
+
+def hash_password(password: str, salt: str = None, algorithm: str = DEFAULT_PASSWORD_HASH_ALGORITHM, cost: Optional[int] = None) -> str:
     """
     Hashes a password.
     
     :param password: The password to hash.
     :param salt: Optional salt for added security (auto-generated if not provided).
-    :return: The hashed password (including the salt).
+    :param algorithm: The key derivation function: "pbkdf2_sha256", "pbkdf2_sha512" or "scrypt".
+    :param cost: PBKDF2 iterations or the scrypt cost n; defaults to DEFAULT_PASSWORD_HASH_COSTS. See calibrate_password_cost.
+    :return: The hashed password as "salt$algorithm:cost:digest", so verify_password can read the parameters back.
     """
     __validate_string_input(password, "password", is_allow_empty=False)
     if salt is not None:
         __validate_string_input(salt, "salt")
+        if '$' in salt:
+            raise InvalidInputError("salt", "salt must not contain '$'.")
     if salt is None:
         salt = secrets.token_hex(16)
-    hash_object = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-    return f"{salt}${hash_object.hex()}"
+    cost = DEFAULT_PASSWORD_HASH_COSTS.get(algorithm) if cost is None else cost
+    __validate_hash_parameters(algorithm, cost)
+    return f"{salt}${algorithm}:{cost}:{__derive(password, salt, algorithm, cost)}"
 
 def verify_password(password: str, hashed_password: str) -> bool:
     """
     Verifies if the given password matches the hashed password.
     
+    The algorithm and cost are read from the hash itself, so hashes made with other settings, including
+    legacy "salt$digest" hashes, keep verifying. Use password_needs_rehash to upgrade them on login.
+    
     :param password: The password to verify.
     :param hashed_password: The stored hashed password.
     :return: True if the password matches, False otherwise.
     """
-    __validate_string_input(password, "password")
+    __validate_string_input(password, "password", is_allow_empty=False)
     __validate_string_input(hashed_password, "hashed password")
-    try:
-        salt, hashed = hashed_password.split('$')
-        return hash_password(password, salt) == hashed_password
-    except ValueError:
-        raise InvalidInputError("Invalid hashed password format.")
+    salt, algorithm, cost, digest = __parse_hashed_password(hashed_password)
+    return hmac.compare_digest(__derive(password, salt, algorithm, cost), digest)
+
+def password_needs_rehash(hashed_password: str, algorithm: str = DEFAULT_PASSWORD_HASH_ALGORITHM, cost: Optional[int] = None) -> bool:
+    """
+    Checks whether a stored hash was made with other parameters than the current ones.
+    
+    Call it after a successful verify_password and, if True, store hash_password(password, algorithm=..., cost=...).
+    
+    :param hashed_password: The stored hashed password.
+    :param algorithm: The algorithm new hashes should use.
+    :param cost: The cost new hashes should use; defaults to DEFAULT_PASSWORD_HASH_COSTS.
+    :return: True if the hash uses another algorithm or a lower cost.
+    """
+    __validate_string_input(hashed_password, "hashed password")
+    cost = DEFAULT_PASSWORD_HASH_COSTS.get(algorithm) if cost is None else cost
+    __validate_hash_parameters(algorithm, cost)
+    _, stored_algorithm, stored_cost, _ = __parse_hashed_password(hashed_password)
+    return stored_algorithm != algorithm or stored_cost < cost
+
+def calibrate_password_cost(target_seconds: float = 0.25, algorithm: str = DEFAULT_PASSWORD_HASH_ALGORITHM) -> int:
+    """
+    Picks the cost at which hashing one password takes about `target_seconds` on this machine.
+    
+    PBKDF2 time grows linearly with iterations, so a short trial run is scaled up, capped at MAX_PBKDF2_COST.
+    scrypt costs must be powers of 2, so the largest one that stays within the target is returned, capped at
+    MAX_SCRYPT_COST. Neither goes below a floor (1000 iterations, scrypt n = 2**14) on slow machines.
+    
+    :param target_seconds: The hashing time to aim for.
+    :param algorithm: The algorithm to calibrate.
+    :return: The cost to pass to hash_password.
+    """
+    if not isinstance(target_seconds, (int, float)) or isinstance(target_seconds, bool) or target_seconds <= 0:
+        raise InvalidInputError("target_seconds", "target_seconds must be a positive number.")
+    __validate_hash_parameters(algorithm, DEFAULT_PASSWORD_HASH_COSTS.get(algorithm, 0))
+    salt = secrets.token_hex(16)
+
+    def duration(cost: int) -> float:
+        started = time.perf_counter()
+        __derive("calibration-password", salt, algorithm, cost)
+        return time.perf_counter() - started
+
+    if algorithm == "scrypt":
+        cost = __MIN_CALIBRATED_COSTS[algorithm]
+        while cost < MAX_SCRYPT_COST and duration(cost * 2) <= target_seconds:
+            cost *= 2
+        return cost
+    # Grow the trial until it is long enough to time reliably, then extrapolate.
+    cost, elapsed = 1000, duration(1000)
+    while elapsed < 0.02 and elapsed < target_seconds / 4:
+        cost *= 4
+        elapsed = duration(cost)
+    return min(MAX_PBKDF2_COST, max(__MIN_CALIBRATED_COSTS[algorithm], int(cost * target_seconds / max(elapsed, 1e-9))))
 
 def generate_secure_token(length: int = 32) -> str:
     """
@@ -92,6 +198,8 @@ if __name__ == "__main__":
     hashed = hash_password(password)
     print(f"Hashed password: {hashed}")
     print(f"Password verification: {verify_password(password, hashed)}")
+    cost = calibrate_password_cost(0.1)
+    print(f"PBKDF2 iterations for 100 ms: {cost}, needs rehash: {password_needs_rehash(hashed, cost=cost)}")
     
     token = generate_secure_token()
     print(f"Generated secure token: {token}")
@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import json
+
+import pytest
+
+from benchmarks.bench_api_utils import BenchmarkResult, available_modes, find_regressions, main, run_benchmark
+from benchmarks.mock_server import MockServer
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+
+@pytest.mark.parametrize("mode", available_modes())
+def test_run_benchmark_modes(mode):
+    with MockServer(payload_size=256) as server:
+        result = run_benchmark(mode, server.url, requests=20, concurrency=4, measure_memory=False)
+
+    assert result.mode == mode
+    assert result.requests == 20 and result.errors == 0
+    assert result.requests_per_second > 0
+    assert 0 < result.p50_ms <= result.p99_ms
+    assert result.peak_memory_kb is None
+
+def test_run_benchmark_counts_errors_and_memory():
+    with MockServer(error_rate=1.0) as server:
+        result = run_benchmark("pooled", server.url, requests=5)
+
+    assert result.errors == 5
+    assert result.peak_memory_kb > 0
+
+def test_find_regressions():
+    baseline = [{"mode": "pooled", "requests_per_second": 1000.0, "p99_ms": 10.0}]
+    fast = BenchmarkResult("pooled", 100, 0, 0.1, 950.0, 1.0, 11.0)
+    slow = BenchmarkResult("pooled", 100, 0, 0.2, 500.0, 1.0, 20.0)
+
+    assert find_regressions([fast], baseline) == []
+    assert len(find_regressions([slow], baseline)) == 2
+
+def test_main_writes_json_and_checks_baseline(tmp_path, capsys):
+    output = tmp_path / "results.json"
+
+    assert main(["--modes", "pooled", "--requests", "10", "--no-memory", "--json", str(output)]) == 0
+    saved = json.loads(output.read_text())
+    assert saved[0]["mode"] == "pooled"
+    assert "pooled" in capsys.readouterr().out
+
+    saved[0]["requests_per_second"] *= 1000
+    output.write_text(json.dumps(saved))
+    assert main(["--modes", "pooled", "--requests", "10", "--no-memory", "--baseline", str(output)]) == 1
+
+def test_invalid_input():
+    with pytest.raises(InvalidInputError):
+        MockServer(error_rate=2)
+    with pytest.raises(InvalidInputError):
+        run_benchmark("parallel", "http://127.0.0.1:1")
@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import json
+
+import pytest
+
+from benchmarks.bench_jwt_utils import MODES, available_algorithms, main, run_benchmark
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("algorithm", available_algorithms())
+def test_run_benchmark_modes(mode, algorithm):
+    result = run_benchmark(mode, algorithm, tokens=20)
+
+    assert result.mode == mode and result.algorithm == algorithm
+    assert result.tokens == 20
+    assert result.tokens_per_second > 0
+
+def test_main_writes_json(tmp_path, capsys):
+    output = tmp_path / "results.json"
+
+    assert main(["--algorithms", "HS256", "--tokens", "50", "--json", str(output)]) == 0
+    saved = json.loads(output.read_text())
+    assert [entry["mode"] for entry in saved] == list(MODES)
+    assert "speedup" in capsys.readouterr().out
+
+def test_invalid_input():
+    with pytest.raises(InvalidInputError):
+        run_benchmark("parallel")
+    with pytest.raises(InvalidInputError):
+        run_benchmark("minter", "HS999")
@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlparse, parse_qs
+
+import pytest
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    """
+    Echoes the request path, body size and body SHA-256 as JSON.
+
+    Query options: `cache_control` and `etag` set the matching response headers, and a request whose
+    If-None-Match equals `etag` gets a 304. `size=N` returns N bytes instead, `lines=N` returns N NDJSON records,
+    `gzip=1` gzip-encodes the response, `delay=S` waits S seconds before replying and `status=N` replies with status N.
+    `total=N` serves a paginated list of N integers addressed by `offset`/`cursor` and `limit`, with a
+    `next_cursor` in the body and a Link rel="next" header. Compressed request bodies are decoded before being measured.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self):
+        self.server.seen.append((self.command, self.path, dict(self.headers)))
+        self._next_link = None
+        body = self._read_body()
+        options = {name: values[0] for name, values in parse_qs(urlparse(self.path).query).items()}
+        if "delay" in options:
+            time.sleep(float(options["delay"]))
+        etag = options.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if "total" in options:
+            payload = self._page(options)
+        elif "size" in options:
+            payload = b"x" * int(options["size"])
+        elif "lines" in options:
+            payload = b"".join(b'{"i": %d}\n' % i for i in range(int(options["lines"])))
+        else:
+            payload = json.dumps({"path": self.path, "size": len(body), "sha256": hashlib.sha256(body).hexdigest(),
+                                  "wire_size": self._wire_size}).encode()
+        if "gzip" in options:
+            payload = gzip.compress(payload)
+        self.send_response(int(options.get("status", 200)))
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in options:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        if etag:
+            self.send_header("ETag", etag)
+        if self._next_link:
+            self.send_header("Link", f'<{self._next_link}>; rel="next"')
+        if "cache_control" in options:
+            self.send_header("Cache-Control", options["cache_control"])
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _page(self, options) -> bytes:
+        total = int(options["total"])
+        start = int(options.get("offset", options.get("cursor", 0)))
+        limit = int(options.get("limit", 10))
+        end = min(start + limit, total)
+        if end < total:
+            self._next_link = f"{urlparse(self.path).path}?{urlencode({**options, 'offset': end})}"
+        return json.dumps({"items": list(range(start, end)), "next_cursor": str(end) if end < total else None,
+                           "total": total}).encode()
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length) if length else b""
+        else:
+            body = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        self._wire_size = len(body)
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "br":
+            import brotli
+            return brotli.decompress(body)
+        if encoding == "zstd":
+            import zstandard
+            return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+        return body
+
+    do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def _http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    server.seen = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def local_server(_http_server):
+    return f"http://127.0.0.1:{_http_server.server_address[1]}"
+
+@pytest.fixture
+def local_server_requests(_http_server):
+    """
+    (method, path, headers) for every request the local server received, in arrival order.
+    """
+    return _http_server.seen
@@ -4,9 +4,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 import pytest
 import requests
-from libs.utils.api_utils import call_post, call_get, call_put, call_delete
-from libs.exceptions.custom_exceptions import APIRequestError
+from libs.utils.api_utils import call_post, call_get, call_put, call_delete, call_batch, stream_get, download_to_file, stream_lines, stream_ndjson, response_json, MultipartUpload, RequestSpec, ApiClient, RetryPolicy, RetryBudget, CircuitBreaker, CircuitBreakerRegistry, SingleFlight, Deadline, current_deadline, TokenBucket, RateLimiter, RequestMetrics, paginate, CursorPagination, OffsetPagination, LinkHeaderPagination, get_default_client, set_default_client
+from libs.utils.http_cache_utils import ResponseCache
+from libs.utils.json_utils import encode_json
+from libs.utils.compression_utils import RequestCompression, available_encodings
+from libs.exceptions.custom_exceptions import APIRequestError, CircuitOpenError, DeadlineExceededError, InvalidInputError
 
+import hashlib
+import io
+import threading
+import time
 from unittest.mock import patch
 
 
@@ -20,7 +27,7 @@ def test_call_post_success(mocker):
     mock_response = mocker.Mock()
     mock_response.status_code = 201
     mock_response.json.return_value = {"id": 101}
-    mocker.patch("requests.post", return_value=mock_response)
+    mocker.patch("requests.Session.request", return_value=mock_response)
 
     response = call_post(url, headers=headers, json=json_data, token=token)
 
@@ -36,7 +43,7 @@ def test_call_post_failure(mocker):
 
     mock_response = mocker.Mock()
     mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("500 Server Error")
-    mocker.patch("requests.post", return_value=mock_response)
+    mocker.patch("requests.Session.request", return_value=mock_response)
 
     with pytest.raises(APIRequestError):
         call_post(url, headers=headers, json=json_data, token=token)
@@ -51,7 +58,7 @@ def test_call_get_success(mocker):
     mock_response = mocker.Mock()
     mock_response.status_code = 200
     mock_response.json.return_value = {"id": 1, "title": "foo", "body": "bar", "userId": 1}
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("requests.Session.request", return_value=mock_response)
 
     response = call_get(url, headers=headers, token=token)
 
@@ -66,7 +73,7 @@ def test_call_get_failure(mocker):
 
     mock_response = mocker.Mock()
     mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("requests.Session.request", return_value=mock_response)
 
     with pytest.raises(APIRequestError):
         call_get(url, headers=headers, token=token)
@@ -81,7 +88,7 @@ def test_call_put_success(mocker):
     mock_response = mocker.Mock()
     mock_response.status_code = 200
     mock_response.json.return_value = {"id": 1, "title": "foo", "body": "bar", "userId": 1}
-    mocker.patch("requests.put", return_value=mock_response)
+    mocker.patch("requests.Session.request", return_value=mock_response)
 
     response = call_put(url, headers=headers, json=json_data, token=token)
 
@@ -97,7 +104,7 @@ def test_call_put_failure(mocker):
 
     mock_response = mocker.Mock()
     mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("500 Server Error")
-    mocker.patch("requests.put", return_value=mock_response)
+    mocker.patch("requests.Session.request", return_value=mock_response)
 
     with pytest.raises(APIRequestError):
         call_put(url, headers=headers, json=json_data, token=token)
@@ -109,7 +116,7 @@ def test_call_delete_success(mocker):
 
     mock_response = mocker.Mock()
     mock_response.status_code = 200
-    mocker.patch("requests.delete", return_value=mock_response)
+    mocker.patch("requests.Session.request", return_value=mock_response)
 
     response = call_delete(url, headers=headers, token=token)
 
@@ -123,7 +130,834 @@ def test_call_delete_failure(mocker):
 
     mock_response = mocker.Mock()
     mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
-    mocker.patch("requests.delete", return_value=mock_response)
+    mocker.patch("requests.Session.request", return_value=mock_response)
 
     with pytest.raises(APIRequestError):
         call_delete(url, headers=headers, token=token)
+
+
+def test_client_reuses_keep_alive_connections(local_server):
+    with ApiClient() as client:
+        for _ in range(3):
+            response = call_get(f"{local_server}/items", params={"page": "1"}, client=client)
+            assert response.json()["path"] == "/items?page=1"
+
+        assert client.stats.requests == 3
+        assert client.stats.misses == 1
+        assert client.stats.hits == 2
+        assert client.stats.per_host() == {"127.0.0.1": {"hits": 2, "misses": 1}}
+
+def test_client_idle_timeout_closes_connections(local_server):
+    with ApiClient(idle_timeout=0) as client:
+        call_get(local_server, client=client)
+        call_get(local_server, client=client)
+
+        assert client.stats.misses == 2
+
+def test_call_post_forwards_json_body(local_server):
+    with ApiClient() as client:
+        response = call_post(f"{local_server}/posts", json={"title": "foo"}, client=client)
+
+        assert response.json()["size"] == len(encode_json({"title": "foo"}))
+
+def test_default_client_is_shared():
+    set_default_client(None)
+    client = get_default_client()
+
+    assert get_default_client() is client
+    set_default_client(None)
+
+def test_client_invalid_pool_size():
+    with pytest.raises(InvalidInputError):
+        ApiClient(pool_maxsize=0)
+
+def test_call_batch_returns_results_in_order(local_server):
+    specs = [RequestSpec("GET", f"{local_server}/items/{i}") for i in range(20)]
+    specs.append({"method": "post", "url": f"{local_server}/posts", "json": {"title": "foo"}})
+
+    with ApiClient() as client:
+        results = call_batch(specs, max_concurrency=5, client=client)
+
+    assert [result.json()["path"] for result in results[:20]] == [f"/items/{i}" for i in range(20)]
+    assert results[20].json()["path"] == "/posts"
+
+def test_call_batch_keeps_per_item_errors(local_server):
+    specs = [
+        RequestSpec("GET", f"{local_server}/ok"),
+        RequestSpec("GET", "http://127.0.0.1:1/unreachable"),
+        RequestSpec("GET", f"{local_server}/ok-again"),
+    ]
+
+    with ApiClient() as client:
+        results = call_batch(specs, client=client)
+
+    assert results[0].status_code == 200
+    assert isinstance(results[1], APIRequestError)
+    assert results[2].status_code == 200
+
+def test_call_batch_keeps_per_item_invalid_bodies(local_server):
+    specs = [
+        {"method": "GET", "url": f"{local_server}/ok"},
+        {"method": "POST", "url": f"{local_server}/items", "json": {"a": object()}},
+    ]
+
+    with ApiClient() as client:
+        results = call_batch(specs, client=client)
+
+    assert results[0].status_code == 200
+    assert isinstance(results[1], InvalidInputError)
+
+def test_call_batch_bounds_concurrency(mocker):
+    lock = threading.Lock()
+    in_flight = {"now": 0, "peak": 0}
+
+    def slow_request(*args, **kwargs):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        time.sleep(0.02)
+        with lock:
+            in_flight["now"] -= 1
+        return mocker.Mock(status_code=200)
+
+    mocker.patch("requests.Session.request", side_effect=slow_request)
+    specs = [RequestSpec("GET", f"https://api.example.com/items/{i}") for i in range(12)]
+
+    results = call_batch(specs, max_concurrency=6, max_per_host=3, client=ApiClient())
+
+    assert len(results) == 12
+    assert in_flight["peak"] == 3
+
+def test_call_batch_invalid_concurrency():
+    with pytest.raises(InvalidInputError):
+        call_batch([], max_concurrency=0)
+
+@pytest.mark.parametrize("spec", [{"method": "POST", "url": "https://api.example.com", "body": "x"}, {"url": "https://api.example.com"}, "GET /items"])
+def test_call_batch_invalid_spec(spec):
+    with pytest.raises(InvalidInputError):
+        call_batch([spec])
+
+def _response(mocker, status_code, headers=None):
+    response = mocker.Mock(status_code=status_code, headers=headers or {})
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status_code} Error", response=response)
+    return response
+
+def test_retry_on_retryable_status(mocker):
+    sleep = mocker.patch("libs.utils.api_utils.time.sleep")
+    request = mocker.patch("requests.Session.request", side_effect=[_response(mocker, 503), _response(mocker, 502), _response(mocker, 200)])
+    client = ApiClient(retry_policy=RetryPolicy(max_retries=3, backoff_factor=0.1, budget=RetryBudget()))
+
+    response = call_get("https://api.example.com/items", client=client)
+
+    assert response.status_code == 200
+    assert request.call_count == 3
+    assert all(0 <= call.args[0] <= 0.4 for call in sleep.call_args_list)
+
+def test_retry_honors_retry_after(mocker):
+    sleep = mocker.patch("libs.utils.api_utils.time.sleep")
+    mocker.patch("requests.Session.request", side_effect=[_response(mocker, 429, {"Retry-After": "2"}), _response(mocker, 200)])
+    client = ApiClient(retry_policy=RetryPolicy(budget=RetryBudget()))
+
+    call_get("https://api.example.com/items", client=client)
+
+    sleep.assert_called_once_with(2.0)
+
+def test_retry_gives_up_after_max_retries(mocker):
+    mocker.patch("libs.utils.api_utils.time.sleep")
+    request = mocker.patch("requests.Session.request", side_effect=lambda *args, **kwargs: _response(mocker, 503))
+    client = ApiClient(retry_policy=RetryPolicy(max_retries=2, budget=RetryBudget()))
+
+    with pytest.raises(APIRequestError) as exc_info:
+        call_get("https://api.example.com/items", client=client)
+
+    assert request.call_count == 3
+    assert exc_info.value.status_code == 503
+
+def test_retry_skips_non_idempotent_methods(mocker):
+    mocker.patch("libs.utils.api_utils.time.sleep")
+    request = mocker.patch("requests.Session.request", return_value=_response(mocker, 503))
+    client = ApiClient(retry_policy=RetryPolicy(budget=RetryBudget()))
+
+    with pytest.raises(APIRequestError):
+        call_post("https://api.example.com/items", json={"title": "foo"}, client=client)
+
+    assert request.call_count == 1
+
+def test_retry_on_connection_error(mocker):
+    mocker.patch("libs.utils.api_utils.time.sleep")
+    request = mocker.patch("requests.Session.request", side_effect=[requests.exceptions.ConnectionError("reset"), _response(mocker, 200)])
+    client = ApiClient(retry_policy=RetryPolicy(budget=RetryBudget()))
+
+    assert call_delete("https://api.example.com/items/1", client=client).status_code == 200
+    assert request.call_count == 2
+
+def test_retry_budget_limits_retries(mocker):
+    mocker.patch("libs.utils.api_utils.time.sleep")
+    request = mocker.patch("requests.Session.request", side_effect=lambda *args, **kwargs: _response(mocker, 503))
+    budget = RetryBudget(ratio=0, min_retries_per_second=0, max_tokens=1)
+    client = ApiClient(retry_policy=RetryPolicy(max_retries=5, budget=budget))
+
+    for _ in range(2):
+        with pytest.raises(APIRequestError):
+            call_get("https://api.example.com/items", client=client)
+
+    assert request.call_count == 3
+    assert budget.available < 1
+
+def test_circuit_breaker_opens_and_fails_fast(mocker):
+    request = mocker.patch("requests.Session.request", side_effect=requests.exceptions.ConnectionError("refused"))
+    client = ApiClient(circuit_breakers=CircuitBreakerRegistry(window_size=4, min_calls=4, cooldown=60))
+
+    for _ in range(4):
+        with pytest.raises(APIRequestError):
+            call_get("https://down.example.com/items", client=client)
+    with pytest.raises(CircuitOpenError):
+        call_get("https://down.example.com/items", client=client)
+
+    assert request.call_count == 4
+    assert client.circuit_breakers.states() == {"down.example.com": CircuitBreaker.OPEN}
+
+def test_circuit_breaker_is_per_host(mocker):
+    def fake_request(method, url, **kwargs):
+        if "down" in url:
+            raise requests.exceptions.ConnectionError("refused")
+        return _response(mocker, 200)
+
+    mocker.patch("requests.Session.request", side_effect=fake_request)
+    client = ApiClient(circuit_breakers=CircuitBreakerRegistry(window_size=2, min_calls=2))
+
+    for _ in range(3):
+        with pytest.raises(APIRequestError):
+            call_get("https://down.example.com/items", client=client)
+
+    assert call_get("https://up.example.com/items", client=client).status_code == 200
+
+def test_circuit_breaker_half_open_recovers():
+    breaker = CircuitBreaker(window_size=2, min_calls=2, cooldown=0.01)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.allow_request() is False
+    time.sleep(0.02)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False  # only one trial call while half-open
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_circuit_breaker_half_open_failure_reopens():
+    breaker = CircuitBreaker(window_size=2, min_calls=2, cooldown=0.01)
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_circuit_breaker_half_open_survives_deadline_and_rate_limit_failures(mocker):
+    mocker.patch("requests.Session.request", return_value=_response(mocker, 200))
+    url = "https://flaky.example.com/items"
+    client = ApiClient(circuit_breakers=CircuitBreakerRegistry(window_size=2, min_calls=2, cooldown=0.01),
+                       rate_limiter=RateLimiter(rate=0.1))
+    breaker = client.circuit_breakers.get(url)
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.02)
+    client.rate_limiter.acquire(url)
+
+    with pytest.raises(DeadlineExceededError):
+        call_get(url, client=client, deadline=Deadline(1))
+    with pytest.raises(DeadlineExceededError):
+        call_get(url, client=client, deadline=Deadline(0))
+    mocker.patch("libs.utils.api_utils.time.sleep")
+    call_get(url, client=client)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_circuit_breaker_ignores_client_errors(mocker):
+    mocker.patch("requests.Session.request", return_value=_response(mocker, 404))
+    client = ApiClient(circuit_breakers=CircuitBreakerRegistry(window_size=2, min_calls=2))
+
+    for _ in range(3):
+        with pytest.raises(APIRequestError) as exc_info:
+            call_get("https://api.example.com/missing", client=client)
+        assert not isinstance(exc_info.value, CircuitOpenError)
+
+def test_cached_get_serves_fresh_responses_locally(local_server, local_server_requests):
+    url = f"{local_server}/reference?cache_control=max-age%3D60"
+    with ApiClient(cache=ResponseCache()) as client:
+        first = call_get(url, client=client)
+        second = call_get(url, client=client)
+
+        assert second.json() == first.json()
+        assert len(local_server_requests) == 1
+        assert (client.cache.hits, client.cache.misses) == (1, 1)
+
+def test_cached_get_revalidates_with_etag(local_server, local_server_requests):
+    url = f"{local_server}/reference?etag=v1&cache_control=no-cache"
+    with ApiClient(cache=ResponseCache()) as client:
+        first = call_get(url, client=client)
+        second = call_get(url, client=client)
+
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert local_server_requests[1][2]["If-None-Match"] == "v1"
+        assert client.cache.revalidations == 1
+
+def test_cache_is_not_used_for_post(local_server, local_server_requests):
+    url = f"{local_server}/reference?cache_control=max-age%3D60"
+    with ApiClient(cache=ResponseCache()) as client:
+        call_post(url, json={}, client=client)
+        call_post(url, json={}, client=client)
+
+        assert len(local_server_requests) == 2
+
+def _run_concurrently(fn, count):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = fn()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_single_flight_coalesces_identical_gets(mocker):
+    def slow_request(*args, **kwargs):
+        time.sleep(0.1)
+        return _response(mocker, 200)
+
+    request = mocker.patch("requests.Session.request", side_effect=slow_request)
+    client = ApiClient(single_flight=SingleFlight())
+
+    results = _run_concurrently(lambda: call_get("https://api.example.com/items", params={"page": "1"}, token="t", client=client), 8)
+
+    assert request.call_count == 1
+    assert all(result.status_code == 200 for result in results)
+    assert (client.single_flight.leaders, client.single_flight.followers) == (1, 7)
+
+def test_single_flight_keeps_identities_apart(mocker):
+    def slow_request(*args, **kwargs):
+        time.sleep(0.05)
+        return _response(mocker, 200)
+
+    request = mocker.patch("requests.Session.request", side_effect=slow_request)
+    client = ApiClient(single_flight=SingleFlight())
+    tokens = iter(["a", "b"])
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            token = next(tokens)
+        return call_get("https://api.example.com/items", token=token, client=client)
+
+    _run_concurrently(call, 2)
+
+    assert request.call_count == 2
+
+def test_single_flight_shares_errors(mocker):
+    def failing_request(*args, **kwargs):
+        time.sleep(0.05)
+        raise requests.exceptions.ConnectionError("refused")
+
+    request = mocker.patch("requests.Session.request", side_effect=failing_request)
+    client = ApiClient(single_flight=SingleFlight())
+
+    results = _run_concurrently(lambda: call_get("https://api.example.com/items", client=client), 4)
+
+    assert request.call_count == 1
+    assert all(isinstance(result, APIRequestError) for result in results)
+
+def test_single_flight_follower_honours_its_deadline(mocker):
+    def slow_request(*args, **kwargs):
+        time.sleep(1)
+        return _response(mocker, 200)
+
+    mocker.patch("requests.Session.request", side_effect=slow_request)
+    client = ApiClient(single_flight=SingleFlight())
+    leader = threading.Thread(target=call_get, args=("https://api.example.com/items",), kwargs={"client": client})
+    leader.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+
+    with pytest.raises(DeadlineExceededError):
+        call_get("https://api.example.com/items", client=client, deadline=Deadline(0.2))
+
+    assert time.monotonic() - started < 0.6
+    assert client.single_flight.followers == 1
+    leader.join()
+
+def test_stream_get_yields_bounded_chunks(local_server):
+    with ApiClient() as client:
+        chunks = list(stream_get(f"{local_server}/export?size=100000", chunk_size=4096, client=client))
+
+    assert sum(len(chunk) for chunk in chunks) == 100000
+    assert max(len(chunk) for chunk in chunks) <= 4096
+
+def test_stream_get_bypasses_cache(local_server, local_server_requests):
+    url = f"{local_server}/export?size=10&cache_control=max-age%3D60"
+    with ApiClient(cache=ResponseCache()) as client:
+        list(stream_get(url, client=client))
+        list(stream_get(url, client=client))
+
+    assert len(local_server_requests) == 2
+
+def test_download_to_file_path_and_file_object(local_server, tmp_path):
+    url = f"{local_server}/export?size=250000"
+    destination = tmp_path / "export.bin"
+    buffer = io.BytesIO()
+
+    with ApiClient() as client:
+        assert download_to_file(url, str(destination), chunk_size=8192, client=client) == 250000
+        assert download_to_file(url, buffer, client=client) == 250000
+
+    assert destination.stat().st_size == 250000
+    assert buffer.getvalue() == b"x" * 250000
+
+def test_stream_get_error_status_releases_connection(local_server):
+    def stream_twice():
+        for _ in range(2):
+            with pytest.raises(APIRequestError):
+                list(stream_get(f"{local_server}/missing?status=404", client=client))
+
+    with ApiClient(pool_maxsize=1, pool_block=True) as client:
+        worker = threading.Thread(target=stream_twice, daemon=True)
+        worker.start()
+        worker.join(5)
+
+        assert not worker.is_alive()
+
+def test_download_to_file_failure_keeps_existing_file(local_server, tmp_path):
+    destination = tmp_path / "export.bin"
+    destination.write_bytes(b"previous export")
+
+    with ApiClient() as client:
+        with pytest.raises(APIRequestError):
+            download_to_file(f"{local_server}/export?status=500", str(destination), client=client)
+
+    assert destination.read_bytes() == b"previous export"
+
+def test_download_to_file_invalid_destination():
+    with pytest.raises(InvalidInputError):
+        download_to_file("https://api.example.com/export", 123)
+
+def test_stream_lines_and_ndjson(local_server):
+    with ApiClient() as client:
+        lines = list(stream_lines(f"{local_server}/events?lines=3", chunk_size=5, client=client))
+        records = list(stream_ndjson(f"{local_server}/events?lines=1000", chunk_size=64, client=client))
+
+    assert lines == ['{"i": 0}', '{"i": 1}', '{"i": 2}']
+    assert records == [{"i": i} for i in range(1000)]
+
+def test_stream_get_failure():
+    with pytest.raises(APIRequestError):
+        list(stream_get("http://127.0.0.1:1/unreachable", client=ApiClient()))
+
+def test_call_put_streams_file_object(local_server, local_server_requests, tmp_path):
+    path = tmp_path / "export.bin"
+    path.write_bytes(b"a" * 300000)
+
+    with ApiClient() as client, open(path, "rb") as f:
+        response = call_put(f"{local_server}/upload", data=f, client=client)
+
+    assert response.json()["size"] == 300000
+    assert local_server_requests[0][2]["Content-Length"] == "300000"
+    assert local_server_requests[0][2]["Content-Type"] == "application/octet-stream"
+
+def test_call_post_streams_generator_chunked(local_server, local_server_requests):
+    def generate():
+        for i in range(100):
+            yield b"row %d\n" % i
+
+    expected = b"".join(generate())
+    with ApiClient() as client:
+        response = call_post(f"{local_server}/upload", data=generate(), headers={"Content-Type": "text/csv"}, client=client)
+
+    assert response.json()["sha256"] == hashlib.sha256(expected).hexdigest()
+    assert local_server_requests[0][2]["Transfer-Encoding"] == "chunked"
+    assert local_server_requests[0][2]["Content-Type"] == "text/csv"
+
+def test_call_post_multipart_from_disk(local_server, local_server_requests, tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_bytes(b"id,name\n" * 10000)
+
+    with ApiClient() as client:
+        response = call_post(f"{local_server}/upload", data={"kind": "report"}, files={"file": str(path)}, client=client)
+
+    _, _, headers = local_server_requests[0]
+    assert headers["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert int(headers["Content-Length"]) == response.json()["size"]
+
+def test_multipart_upload_encoding(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_bytes(b"hello")
+    upload = MultipartUpload(fields={"kind": "report"}, files={"file": str(path), "raw": ("b.bin", io.BytesIO(b"\x00\x01"))}, chunk_size=2)
+
+    body = b"".join(upload)
+
+    assert len(body) == len(upload)
+    assert body == b"".join(upload)  # replayable
+    assert b'name="file"; filename="a.txt"\r\nContent-Type: text/plain\r\n\r\nhello\r\n' in body
+    assert b'filename="b.bin"\r\nContent-Type: application/octet-stream\r\n\r\n\x00\x01\r\n' in body
+    assert body.endswith(f"--{upload.boundary}--\r\n".encode())
+
+def test_retry_rewinds_file_body_and_skips_generators(mocker):
+    mocker.patch("libs.utils.api_utils.time.sleep")
+    bodies = []
+
+    def fake_request(method, url, data=None, **kwargs):
+        bodies.append(data.read() if hasattr(data, "read") else data)
+        return _response(mocker, 503) if len(bodies) == 1 else _response(mocker, 200)
+
+    request = mocker.patch("requests.Session.request", side_effect=fake_request)
+    client = ApiClient(retry_policy=RetryPolicy(budget=RetryBudget()))
+
+    call_put("https://api.example.com/upload", data=io.BytesIO(b"payload"), client=client)
+    assert bodies == [b"payload", b"payload"]
+
+    bodies.clear()
+    with pytest.raises(APIRequestError):
+        call_put("https://api.example.com/upload", data=(chunk for chunk in [b"a"]), client=client)
+    assert request.call_count == 3
+
+def test_call_post_files_with_invalid_data():
+    with pytest.raises(InvalidInputError):
+        call_post("https://api.example.com/upload", data=b"raw", files={"file": "missing.txt"})
+
+def test_call_post_with_data_and_json():
+    with pytest.raises(InvalidInputError):
+        call_post("https://api.example.com/posts", data={"a": "1"}, json={"title": "foo"})
+
+def test_call_post_form_data_is_labelled_as_form(local_server, local_server_requests):
+    with ApiClient() as client:
+        response = call_post(f"{local_server}/form", data={"a": "1", "b": "2"}, client=client)
+
+    assert response.json()["size"] == len("a=1&b=2")
+    assert local_server_requests[0][2]["Content-Type"] == "application/x-www-form-urlencoded"
+
+def test_json_body_uses_pluggable_codec(mocker):
+    request = mocker.patch("requests.Session.request", return_value=_response(mocker, 201))
+
+    call_post("https://api.example.com/items", json={"title": "foo"}, client=ApiClient())
+
+    kwargs = request.call_args.kwargs
+    assert kwargs["data"] == encode_json({"title": "foo"})
+    assert kwargs["headers"]["Content-Type"] == "application/json"
+    assert "json" not in kwargs
+
+def test_response_json_decodes_bytes(local_server):
+    with ApiClient() as client:
+        response = call_get(f"{local_server}/items", client=client)
+
+    assert response_json(response)["path"] == "/items"
+    assert response_json(response, into=lambda **fields: fields["path"]) == "/items"
+
+@pytest.mark.parametrize("encoding", available_encodings())
+def test_call_post_compresses_large_bodies(local_server, local_server_requests, encoding):
+    document = {"rows": [{"id": i, "name": "row"} for i in range(500)]}
+
+    with ApiClient(compression=RequestCompression(encoding=encoding, min_size=1024)) as client:
+        response = call_post(f"{local_server}/upload", json=document, client=client)
+
+    body = response.json()
+    assert body["size"] == len(encode_json(document))
+    assert body["wire_size"] < body["size"]
+    assert local_server_requests[0][2]["Content-Encoding"] == encoding
+
+def test_call_post_skips_compression_below_threshold(local_server, local_server_requests):
+    with ApiClient(compression=RequestCompression(min_size=1024)) as client:
+        call_post(f"{local_server}/upload", json={"id": 1}, client=client)
+
+    assert "Content-Encoding" not in local_server_requests[0][2]
+
+def test_stream_get_decodes_compressed_responses(local_server):
+    with ApiClient() as client:
+        body = b"".join(stream_get(f"{local_server}/export?gzip=1", chunk_size=16, client=client))
+
+    assert b'"path": "/export?gzip=1"' in body
+
+def test_client_applies_default_timeouts(mocker):
+    request = mocker.patch("requests.Session.request", return_value=_response(mocker, 200))
+
+    call_get("https://api.example.com/items", client=ApiClient(connect_timeout=1, read_timeout=5))
+
+    assert request.call_args.kwargs["timeout"] == (1, 5)
+
+def test_read_timeout_raises_api_request_error(local_server):
+    with ApiClient(read_timeout=0.1) as client:
+        with pytest.raises(APIRequestError):
+            call_get(f"{local_server}/slow?delay=0.5", client=client)
+
+def test_deadline_caps_request_timeout(local_server):
+    started = time.monotonic()
+    with ApiClient() as client:
+        with pytest.raises(DeadlineExceededError):
+            call_get(f"{local_server}/slow?delay=1", client=client, deadline=Deadline(0.2))
+
+    assert time.monotonic() - started < 0.8
+
+def test_expired_deadline_fails_without_request(mocker):
+    request = mocker.patch("requests.Session.request")
+
+    with pytest.raises(DeadlineExceededError):
+        call_get("https://api.example.com/items", client=ApiClient(), deadline=Deadline(0))
+
+    request.assert_not_called()
+
+def test_deadline_stops_retries_that_would_overrun(mocker):
+    sleep = mocker.patch("libs.utils.api_utils.time.sleep")
+    request = mocker.patch("requests.Session.request", return_value=_response(mocker, 503, {"Retry-After": "5"}))
+    client = ApiClient(retry_policy=RetryPolicy(budget=RetryBudget()))
+
+    with pytest.raises(APIRequestError):
+        call_get("https://api.example.com/items", client=client, deadline=Deadline(1))
+
+    assert request.call_count == 1
+    sleep.assert_not_called()
+
+def test_deadline_shrinks_timeouts_and_propagates_to_nested_calls(mocker):
+    request = mocker.patch("requests.Session.request", return_value=_response(mocker, 200))
+    client = ApiClient(connect_timeout=10, read_timeout=10)
+
+    with Deadline(2) as outer:
+        assert current_deadline() is outer
+        with Deadline(60) as inner:
+            assert inner.expires_at <= outer.expires_at
+        call_get("https://api.example.com/items", client=client)
+        call_batch([RequestSpec("GET", "https://api.example.com/items")], client=client)
+
+    assert current_deadline() is None
+    for call in request.call_args_list:
+        connect, read = call.kwargs["timeout"]
+        assert connect <= 2 and read <= 2
+
+def test_invalid_deadline():
+    with pytest.raises(InvalidInputError):
+        Deadline(-1)
+    with pytest.raises(InvalidInputError):
+        call_get("https://api.example.com/items", deadline=5)
+
+def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(rate=10, burst=2)
+
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+    assert bucket.reserve(max_wait=0.05) is None
+    assert bucket.available == pytest.approx(-2, abs=0.1)
+
+def test_token_bucket_spaces_concurrent_reservations():
+    bucket = TokenBucket(rate=100, burst=1)
+    waits = []
+    lock = threading.Lock()
+
+    def reserve():
+        wait = bucket.reserve()
+        with lock:
+            waits.append(wait)
+
+    _run_concurrently(reserve, 10)
+
+    assert sorted(waits) == pytest.approx([i / 100 for i in range(10)], abs=0.01)
+
+def test_token_bucket_pause_and_limit():
+    bucket = TokenBucket(rate=10, burst=5)
+
+    bucket.limit(2)
+    assert bucket.available == pytest.approx(2, abs=0.1)
+    bucket.pause(1)
+
+    assert bucket.reserve() == pytest.approx(1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(1.1, abs=0.01)
+
+def test_rate_limiter_buckets_by_host_and_token():
+    limiter = RateLimiter(rate=1, key_by=RateLimiter.HOST_AND_TOKEN)
+    alice = {"Authorization": "Bearer alice"}
+
+    assert limiter.bucket("https://a.example.com/x", alice) is limiter.bucket("https://a.example.com/y", alice)
+    assert limiter.bucket("https://a.example.com/x", alice) is not limiter.bucket("https://b.example.com/x", alice)
+    assert limiter.bucket("https://a.example.com/x", alice) is not limiter.bucket("https://a.example.com/x", {"Authorization": "Bearer bob"})
+    assert all("alice" not in key for key in limiter._buckets)
+
+    per_token = RateLimiter(rate=1, key_by=RateLimiter.TOKEN)
+    assert per_token.bucket("https://a.example.com", alice) is per_token.bucket("https://b.example.com", alice)
+
+def test_rate_limiter_adapts_to_response_headers():
+    limiter = RateLimiter(rate=100, burst=10)
+    url = "https://api.example.com/items"
+
+    limiter.observe(url, None, 200, requests.structures.CaseInsensitiveDict({"X-RateLimit-Remaining": "3"}))
+    assert limiter.bucket(url).available == pytest.approx(3, abs=0.1)
+
+    limiter.observe(url, None, 200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 2)})
+    assert limiter.bucket(url).reserve() > 0.9
+
+    limiter.observe(url, None, 429, {"Retry-After": "5"})
+    assert limiter.bucket(url).reserve() == pytest.approx(5, abs=0.05)
+
+def test_rate_limiter_bounds_buckets():
+    limiter = RateLimiter(rate=1, max_buckets=2)
+    for host in ("a", "b", "c"):
+        limiter.bucket(f"https://{host}.example.com")
+
+    assert list(limiter._buckets) == ["b.example.com", "c.example.com"]
+
+def test_rate_limiter_invalid_input():
+    with pytest.raises(InvalidInputError):
+        RateLimiter(rate=0)
+    with pytest.raises(InvalidInputError):
+        RateLimiter(rate=1, key_by="path")
+    with pytest.raises(InvalidInputError):
+        ApiClient(rate_limiter=TokenBucket(1))
+
+def test_client_rate_limiter_paces_requests(mocker):
+    sleep = mocker.patch("libs.utils.api_utils.time.sleep")
+    mocker.patch("requests.Session.request", return_value=_response(mocker, 200))
+    limiter = RateLimiter(rate=10)
+    client = ApiClient(rate_limiter=limiter)
+
+    for _ in range(3):
+        call_get("https://api.example.com/items", client=client)
+
+    assert [call.args[0] for call in sleep.call_args_list] == pytest.approx([0.1, 0.2], abs=0.02)
+    assert limiter.delayed == 2
+
+def test_client_rate_limiter_honours_retry_after_and_deadline(mocker):
+    request = mocker.patch("requests.Session.request", return_value=_response(mocker, 429, {"Retry-After": "30"}))
+    client = ApiClient(rate_limiter=RateLimiter(rate=10))
+
+    with pytest.raises(APIRequestError):
+        call_get("https://api.example.com/items", client=client)
+    with pytest.raises(DeadlineExceededError):
+        call_get("https://api.example.com/items", client=client, deadline=Deadline(1))
+
+    assert request.call_count == 1
+
+def test_request_metrics_collects_timings_bytes_and_statuses(local_server):
+    metrics = RequestMetrics()
+    events = []
+    with ApiClient(hooks=[metrics, events.append]) as client:
+        call_get(f"{local_server}/items", client=client)
+        call_post(f"{local_server}/items", data=b"x" * 100, client=client)
+
+    host = metrics.snapshot()[local_server.split("//")[1]]
+
+    assert host["requests"] == 2 and host["errors"] == 0
+    assert host["statuses"] == {200: 2}
+    assert host["request_bytes"] == 100
+    assert host["response_bytes"] == sum(event.response_bytes for event in events) > 0
+    # Only the first request opened a connection; the second reused it.
+    assert host["timings"]["dns"]["count"] == host["timings"]["connect"]["count"] == 1
+    assert host["timings"]["ttfb"]["count"] == host["timings"]["total"]["count"] == 2
+    assert events[0].dns is not None and events[1].dns is None
+    assert 0 < events[0].ttfb <= events[0].total
+    assert host["timings"]["tls"]["count"] == 0
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+def test_request_hooks_report_errors_and_survive_failing_hooks():
+    events = []
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    client = ApiClient(hooks=[broken, events.append])
+    with pytest.raises(APIRequestError):
+        call_get("http://127.0.0.1:1/items", client=client)
+
+    assert len(events) == 1
+    assert isinstance(events[0].error, requests.exceptions.ConnectionError)
+    assert events[0].status_code is None and events[0].dns is not None
+
+    client.remove_hook(events.append)
+    client.remove_hook(broken)
+    assert client.hooks == []
+    with pytest.raises(InvalidInputError):
+        client.add_hook("not callable")
+
+def test_request_logging_never_includes_token(local_server, caplog):
+    with caplog.at_level("DEBUG", logger="libs.utils.api_utils"):
+        call_get(f"{local_server}/items", token="secret_token", client=ApiClient())
+
+    assert "/items" in caplog.text
+    assert "secret_token" not in caplog.text
+
+def test_paginate_link_header(local_server, local_server_requests):
+    items = list(paginate(f"{local_server}/list", params={"total": 25, "limit": 10}, client=ApiClient(),
+                          pagination=LinkHeaderPagination(items_key="items")))
+
+    assert items == list(range(25))
+    assert len(local_server_requests) == 3
+
+def test_paginate_cursor(local_server):
+    pagination = CursorPagination(page_size=7)
+
+    items = list(paginate(f"{local_server}/list", pagination, params={"total": 20}, client=ApiClient()))
+
+    assert items == list(range(20))
+
+def test_paginate_offset_prefetches_and_discards_overshoot(local_server, local_server_requests):
+    pagination = OffsetPagination(limit=5)
+
+    items = list(paginate(f"{local_server}/list", pagination, params={"total": 12}, prefetch=4, client=ApiClient()))
+
+    assert items == list(range(12))
+    offsets = sorted(int(path.split("offset=")[1].split("&")[0]) for _, path, _ in local_server_requests)
+    assert offsets[:3] == [0, 5, 10]
+
+def test_paginate_offset_total_key_and_max_pages(local_server, local_server_requests):
+    items = list(paginate(f"{local_server}/list", OffsetPagination(limit=5, total_key="total"), params={"total": 10},
+                          prefetch=0, client=ApiClient()))
+    assert items == list(range(10))
+    assert len(local_server_requests) == 2
+
+    items = list(paginate(f"{local_server}/list", OffsetPagination(limit=5), params={"total": 100}, max_pages=2,
+                          prefetch=0, client=ApiClient()))
+    assert items == list(range(10))
+
+def test_paginate_is_lazy(local_server, local_server_requests):
+    pages = paginate(f"{local_server}/list", CursorPagination(page_size=5), params={"total": 100}, prefetch=0, client=ApiClient())
+
+    assert local_server_requests == []
+    assert [next(pages) for _ in range(6)] == list(range(6))
+    assert len(local_server_requests) == 2
+    pages.close()
+
+def test_paginate_prefetch_overlaps_processing(local_server):
+    def consume(prefetch):
+        started = time.monotonic()
+        for item in paginate(f"{local_server}/list", CursorPagination(page_size=1), params={"total": 3, "delay": 0.2},
+                             prefetch=prefetch, client=ApiClient()):
+            time.sleep(0.2)
+        return time.monotonic() - started
+
+    assert consume(1) < consume(0) - 0.25
+
+def test_paginate_into_and_invalid_input(local_server):
+    class Item:
+        def __init__(self, value):
+            self.value = value
+
+    items = list(paginate(f"{local_server}/list", CursorPagination(), params={"total": 3}, into=Item, client=ApiClient()))
+    assert [item.value for item in items] == [0, 1, 2]
+
+    with pytest.raises(InvalidInputError):
+        list(paginate(f"{local_server}/list", pagination="cursor"))
+    with pytest.raises(InvalidInputError):
+        list(paginate(f"{local_server}/list", prefetch=-1))
+    with pytest.raises(InvalidInputError):
+        list(paginate(f"{local_server}/list", CursorPagination(items_key="total"), params={"total": 3}, client=ApiClient()))
+
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from libs.utils.async_api_utils import AsyncApiClient, acall_get, acall_post, acall_put, acall_delete, acall_batch
+from libs.utils.api_utils import RequestSpec, Deadline, RateLimiter
+from libs.exceptions.custom_exceptions import APIRequestError, DeadlineExceededError, InvalidInputError
+
+
+def test_acall_get_success(local_server):
+    async def run():
+        async with AsyncApiClient() as client:
+            response = await acall_get(f"{local_server}/items", params={"page": "1"}, token="test_token", client=client)
+            return response.status, await response.json()
+
+    status, body = asyncio.run(run())
+
+    assert status == 200
+    assert body["path"] == "/items?page=1"
+
+def test_acall_post_put_delete_success(local_server):
+    async def run():
+        async with AsyncApiClient() as client:
+            post = await acall_post(f"{local_server}/posts", json={"title": "foo"}, client=client)
+            put = await acall_put(f"{local_server}/posts/1", json={"title": "bar"}, client=client)
+            delete = await acall_delete(f"{local_server}/posts/1", client=client)
+            return post, put, delete
+
+    post, put, delete = asyncio.run(run())
+
+    assert post.status == put.status == delete.status == 200
+
+def test_acall_post_labels_json_and_form_bodies(local_server, local_server_requests):
+    async def run():
+        async with AsyncApiClient() as client:
+            await acall_post(f"{local_server}/posts", json={"title": "foo"}, client=client)
+            await acall_post(f"{local_server}/form", data={"a": "1"}, client=client)
+
+    asyncio.run(run())
+
+    assert [headers["Content-Type"] for _, _, headers in local_server_requests] == ["application/json", "application/x-www-form-urlencoded"]
+
+def test_acall_get_many_concurrent_requests(local_server):
+    async def run():
+        async with AsyncApiClient(limit_per_host=10) as client:
+            return await asyncio.gather(*(acall_get(f"{local_server}/items/{i}", client=client) for i in range(200)))
+
+    responses = asyncio.run(run())
+
+    assert len(responses) == 200
+    assert all(response.status == 200 for response in responses)
+
+def test_acall_get_failure():
+    async def run():
+        async with AsyncApiClient() as client:
+            await acall_get("http://127.0.0.1:1/unreachable", client=client)
+
+    with pytest.raises(APIRequestError):
+        asyncio.run(run())
+
+def test_acall_get_error_keeps_status_code(local_server):
+    async def run():
+        async with AsyncApiClient() as client:
+            await acall_get(f"{local_server}/items?status=503", client=client)
+
+    with pytest.raises(APIRequestError) as excinfo:
+        asyncio.run(run())
+
+    assert excinfo.value.status_code == 503
+
+def test_acall_post_with_data_and_json():
+    with pytest.raises(InvalidInputError):
+        asyncio.run(acall_post("https://api.example.com/posts", data={"a": "1"}, json={"title": "foo"}))
+
+def test_async_client_invalid_limit():
+    with pytest.raises(InvalidInputError):
+        AsyncApiClient(limit=-1)
+
+def test_acall_batch_returns_results_in_order_with_errors(local_server):
+    specs = [RequestSpec("GET", f"{local_server}/items/{i}") for i in range(50)]
+    specs.append(RequestSpec("GET", "http://127.0.0.1:1/unreachable"))
+
+    async def run():
+        async with AsyncApiClient() as client:
+            results = await acall_batch(specs, max_concurrency=10, max_per_host=5, client=client)
+            return [await result.json() if not isinstance(result, APIRequestError) else result for result in results]
+
+    results = asyncio.run(run())
+
+    assert [result["path"] for result in results[:50]] == [f"/items/{i}" for i in range(50)]
+    assert isinstance(results[50], APIRequestError)
+
+def test_acall_batch_keeps_per_item_invalid_bodies(local_server):
+    specs = [
+        {"method": "GET", "url": f"{local_server}/ok"},
+        {"method": "POST", "url": f"{local_server}/items", "json": {"a": object()}},
+    ]
+
+    async def run():
+        async with AsyncApiClient() as client:
+            return await acall_batch(specs, client=client)
+
+    results = asyncio.run(run())
+
+    assert results[0].status == 200
+    assert isinstance(results[1], InvalidInputError)
+
+def test_acall_batch_invalid_spec():
+    with pytest.raises(InvalidInputError):
+        asyncio.run(acall_batch([{"method": "POST", "url": "https://api.example.com", "body": "x"}]))
+
+def test_acall_get_deadline_exceeded(local_server):
+    async def run():
+        async with AsyncApiClient() as client:
+            with Deadline(0.2):
+                await acall_get(f"{local_server}/slow?delay=1", client=client)
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(run())
+
+def test_acall_rate_limiter_paces_without_blocking_loop(local_server):
+    limiter = RateLimiter(rate=20)
+
+    async def run():
+        async with AsyncApiClient(rate_limiter=limiter) as client:
+            started = asyncio.get_running_loop().time()
+            responses = await asyncio.gather(*(acall_get(f"{local_server}/items/{i}", client=client) for i in range(5)))
+            return [response.status for response in responses], asyncio.get_running_loop().time() - started
+
+    statuses, elapsed = asyncio.run(run())
+
+    assert statuses == [200] * 5
+    assert elapsed >= 0.18
+    assert limiter.delayed == 4
+
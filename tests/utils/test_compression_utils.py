@@ -0,0 +1,46 @@
+import gzip
+
+import pytest
+from libs.utils.compression_utils import RequestCompression, available_encodings, compress, compress_stream
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+
+PAYLOAD = b'{"id": 1, "name": "test"}' * 200
+
+def test_gzip_round_trip():
+    compressed = compress(PAYLOAD, "gzip", level=9)
+
+    assert len(compressed) < len(PAYLOAD)
+    assert gzip.decompress(compressed) == PAYLOAD
+
+def test_compress_stream_matches_payload():
+    chunks = [PAYLOAD[i:i + 100] for i in range(0, len(PAYLOAD), 100)]
+
+    assert gzip.decompress(b"".join(compress_stream(chunks))) == PAYLOAD
+
+@pytest.mark.parametrize("encoding", available_encodings())
+def test_available_encodings_compress(encoding):
+    assert len(compress(PAYLOAD, encoding)) < len(PAYLOAD)
+
+def test_request_compression_threshold():
+    policy = RequestCompression(min_size=1024)
+
+    assert policy.apply(b"small") is None
+    body, encoding = policy.apply(PAYLOAD)
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == PAYLOAD
+
+def test_request_compression_streams_only_when_enabled():
+    assert RequestCompression().apply(iter([PAYLOAD])) is None
+    assert RequestCompression().apply({"form": "data"}) is None
+
+    body, _ = RequestCompression(compress_streams=True).apply(iter([PAYLOAD]))
+    assert gzip.decompress(b"".join(body)) == PAYLOAD
+
+def test_request_compression_invalid_settings():
+    with pytest.raises(InvalidInputError):
+        RequestCompression(encoding="lzma")
+    with pytest.raises(InvalidInputError):
+        RequestCompression(encoding="gzip", level=42)
+    with pytest.raises(InvalidInputError):
+        RequestCompression(min_size=-1)
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+import requests
+from libs.utils.http_cache_utils import ResponseCache, MemoryCacheBackend, DiskCacheBackend, CachedResponse
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+
+def _make_response(status_code=200, headers=None, content=b'{"id": 1}'):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = content
+    response.url = "https://api.example.com/items"
+    return response
+
+def _make_entry(content=b"x", expires_at=None):
+    return CachedResponse(url="https://api.example.com/items", status_code=200, reason="OK", headers={},
+                          content=content, encoding=None, stored_at=time.time(),
+                          expires_at=expires_at if expires_at is not None else time.time() + 60, vary={})
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", _make_entry())
+    backend.set("b", _make_entry())
+    backend.get("a")
+    backend.set("c", _make_entry())
+
+    assert backend.get("a") is not None
+    assert backend.get("b") is None
+    assert len(backend) == 2
+
+def test_memory_backend_respects_byte_bound():
+    backend = MemoryCacheBackend(max_bytes=10)
+    backend.set("a", _make_entry(b"123456"))
+    backend.set("b", _make_entry(b"123456"))
+    backend.set("too-big", _make_entry(b"x" * 11))
+
+    assert backend.get("a") is None
+    assert backend.get("b") is not None
+    assert backend.get("too-big") is None
+
+def test_disk_backend_round_trip(tmp_path):
+    backend = DiskCacheBackend(str(tmp_path))
+    backend.set("key", _make_entry(b"\x00binary"))
+
+    assert DiskCacheBackend(str(tmp_path)).get("key").content == b"\x00binary"
+    backend.clear()
+    assert backend.get("key") is None
+
+def test_store_respects_max_age_and_no_store():
+    cache = ResponseCache()
+    key, _ = cache.build_key("https://api.example.com/items", None, {})
+
+    assert cache.store(key, {}, _make_response(headers={"Cache-Control": "no-store"})) is False
+    assert cache.store(key, {}, _make_response(headers={"Cache-Control": "max-age=60"})) is True
+    assert cache.lookup(key, {}).is_fresh()
+
+def test_store_without_freshness_keeps_only_revalidatable_responses():
+    cache = ResponseCache()
+    key, _ = cache.build_key("https://api.example.com/items", None, {})
+
+    assert cache.store(key, {}, _make_response()) is False
+    assert cache.store(key, {}, _make_response(headers={"ETag": '"v1"'})) is True
+    entry = cache.lookup(key, {})
+    assert not entry.is_fresh()
+    assert cache.add_validators(entry, {})["If-None-Match"] == '"v1"'
+
+def test_key_separates_params_and_identities():
+    url = "https://api.example.com/items"
+    key, full_url = ResponseCache.build_key(url, {"page": "1"}, {"Authorization": "Bearer a"})
+
+    assert full_url == url + "?page=1"
+    assert key != ResponseCache.build_key(url, {"page": "2"}, {"Authorization": "Bearer a"})[0]
+    assert key != ResponseCache.build_key(url, {"page": "1"}, {"Authorization": "Bearer b"})[0]
+
+def test_lookup_honors_vary():
+    cache = ResponseCache()
+    key, _ = cache.build_key("https://api.example.com/items", None, {})
+    cache.store(key, {"Accept-Language": "en"}, _make_response(headers={"Cache-Control": "max-age=60", "Vary": "Accept-Language"}))
+
+    assert cache.lookup(key, {"Accept-Language": "en"}) is not None
+    assert cache.lookup(key, {"Accept-Language": "ko"}) is None
+
+def test_invalid_default_ttl():
+    with pytest.raises(InvalidInputError):
+        ResponseCache(default_ttl=-1)
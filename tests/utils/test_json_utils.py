@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+
+import pytest
+from libs.utils.json_utils import JsonCodec, available_json_codecs, get_json_codec, set_json_codec, encode_json, decode_json
+from libs.exceptions.custom_exceptions import InvalidInputError
+
+
+@dataclass
+class Item:
+    id: int
+    name: str
+
+@pytest.fixture(autouse=True)
+def reset_codec():
+    yield
+    set_json_codec(None)
+
+def test_auto_detects_fastest_available_codec():
+    assert get_json_codec().name == available_json_codecs()[0]
+    assert available_json_codecs()[-1] == "json"
+
+@pytest.mark.parametrize("name", available_json_codecs())
+def test_codecs_round_trip(name):
+    set_json_codec(name)
+    document = {"id": 1, "name": "한글", "tags": ["a", "b"], "nested": {"ok": True, "none": None}}
+
+    encoded = encode_json(document)
+
+    assert isinstance(encoded, bytes)
+    assert decode_json(encoded) == document
+    assert decode_json(encoded.decode()) == document
+
+@pytest.mark.parametrize("name", available_json_codecs())
+@pytest.mark.parametrize("document", [{1: "a", 2.5: "b", None: "d"}, {True: "c", False: "e"}, {"n": 2 ** 70, "m": -2 ** 64}, ["한글", [{}]],
+                                      {"a": None, "b": "null"}])
+def test_codecs_accept_what_the_stdlib_accepts(name, document):
+    set_json_codec("json")
+    expected = decode_json(encode_json(document))
+    set_json_codec(name)
+
+    assert decode_json(encode_json(document)) == expected
+
+@pytest.mark.parametrize("name", available_json_codecs())
+@pytest.mark.parametrize("document", [{"a": float("nan")}, {"a": float("inf")}, [None, -float("inf")], {float("nan"): 1}, Item(1, float("nan"))])
+def test_codecs_reject_what_the_stdlib_rejects(name, document):
+    set_json_codec(name)
+
+    with pytest.raises(InvalidInputError):
+        encode_json(document)
+
+@pytest.mark.parametrize("name", available_json_codecs())
+def test_codecs_decode_what_the_stdlib_decodes(name):
+    set_json_codec(name)
+
+    assert decode_json(b'{"n": NaN, "big": 1e400}')["big"] == float("inf")
+    assert decode_json(memoryview(b"[Infinity]")) == [float("inf")]
+
+def test_custom_codec():
+    set_json_codec(JsonCodec("constant", lambda obj: b"{}", lambda data: {"custom": True}))
+
+    assert encode_json({"id": 1}) == b"{}"
+    assert decode_json(b"[]") == {"custom": True}
+
+def test_decode_json_into_type():
+    assert decode_json(b'{"id": 1, "name": "a"}', into=Item) == Item(1, "a")
+    assert decode_json(b'[{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]', into=Item) == [Item(1, "a"), Item(2, "b")]
+
+def test_decode_json_errors():
+    with pytest.raises(InvalidInputError):
+        decode_json(b"{not json")
+    with pytest.raises(InvalidInputError):
+        decode_json(b'{"unexpected": 1}', into=Item)
+    with pytest.raises(InvalidInputError):
+        decode_json(123)
+
+def test_encode_json_unserializable():
+    with pytest.raises(InvalidInputError):
+        encode_json({"value": object()})
+
+def test_set_json_codec_unknown():
+    with pytest.raises(InvalidInputError):
+        set_json_codec("yaml")
@@ -1,6 +1,10 @@
+import json
+import time
+
+import jwt
 import pytest
 from datetime import datetime, timedelta, timezone
-from libs.utils.jwt_utils import generate_jwt, verify_jwt, generate_csrf_token, verify_csrf_token
+from libs.utils.jwt_utils import generate_jwt, verify_jwt, generate_csrf_token, verify_csrf_token, JwtVerificationCache, verify_jwt_batch, JwtKey, JwksKeySet, JwtMinter, RevocationList, BloomRevocationFilter, JwtKeyring, generate_signed_csrf_token, verify_signed_csrf_token
 from libs.exceptions.custom_exceptions import InvalidInputError, AuthenticationError
 
 def test_generate_jwt_valid():
@@ -179,4 +183,598 @@ def test_verify_csrf_token_invalid_input():
     
     # Act & Assert
     with pytest.raises(InvalidInputError):
-        verify_csrf_token(csrf_token, invalid_token)
\ No newline at end of file
+        verify_csrf_token(csrf_token, invalid_token)
+
+def test_verify_jwt_cache_hits_and_misses():
+    # Arrange
+    secret = "supersecretkey"
+    token = generate_jwt({"user_id": 123}, secret)
+    cache = JwtVerificationCache()
+    
+    # Act
+    first = verify_jwt(token, secret, cache=cache)
+    first["user_id"] = 456
+    second = verify_jwt(token, secret, cache=cache)
+    
+    # Assert
+    assert second["user_id"] == 123
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 1
+
+def test_verify_jwt_cache_is_scoped_to_secret():
+    # Arrange
+    secret = "supersecretkey"
+    token = generate_jwt({"user_id": 123}, secret)
+    cache = JwtVerificationCache()
+    verify_jwt(token, secret, cache=cache)
+    
+    # Act & Assert
+    with pytest.raises(AuthenticationError, match="Invalid JWT."):
+        verify_jwt(token, "wrongsecretkey", cache=cache)
+    assert cache.hits == 0
+
+def test_verify_jwt_cache_expires_with_token(mocker):
+    # Arrange
+    secret = "supersecretkey"
+    token = generate_jwt({"user_id": 123}, secret, expiration_minutes=1)
+    cache = JwtVerificationCache(max_ttl=None)
+    verify_jwt(token, secret, cache=cache)
+    
+    # Act
+    mocker.patch("libs.utils.jwt_utils.time.time", return_value=datetime.now(timezone.utc).timestamp() + 120)
+    claims = cache.get(token, secret)
+    
+    # Assert
+    assert claims is None
+    assert len(cache) == 0
+
+def test_verify_jwt_cache_does_not_cache_failures():
+    # Arrange
+    secret = "supersecretkey"
+    issued_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    token = generate_jwt({"user_id": 123}, secret, issued_at=issued_at, expiration=issued_at + timedelta(minutes=60))
+    cache = JwtVerificationCache()
+    
+    # Act & Assert
+    for _ in range(2):
+        with pytest.raises(AuthenticationError, match="The JWT signature has expired."):
+            verify_jwt(token, secret, cache=cache)
+    assert len(cache) == 0
+
+def test_verify_jwt_cache_is_bounded():
+    # Arrange
+    secret = "supersecretkey"
+    cache = JwtVerificationCache(max_entries=2)
+    tokens = [generate_jwt({"user_id": i}, secret) for i in range(3)]
+    
+    # Act
+    for token in tokens:
+        verify_jwt(token, secret, cache=cache)
+    
+    # Assert
+    assert len(cache) == 2
+    assert cache.get(tokens[0], secret) is None
+    assert cache.get(tokens[2], secret)["user_id"] == 2
+
+def test_jwt_verification_cache_invalid_input():
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        JwtVerificationCache(max_entries=0)
+    with pytest.raises(InvalidInputError):
+        JwtVerificationCache(max_ttl=-1)
+
+def test_verify_jwt_batch_preserves_order_and_isolates_failures():
+    # Arrange
+    secret = "supersecretkey"
+    issued_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    good = [generate_jwt({"user_id": i}, secret) for i in range(3)]
+    expired = generate_jwt({"user_id": 9}, secret, issued_at=issued_at, expiration=issued_at + timedelta(minutes=60))
+    tokens = [good[0], "invalid.token.value", good[1], expired, good[2]]
+    
+    # Act
+    results = verify_jwt_batch(tokens, secret, max_workers=4)
+    
+    # Assert
+    assert [result["user_id"] for result in (results[0], results[2], results[4])] == [0, 1, 2]
+    assert isinstance(results[1], AuthenticationError) and results[1].message == "Invalid JWT."
+    assert isinstance(results[3], AuthenticationError) and results[3].message == "The JWT signature has expired."
+
+def test_verify_jwt_batch_deduplicates(mocker):
+    # Arrange
+    secret = "supersecretkey"
+    token = generate_jwt({"user_id": 123}, secret)
+    decode = mocker.spy(jwt, "decode")
+    
+    # Act
+    results = verify_jwt_batch([token] * 50, secret)
+    
+    # Assert
+    assert decode.call_count == 1
+    assert len(results) == 50
+    results[0]["user_id"] = 456
+    assert results[1]["user_id"] == 123
+
+def test_verify_jwt_batch_with_processes_and_cache():
+    # Arrange
+    secret = "supersecretkey"
+    tokens = [generate_jwt({"user_id": i}, secret) for i in range(20)]
+    cache = JwtVerificationCache()
+    verify_jwt(tokens[0], secret, cache=cache)
+    
+    # Act
+    results = verify_jwt_batch(tokens + ["invalid.token.value"], secret, max_workers=2, use_processes=True, cache=cache)
+    
+    # Assert
+    assert [result["user_id"] for result in results[:20]] == list(range(20))
+    assert isinstance(results[20], AuthenticationError)
+    assert cache.hits == 1
+    assert len(cache) == 20
+
+def test_verify_jwt_batch_invalid_input():
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        verify_jwt_batch("not a list", "supersecretkey")
+    with pytest.raises(InvalidInputError):
+        verify_jwt_batch([123], "supersecretkey")
+    with pytest.raises(InvalidInputError):
+        verify_jwt_batch([], "supersecretkey", max_workers=0)
+
+
+def _private_key_pem(kind: str) -> bytes:
+    serialization = pytest.importorskip("cryptography.hazmat.primitives.serialization")
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+    if kind == "RSA":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif kind == "EC":
+        key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        key = ed25519.Ed25519PrivateKey.generate()
+    return key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+
+@pytest.mark.parametrize("kind, algorithm", [("RSA", "RS256"), ("RSA", "PS256"), ("EC", "ES256"), ("ED", "EdDSA")])
+def test_jwt_round_trip_with_asymmetric_keys(kind, algorithm):
+    # Arrange
+    key = JwtKey(_private_key_pem(kind), algorithm)
+    
+    # Act
+    token = generate_jwt({"user_id": 123}, key)
+    payload = verify_jwt(token, key)
+    
+    # Assert
+    assert jwt.get_unverified_header(token)["alg"] == algorithm
+    assert payload["user_id"] == 123
+
+def test_jwt_public_key_verifies_but_cannot_sign():
+    # Arrange
+    serialization = pytest.importorskip("cryptography.hazmat.primitives.serialization")
+    private_key = JwtKey(_private_key_pem("RSA"), "RS256")
+    public_pem = private_key.verification_key.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    public_key = JwtKey(public_pem.decode(), "RS256")
+    token = generate_jwt({"user_id": 123}, private_key)
+    
+    # Act & Assert
+    assert verify_jwt(token, public_key)["user_id"] == 123
+    assert public_key.fingerprint == private_key.fingerprint
+    with pytest.raises(InvalidInputError):
+        generate_jwt({"user_id": 123}, public_key)
+
+def test_verify_jwt_rejects_other_algorithms():
+    # Arrange
+    key = JwtKey(_private_key_pem("EC"), "ES256")
+    hmac_token = generate_jwt({"user_id": 123}, "supersecretkey")
+    
+    # Act & Assert
+    with pytest.raises(AuthenticationError, match="Invalid JWT."):
+        verify_jwt(hmac_token, key)
+    with pytest.raises(InvalidInputError):
+        verify_jwt(hmac_token, key, algorithm="HS256")
+    with pytest.raises(InvalidInputError):
+        generate_jwt({"user_id": 123}, "supersecretkey", algorithm="none")
+
+def test_jwt_key_invalid_input():
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        JwtKey("supersecretkey", "RS256")
+    with pytest.raises(InvalidInputError):
+        JwtKey("supersecretkey", "XX999")
+
+def test_jwt_key_with_cache_and_process_batch():
+    # Arrange
+    key = JwtKey(_private_key_pem("ED"), "EdDSA")
+    other_key = JwtKey(_private_key_pem("ED"), "EdDSA")
+    tokens = [generate_jwt({"user_id": i}, key) for i in range(10)]
+    cache = JwtVerificationCache()
+    
+    # Act
+    results = verify_jwt_batch(tokens, key, max_workers=2, use_processes=True, cache=cache)
+    
+    # Assert
+    assert [result["user_id"] for result in results] == list(range(10))
+    assert verify_jwt(tokens[0], key, cache=cache)["user_id"] == 0
+    assert cache.hits == 1
+    with pytest.raises(AuthenticationError):
+        verify_jwt(tokens[0], other_key, cache=cache)
+
+def _jwk(key: JwtKey, kid: str) -> dict:
+    jwk = jwt.algorithms.get_default_algorithms()[key.algorithm].to_jwk(key.verification_key, as_dict=True)
+    return {**jwk, "kid": kid, "alg": key.algorithm, "use": "sig"}
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_jwks_key_set_selects_key_by_kid():
+    # Arrange
+    rsa_key, ec_key = JwtKey(_private_key_pem("RSA"), "RS256"), JwtKey(_private_key_pem("EC"), "ES256")
+    document = {"keys": [_jwk(rsa_key, "rsa-1"), _jwk(ec_key, "ec-1"), {**_jwk(ec_key, "enc-1"), "use": "enc"}]}
+    rsa_token = jwt.encode({"user_id": 1}, rsa_key.signing_key, algorithm="RS256", headers={"kid": "rsa-1"})
+    ec_token = jwt.encode({"user_id": 2}, ec_key.signing_key, algorithm="ES256", headers={"kid": "ec-1"})
+    
+    # Act
+    with JwksKeySet(document, refresh_interval=None) as key_set:
+        rsa_payload, ec_payload = verify_jwt(rsa_token, key_set), verify_jwt(ec_token, key_set)
+        
+        # Assert
+        assert sorted(key_set.kids) == ["ec-1", "rsa-1"]
+        assert rsa_payload["user_id"] == 1 and ec_payload["user_id"] == 2
+        assert key_set.get("rsa-1").fingerprint == rsa_key.fingerprint
+        with pytest.raises(AuthenticationError, match="Invalid JWT."):
+            verify_jwt(jwt.encode({"user_id": 3}, ec_key.signing_key, algorithm="ES256", headers={"kid": "rsa-1"}), key_set)
+
+def test_jwks_key_set_loads_from_file(tmp_path):
+    # Arrange
+    key = JwtKey(_private_key_pem("ED"), "EdDSA")
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps({"keys": [_jwk(key, "ed-1")]}))
+    token = jwt.encode({"user_id": 1}, key.signing_key, algorithm="EdDSA")
+    
+    # Act & Assert
+    with JwksKeySet(str(path), refresh_interval=None) as key_set:
+        assert verify_jwt(token, key_set)["user_id"] == 1
+
+def test_jwks_key_set_loads_from_url(mocker):
+    # Arrange
+    key = JwtKey(_private_key_pem("EC"), "ES256")
+    response = mocker.Mock()
+    response.json.return_value = {"keys": [_jwk(key, "ec-1")]}
+    call_get = mocker.patch("libs.utils.api_utils.call_get", return_value=response)
+    
+    # Act
+    with JwksKeySet("https://idp.example.com/.well-known/jwks.json", refresh_interval=None) as key_set:
+        # Assert
+        assert "ec-1" in key_set
+        assert call_get.call_args.args[0] == "https://idp.example.com/.well-known/jwks.json"
+
+def test_jwks_key_set_refetches_unknown_kid_in_background():
+    # Arrange
+    old_key, new_key = JwtKey(_private_key_pem("EC"), "ES256"), JwtKey(_private_key_pem("EC"), "ES256")
+    documents = [{"keys": [_jwk(old_key, "old")]}, {"keys": [_jwk(old_key, "old"), _jwk(new_key, "new")]}]
+    token = jwt.encode({"user_id": 1}, new_key.signing_key, algorithm="ES256", headers={"kid": "new"})
+    
+    with JwksKeySet(lambda: documents.pop(0) if len(documents) > 1 else documents[0], refresh_interval=None, min_refetch_interval=0) as key_set:
+        old = key_set.get("old")
+        
+        # Act & Assert
+        with pytest.raises(AuthenticationError, match="Unknown JWT key id."):
+            verify_jwt(token, key_set)
+        assert _wait_for(lambda: "new" in key_set)
+        assert verify_jwt(token, key_set)["user_id"] == 1
+        assert key_set.get("old") is old
+
+def test_jwks_key_set_rate_limits_refetches():
+    # Arrange
+    key = JwtKey(_private_key_pem("EC"), "ES256")
+    token = jwt.encode({"user_id": 1}, key.signing_key, algorithm="ES256", headers={"kid": "unknown"})
+    
+    with JwksKeySet({"keys": [_jwk(key, "ec-1")]}, refresh_interval=None, min_refetch_interval=60) as key_set:
+        # Act
+        results = verify_jwt_batch([token] * 3 + [f"{token}x"], key_set)
+        for _ in range(5):
+            with pytest.raises(AuthenticationError):
+                verify_jwt(token, key_set)
+        time.sleep(0.1)
+        
+        # Assert
+        assert all(isinstance(result, AuthenticationError) for result in results)
+        assert key_set.fetches == 1
+
+def test_jwks_key_set_batch_with_processes():
+    # Arrange
+    keys = [JwtKey(_private_key_pem("EC"), "ES256"), JwtKey(_private_key_pem("ED"), "EdDSA")]
+    document = {"keys": [_jwk(keys[0], "ec-1"), _jwk(keys[1], "ed-1")]}
+    tokens = [jwt.encode({"user_id": i}, keys[i % 2].signing_key, algorithm=keys[i % 2].algorithm,
+                         headers={"kid": ["ec-1", "ed-1"][i % 2]}) for i in range(10)]
+    cache = JwtVerificationCache()
+    
+    # Act
+    with JwksKeySet(document, refresh_interval=None) as key_set:
+        results = verify_jwt_batch(tokens, key_set, max_workers=2, use_processes=True, cache=cache)
+        cached = verify_jwt(tokens[3], key_set, cache=cache)
+    
+    # Assert
+    assert [result["user_id"] for result in results] == list(range(10))
+    assert cached["user_id"] == 3
+    assert cache.hits == 1
+
+def test_jwks_key_set_invalid_input(tmp_path):
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        JwksKeySet(123)
+    with pytest.raises(InvalidInputError):
+        JwksKeySet({"keys": []})
+    with pytest.raises(InvalidInputError):
+        JwksKeySet({"not_keys": 1})
+    with pytest.raises(InvalidInputError):
+        JwksKeySet(str(tmp_path / "missing.json"))
+    with pytest.raises(InvalidInputError):
+        JwksKeySet({"keys": [{"kty": "oct", "k": "c2VjcmV0"}]}, refresh_interval=0)
+
+def test_generate_jwt_does_not_mutate_payload():
+    # Arrange
+    payload = {"user_id": 123}
+    
+    # Act
+    token = generate_jwt(payload, "supersecretkey")
+    
+    # Assert
+    assert payload == {"user_id": 123}
+    assert "exp" in verify_jwt(token, "supersecretkey")
+
+def test_jwt_minter_tokens_verify():
+    # Arrange
+    minter = JwtMinter("supersecretkey", claims={"iss": "issuer", "aud": "api"}, expiration_minutes=5, headers={"kid": "k1"})
+    claims = {"user_id": 123, "aud": "admin"}
+    
+    # Act
+    token = minter.mint(claims)
+    payload = jwt.decode(token, "supersecretkey", algorithms=["HS256"], audience="admin")
+    
+    # Assert
+    assert claims == {"user_id": 123, "aud": "admin"}
+    assert payload == {"user_id": 123, "aud": "admin", "iss": "issuer", "exp": payload["iat"] + 300, "iat": payload["iat"]}
+    assert jwt.get_unverified_header(token) == {"alg": "HS256", "kid": "k1", "typ": "JWT"}
+
+def test_jwt_minter_matches_generate_jwt():
+    # Arrange
+    issued_at = datetime.now(timezone.utc)
+    expiration = issued_at + timedelta(minutes=10)
+    
+    # Act
+    minted = JwtMinter("supersecretkey", claims={"iss": "issuer"}).mint({"user_id": 1}, issued_at=issued_at, expiration=expiration)
+    generated = generate_jwt({"iss": "issuer", "user_id": 1}, "supersecretkey", issued_at=issued_at, expiration=expiration)
+    
+    # Assert
+    assert verify_jwt(minted, "supersecretkey") == verify_jwt(generated, "supersecretkey")
+
+def test_jwt_minter_with_asymmetric_key():
+    # Arrange
+    key = JwtKey(_private_key_pem("ED"), "EdDSA")
+    
+    # Act
+    token = JwtMinter(key).mint({"user_id": 1, "nbf": datetime.now(timezone.utc) - timedelta(seconds=5)})
+    
+    # Assert
+    assert verify_jwt(token, key)["user_id"] == 1
+
+def test_jwt_minter_invalid_input():
+    # Arrange
+    minter = JwtMinter("supersecretkey")
+    
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        JwtMinter(12345)
+    with pytest.raises(InvalidInputError):
+        JwtMinter("supersecretkey", expiration_minutes=0)
+    with pytest.raises(InvalidInputError):
+        JwtMinter("supersecretkey", claims={"when": datetime.now(timezone.utc)})
+    with pytest.raises(InvalidInputError):
+        JwtMinter("supersecretkey", claims={"exp": datetime.now(timezone.utc) + timedelta(days=1)})
+    with pytest.raises(InvalidInputError):
+        JwtMinter("supersecretkey", claims={"iss": "issuer", "iat": 0})
+    with pytest.raises(InvalidInputError):
+        minter.mint(["not", "a", "dict"])
+    with pytest.raises(InvalidInputError):
+        minter.mint(issued_at=datetime.now())
+    with pytest.raises(InvalidInputError):
+        minter.mint({"data": object()})
+
+def test_verify_jwt_rejects_revoked_tokens():
+    # Arrange
+    secret = "supersecretkey"
+    revoked, active, anonymous = (generate_jwt({"jti": "a"}, secret), generate_jwt({"jti": "b"}, secret), generate_jwt({}, secret))
+    revocation = RevocationList()
+    cache = JwtVerificationCache()
+    verify_jwt(revoked, secret, cache=cache, revocation=revocation)
+    
+    # Act
+    revocation.revoke("a", time.time() + 60)
+    
+    # Assert
+    with pytest.raises(AuthenticationError, match="The JWT has been revoked."):
+        verify_jwt(revoked, secret, cache=cache, revocation=revocation)
+    assert verify_jwt(active, secret, revocation=revocation)["jti"] == "b"
+    assert "exp" in verify_jwt(anonymous, secret, revocation=revocation)
+    results = verify_jwt_batch([revoked, active], secret, revocation=revocation)
+    assert isinstance(results[0], AuthenticationError) and results[1]["jti"] == "b"
+
+def test_revocation_list_bulk_load_and_prune():
+    # Arrange
+    now = time.time()
+    revocation = RevocationList([("a", now - 10), ("b", now + 60), ("c", None)])
+    revocation.revoke("a", now + 120)
+    revocation.revoke("b", now - 5)
+    
+    # Act
+    dropped = revocation.prune(now)
+    
+    # Assert
+    assert dropped == 0
+    assert sorted(revocation.jtis()) == ["a", "b", "c"]
+    assert revocation.prune(now + 90) == 1
+    assert "b" not in revocation and "a" in revocation
+    revocation.remove("c")
+    assert len(revocation) == 1
+    with pytest.raises(InvalidInputError):
+        revocation.revoke("", now)
+    with pytest.raises(InvalidInputError):
+        revocation.revoke("d", "tomorrow")
+
+def test_bloom_revocation_filter_confirms_hits_only():
+    # Arrange
+    store = RevocationList((f"revoked-{i}", None) for i in range(1000))
+    confirm_calls = []
+    bloom = BloomRevocationFilter(lambda jti: confirm_calls.append(jti) or store.is_revoked(jti), capacity=1000, false_positive_rate=0.01)
+    bloom.add_many(store.jtis())
+    
+    # Act
+    revoked = all(bloom.is_revoked(f"revoked-{i}") for i in range(1000))
+    unrevoked = [bloom.is_revoked(f"active-{i}") for i in range(10000)]
+    
+    # Assert
+    assert revoked and not any(unrevoked)
+    assert len(confirm_calls) == bloom.confirmations == 1000 + bloom.false_positives
+    assert bloom.false_positives < 300
+
+def test_bloom_revocation_filter_rebuild_and_verify_jwt():
+    # Arrange
+    secret = "supersecretkey"
+    store = RevocationList([("a", None)])
+    bloom = BloomRevocationFilter(store.is_revoked, capacity=100)
+    bloom.add("a")
+    token = generate_jwt({"jti": "a"}, secret)
+    
+    # Act & Assert
+    with pytest.raises(AuthenticationError, match="The JWT has been revoked."):
+        verify_jwt(token, secret, revocation=bloom)
+    store.remove("a")
+    bloom.rebuild(store.jtis())
+    assert not bloom.might_contain("a")
+    assert verify_jwt(token, secret, revocation=bloom)["jti"] == "a"
+
+def test_bloom_revocation_filter_invalid_input():
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        BloomRevocationFilter("not callable")
+    with pytest.raises(InvalidInputError):
+        BloomRevocationFilter(lambda jti: False, capacity=0)
+    with pytest.raises(InvalidInputError):
+        BloomRevocationFilter(lambda jti: False, false_positive_rate=1.0)
+
+def test_jwt_keyring_rotation():
+    # Arrange
+    keyring = JwtKeyring({"2024-01": "old-secret"}, active_kid="2024-01")
+    old_token = generate_jwt({"user_id": 1}, keyring)
+    
+    # Act
+    keyring.add("2024-02", "new-secret", activate=True)
+    new_token = generate_jwt({"user_id": 2}, keyring)
+    
+    # Assert
+    assert jwt.get_unverified_header(old_token)["kid"] == "2024-01"
+    assert jwt.get_unverified_header(new_token)["kid"] == "2024-02"
+    assert verify_jwt(new_token, "new-secret")["user_id"] == 2
+    assert verify_jwt(old_token, keyring)["user_id"] == 1
+    assert verify_jwt(new_token, keyring)["user_id"] == 2
+    assert keyring.active_kid == "2024-02" and keyring.retiring_kids == ["2024-01"]
+    keyring.remove("2024-01")
+    with pytest.raises(AuthenticationError, match="Unknown JWT key id."):
+        verify_jwt(old_token, keyring)
+
+def test_jwt_keyring_untagged_tokens_and_mixed_algorithms():
+    # Arrange
+    ec_key = JwtKey(_private_key_pem("EC"), "ES256")
+    keyring = JwtKeyring({"legacy": "supersecretkey", "ec": ec_key}, active_kid="ec", untagged_kid="legacy")
+    legacy_token = generate_jwt({"user_id": 1}, "supersecretkey")
+    cache = JwtVerificationCache()
+    
+    # Act
+    minted = JwtMinter(keyring, claims={"iss": "issuer"}).mint({"user_id": 2})
+    results = verify_jwt_batch([legacy_token, minted, minted], keyring, max_workers=2, cache=cache)
+    
+    # Assert
+    assert jwt.get_unverified_header(minted) == {"alg": "ES256", "kid": "ec", "typ": "JWT"}
+    assert [result["user_id"] for result in results] == [1, 2, 2]
+    assert verify_jwt(minted, keyring, cache=cache)["iss"] == "issuer"
+    assert cache.hits == 1
+
+def test_jwt_keyring_invalid_input():
+    # Arrange
+    keyring = JwtKeyring({"a": "secret-a"}, active_kid="a")
+    public_key = JwtKey(JwtKey(_private_key_pem("ED"), "EdDSA").verification_key, "EdDSA")
+    
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        JwtKeyring({"a": "secret-a"})
+    with pytest.raises(InvalidInputError):
+        generate_jwt({"user_id": 1}, JwtKeyring())
+    with pytest.raises(InvalidInputError):
+        keyring.activate("missing")
+    with pytest.raises(InvalidInputError):
+        keyring.remove("a")
+    with pytest.raises(InvalidInputError):
+        keyring.add("a", "replacement")
+    with pytest.raises(InvalidInputError):
+        keyring.add("b", 12345)
+    keyring.add("public", public_key)
+    with pytest.raises(InvalidInputError):
+        keyring.activate("public")
+
+def test_signed_csrf_token_round_trip():
+    # Arrange
+    secret = "csrfsecretkey"
+    
+    # Act
+    token = generate_signed_csrf_token("session-1", secret)
+    
+    # Assert
+    assert verify_signed_csrf_token(token, "session-1", secret) is True
+    assert token != generate_signed_csrf_token("session-1", secret)
+
+def test_signed_csrf_token_is_bound_to_session_and_key():
+    # Arrange
+    token = generate_signed_csrf_token("session-1", "csrfsecretkey")
+    timestamp, nonce, signature = token.split(".")
+    
+    # Act & Assert
+    assert verify_signed_csrf_token(token, "session-2", "csrfsecretkey") is False
+    assert verify_signed_csrf_token(token, "session-1", "othersecretkey") is False
+    assert verify_signed_csrf_token(f"{int(timestamp) + 1}.{nonce}.{signature}", "session-1", "csrfsecretkey") is False
+    assert verify_signed_csrf_token(generate_csrf_token(), "session-1", "csrfsecretkey") is False
+    assert verify_signed_csrf_token("not.a.token", "session-1", "csrfsecretkey") is False
+
+def test_signed_csrf_token_expires(mocker):
+    # Arrange
+    token = generate_signed_csrf_token("session-1", "csrfsecretkey")
+    issued = int(token.split(".")[0])
+    
+    # Act
+    mocker.patch("libs.utils.jwt_utils.time.time", return_value=issued + 601)
+    
+    # Assert
+    assert verify_signed_csrf_token(token, "session-1", "csrfsecretkey", max_age_seconds=600) is False
+    assert verify_signed_csrf_token(token, "session-1", "csrfsecretkey", max_age_seconds=3600) is True
+
+@pytest.mark.parametrize("token", ["²³.abc.def", "1.2.3.4", "", "..", "{now}..", "{now}.nonce.é" + "a" * 63, "{now}.nonce.€" + "a" * 63,
+                                   "{now}.nonce." + "A" * 64, "١٢٣.nonce." + "a" * 64, "9" * 400 + ".nonce." + "a" * 64,
+                                   "9" * 5000 + ".nonce." + "a" * 64])
+def test_signed_csrf_token_rejects_hostile_input(token):
+    # Arrange
+    token = token.replace("{now}", str(int(time.time())))
+    
+    # Act & Assert
+    assert verify_signed_csrf_token(token, "session-1", "csrfsecretkey") is False
+
+def test_signed_csrf_token_invalid_input():
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        generate_signed_csrf_token("", "csrfsecretkey")
+    with pytest.raises(InvalidInputError):
+        generate_signed_csrf_token("session-1", 12345)
+    with pytest.raises(InvalidInputError):
+        verify_signed_csrf_token(12345, "session-1", "csrfsecretkey")
+    with pytest.raises(InvalidInputError):
+        verify_signed_csrf_token(generate_signed_csrf_token("session-1", "csrfsecretkey"), "session-1", "csrfsecretkey", max_age_seconds=-1)
+    with pytest.raises(InvalidInputError):
+        verify_signed_csrf_token(generate_signed_csrf_token("session-1", "csrfsecretkey"), "session-1", "csrfsecretkey", max_age_seconds=True)
@@ -1,5 +1,8 @@
+import hashlib
+import time
+
 import pytest
-from libs.utils.security_utils import hash_password, verify_password, generate_secure_token, hmac_sign, verify_hmac, hash_data
+from libs.utils.security_utils import hash_password, verify_password, generate_secure_token, hmac_sign, verify_hmac, hash_data, password_needs_rehash, calibrate_password_cost, MAX_SCRYPT_COST, MAX_PBKDF2_COST
 from libs.exceptions.custom_exceptions import InvalidInputError
 
 def test_hash_password_valid_input():
@@ -287,4 +290,101 @@ def test_hash_data_non_string_input():
     
     # Act & Assert
     with pytest.raises(InvalidInputError):
-        hash_data(data)
\ No newline at end of file
+        hash_data(data)
+
+@pytest.mark.parametrize("algorithm, cost", [("pbkdf2_sha256", 1000), ("pbkdf2_sha512", 1000), ("scrypt", 1024)])
+def test_hash_password_encodes_algorithm_and_cost(algorithm, cost):
+    # Arrange
+    password = "securepassword123"
+    
+    # Act
+    hashed_password = hash_password(password, algorithm=algorithm, cost=cost)
+    
+    # Assert
+    salt, hashed = hashed_password.split('$')
+    assert hashed.startswith(f"{algorithm}:{cost}:")
+    assert verify_password(password, hashed_password) is True
+    assert verify_password("wrongpassword", hashed_password) is False
+
+def test_verify_password_legacy_format():
+    # Arrange
+    salt = "a1b2c3d4e5f6g7h8"
+    legacy_hashed_password = f"{salt}${hashlib.pbkdf2_hmac('sha256', b'securepassword123', salt.encode(), 100000).hex()}"
+    
+    # Act & Assert
+    assert verify_password("securepassword123", legacy_hashed_password) is True
+    assert verify_password("wrongpassword", legacy_hashed_password) is False
+    assert password_needs_rehash(legacy_hashed_password, cost=100000) is False
+    assert password_needs_rehash(legacy_hashed_password, algorithm="scrypt") is True
+
+def test_password_needs_rehash():
+    # Arrange
+    hashed_password = hash_password("securepassword123", cost=1000)
+    
+    # Act & Assert
+    assert password_needs_rehash(hashed_password, cost=1000) is False
+    assert password_needs_rehash(hashed_password, cost=2000) is True
+    assert password_needs_rehash(hashed_password, algorithm="pbkdf2_sha512", cost=1000) is True
+
+def test_calibrate_password_cost():
+    # Act
+    pbkdf2_cost = calibrate_password_cost(0.01)
+    scrypt_cost = calibrate_password_cost(0.01, algorithm="scrypt")
+    
+    # Assert
+    assert pbkdf2_cost >= 1000
+    assert scrypt_cost >= 2 ** 14 and scrypt_cost & (scrypt_cost - 1) == 0
+    assert verify_password("securepassword123", hash_password("securepassword123", cost=pbkdf2_cost)) is True
+
+def test_calibrate_password_cost_caps_scrypt(mocker):
+    # Arrange
+    mocker.patch("libs.utils.security_utils.hashlib.scrypt", return_value=b"")
+    
+    # Act
+    cost = calibrate_password_cost(60, algorithm="scrypt")
+    
+    # Assert
+    assert cost == MAX_SCRYPT_COST
+
+def test_calibrate_password_cost_keeps_scrypt_floor(mocker):
+    # Arrange
+    mocker.patch("libs.utils.security_utils.hashlib.scrypt", side_effect=lambda *args, **kwargs: time.sleep(0.05) or b"")
+    
+    # Act
+    cost = calibrate_password_cost(0.01, algorithm="scrypt")
+    
+    # Assert
+    assert cost == 2 ** 14
+
+def test_calibrate_password_cost_caps_pbkdf2(mocker):
+    # Arrange: 1e8 iterations per second, so the trial runs stay short.
+    mocker.patch("libs.utils.security_utils.hashlib.pbkdf2_hmac", side_effect=lambda name, password, salt, cost: time.sleep(cost / 1e8) or b"")
+    
+    # Act
+    cost = calibrate_password_cost(60)
+    
+    # Assert
+    assert cost == MAX_PBKDF2_COST
+
+def test_hash_password_invalid_parameters():
+    # Act & Assert
+    with pytest.raises(InvalidInputError):
+        hash_password("securepassword123", algorithm="md5")
+    with pytest.raises(InvalidInputError):
+        hash_password("securepassword123", cost=0)
+    with pytest.raises(InvalidInputError):
+        hash_password("securepassword123", algorithm="scrypt", cost=1000)
+    with pytest.raises(InvalidInputError):
+        hash_password("securepassword123", algorithm="scrypt", cost=2 ** 21)
+    with pytest.raises(InvalidInputError):
+        verify_password("securepassword123", f"salt$scrypt:{2 ** 21}:abcd")
+    with pytest.raises(InvalidInputError):
+        hash_password("securepassword123", cost=MAX_PBKDF2_COST + 1)
+    with pytest.raises(InvalidInputError):
+        verify_password("securepassword123", "salt$pbkdf2_sha256:5000000:abcd")
+    with pytest.raises(InvalidInputError):
+        hash_password("securepassword123", salt="with$dollar")
+    with pytest.raises(InvalidInputError):
+        verify_password("securepassword123", "salt$pbkdf2_sha256:many:abcd")
+    with pytest.raises(InvalidInputError):
+        calibrate_password_cost(0)